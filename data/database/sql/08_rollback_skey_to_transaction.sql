@@ -1,3 +1,5 @@
--- Roll back Skey to a specific transaction (example query to get required geometry)
--- (Apply data from this query to restore the state)
+-- Roll back Skey to a specific transaction
+-- Revisions between keyframes are stored as deltas in geometry_deltas, so this query only
+-- returns rows for keyframes and the current head. Use SkeyDB.get_skey_at(name, transaction_id)
+-- to rebuild any revision and SkeyDB.rollback_skey(name, transaction_id) to restore it.
 SELECT * FROM geometry WHERE skey_id = ? AND transaction_id = ? ORDER BY id ASC;
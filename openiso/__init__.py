@@ -17,39 +17,42 @@ Main components:
 - window: Main window implementation
 """
 
+import importlib
 import sys
-from importlib.metadata import PackageNotFoundError
-from importlib.metadata import version as package_version
-from pathlib import Path
-
-from openiso.controller.importers import (
-    ASCIISkeyImporter,
-    BaseSkeyImporter,
-    IDFSkeyImporter,
-    ImportResult,
-    SkeyImporterFactory,
-)
-from openiso.controller.repository import SkeyRepository
-from openiso.controller.services import GeometryService, SkeyService
-from openiso.model.enums import Dimensioned, FlowArrow, Orientation
-from openiso.model.geometry import (
-    ArcGeometry,
-    GeometryConverter,
-    GeometryItem,
-    GeometrySettings,
-    HexagonGeometry,
-    IsometricProjection,
-    LineGeometry,
-    PointGeometry,
-    PolygonGeometry,
-    RectangleGeometry,
-)
-from openiso.model.point2d import Point2D
-from openiso.model.skey import SkeyData, SkeyGroup
+
+# Set by type checkers only; avoids importing typing at runtime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from openiso.controller.importers import (
+        ASCIISkeyImporter,
+        BaseSkeyImporter,
+        IDFSkeyImporter,
+        ImportResult,
+        SkeyImporterFactory,
+    )
+    from openiso.controller.repository import SkeyRepository
+    from openiso.controller.services import GeometryService, SkeyService
+    from openiso.model.enums import Dimensioned, FlowArrow, Orientation
+    from openiso.model.geometry import (
+        ArcGeometry,
+        GeometryConverter,
+        GeometryItem,
+        GeometrySettings,
+        HexagonGeometry,
+        IsometricProjection,
+        LineGeometry,
+        PointGeometry,
+        PolygonGeometry,
+        RectangleGeometry,
+    )
+    from openiso.model.point2d import Point2D
+    from openiso.model.skey import SkeyData, SkeyGroup
 
 
 # Read version from source tree/PyInstaller bundle, then installed package metadata.
 def _get_version():
+    from pathlib import Path
+
     try:
         base_dir = Path(getattr(sys, '_MEIPASS', Path(__file__).resolve().parent)).resolve()
         version_file = (base_dir / 'VERSION')
@@ -61,14 +64,59 @@ def _get_version():
     except OSError:
         pass
 
+    from importlib.metadata import PackageNotFoundError
+    from importlib.metadata import version as package_version
     try:
         return package_version('openiso')
     except PackageNotFoundError:
         return '0.0.0'
 
-__version__ = _get_version()
 __app_id__ = 'io.github.rompik.OpenIso'
 
+# Public names are imported on first access (PEP 562), so `import openiso` stays
+# cheap for scripts that only need a model class.
+_LAZY_ATTRIBUTES = {
+    'SkeyData': 'openiso.model.skey',
+    'SkeyGroup': 'openiso.model.skey',
+    'Point2D': 'openiso.model.point2d',
+    'Orientation': 'openiso.model.enums',
+    'FlowArrow': 'openiso.model.enums',
+    'Dimensioned': 'openiso.model.enums',
+    'GeometryItem': 'openiso.model.geometry',
+    'PointGeometry': 'openiso.model.geometry',
+    'LineGeometry': 'openiso.model.geometry',
+    'RectangleGeometry': 'openiso.model.geometry',
+    'PolygonGeometry': 'openiso.model.geometry',
+    'GeometryConverter': 'openiso.model.geometry',
+    'GeometrySettings': 'openiso.model.geometry',
+    'IsometricProjection': 'openiso.model.geometry',
+    'ArcGeometry': 'openiso.model.geometry',
+    'HexagonGeometry': 'openiso.model.geometry',
+    'SkeyRepository': 'openiso.controller.repository',
+    'BaseSkeyImporter': 'openiso.controller.importers',
+    'ASCIISkeyImporter': 'openiso.controller.importers',
+    'IDFSkeyImporter': 'openiso.controller.importers',
+    'SkeyImporterFactory': 'openiso.controller.importers',
+    'ImportResult': 'openiso.controller.importers',
+    'SkeyService': 'openiso.controller.services',
+    'GeometryService': 'openiso.controller.services',
+}
+
+
+def __getattr__(name):
+    if name == '__version__':
+        value = _get_version()
+    elif name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 __all__ = [
     '__version__',
     '__app_id__',
@@ -0,0 +1,244 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+
+"""
+Incremental reader for official symbol catalogs.
+
+Two layouts are understood:
+
+* the bundled map ``{"<symbol code>": {<payload>}, ...}`` (settings/OpenIso.json);
+* the roadmap ``OpenIso.Canonical`` document, whose ``symbols`` array is
+  streamed element by element and mapped onto the bundled payload layout.
+
+Only one symbol is decoded at a time, so memory use does not grow with the
+size of the catalog file. prepare_catalog_entries() adds the CPU-bound sync
+stage (payload hash and geometry normalization), optionally on worker processes.
+"""
+import hashlib
+import itertools
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from openiso.model.geometry import GeometryConverter
+
+CANONICAL_FORMAT = "OpenIso.Canonical"
+
+# Top-level keys of a canonical document that never hold a symbol.
+_CANONICAL_HEADER_KEYS = frozenset({"format", "schema_version", "format_version", "generated_at", "source"})
+
+_CONNECTOR_POINT_TYPES = {
+    "arrive": "ArrivePoint",
+    "leave": "LeavePoint",
+    "tee": "TeePoint",
+    "spindle": "SpindlePoint",
+}
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JsonStream:
+    """Character buffer over a text stream, refilled on demand."""
+
+    def __init__(self, stream: IO[str], chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        if self._eof:
+            return False
+        chunk = self._stream.read(size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ("" at EOF)."""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill(self._chunk_size):
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed catalog: expected '{char}', found '{found or 'end of file'}'")
+        self._pos += 1
+
+    def value(self):
+        """Decode and consume the next JSON value."""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # A number cut at the buffer end would decode short; read on to be sure.
+            if end == len(self._buffer) and self._fill(size):
+                continue
+            self._pos = end
+            return value
+
+
+def iter_catalog_symbols(stream: IO[str], chunk_size: int = 64 * 1024) -> Iterator[Tuple[str, dict]]:
+    """Yield (symbol_code, payload) pairs from a catalog file opened in text mode."""
+    reader = _JsonStream(stream, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+
+    canonical = False
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise ValueError("Malformed catalog: expected an object key")
+        reader.expect(":")
+
+        if key == "symbols" and reader.peek() == "[":
+            canonical = True
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.expect("]")
+            else:
+                while True:
+                    symbol = reader.value()
+                    if isinstance(symbol, dict) and symbol.get("symbol_code"):
+                        yield symbol["symbol_code"], canonical_symbol_to_payload(symbol)
+                    if reader.peek() != ",":
+                        break
+                    reader.expect(",")
+                reader.expect("]")
+        else:
+            value = reader.value()
+            if key == "format" and value == CANONICAL_FORMAT:
+                canonical = True
+            elif not canonical and key not in _CANONICAL_HEADER_KEYS and isinstance(value, dict):
+                yield key, value
+
+        if reader.peek() != ",":
+            break
+        reader.expect(",")
+    reader.expect("}")
+
+
+def canonical_symbol_to_payload(symbol: dict) -> dict:
+    """Map a canonical symbol onto the bundled catalog payload layout.
+
+    Connectors become point items and line segments become Line items; other
+    segment types have no fixed coordinate fields in schema v1 and are dropped.
+    """
+    attributes = symbol.get("attributes") or {}
+    versioning = symbol.get("versioning") or {}
+    geometry = []
+    for connector in symbol.get("connectors") or []:
+        point_type = _CONNECTOR_POINT_TYPES.get(connector.get("kind"))
+        if point_type:
+            geometry.append(f"{point_type}: x0={float(connector['x'])} y0={float(connector['y'])}")
+    for segment in (symbol.get("geometry") or {}).get("segments") or []:
+        if segment.get("type") == "line":
+            geometry.append(
+                f"Line: x1={float(segment['x1'])} y1={float(segment['y1'])} "
+                f"x2={float(segment['x2'])} y2={float(segment['y2'])}"
+            )
+
+    payload = {
+        key: attributes[key]
+        for key in ("orientation", "flow_arrow", "dimensioned", "tracing", "insulation", "spindle_skey")
+        if key in attributes
+    }
+    payload.update(
+        skey_group=symbol.get("group_key") or "unknown",
+        subgroup=symbol.get("subgroup_key") or "unknown",
+        description=symbol.get("description") or "",
+        geometry=geometry,
+    )
+    if "upstream_symbol_version" in versioning:
+        payload["symbol_version"] = int(versioning["upstream_symbol_version"])
+    return payload
+
+
+def catalog_payload_hash(payload: dict) -> str:
+    """sha256 of the canonical JSON form of a catalog payload."""
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def normalize_catalog_geometry(
+    symbol_code: str, payload: dict, converter: Optional[GeometryConverter] = None
+) -> List[str]:
+    """Return payload geometry as geometry strings, converting legacy raw pen records."""
+    raw_geometry = payload.get("geometry", [])
+    if not isinstance(raw_geometry, list):
+        return []
+
+    is_legacy_raw_geometry = any(not isinstance(item, str) for item in raw_geometry)
+    if not is_legacy_raw_geometry:
+        is_legacy_raw_geometry = any(
+            isinstance(item, str) and ":" not in item for item in raw_geometry if item
+        )
+
+    if is_legacy_raw_geometry:
+        return (converter or GeometryConverter()).convert_graphics(symbol_code, raw_geometry)
+
+    return [item for item in raw_geometry if isinstance(item, str) and item]
+
+
+def prepare_catalog_chunk(chunk: List[tuple]) -> List[tuple]:
+    """Hash and normalize (symbol_code, payload, symbol_version, stored_hash) entries.
+
+    Returns (symbol_code, payload, symbol_version, payload_hash, geometry) tuples;
+    geometry is None when the hash equals stored_hash, since unchanged symbols
+    are not rewritten. Module level so it can run in a worker process.
+    """
+    converter = GeometryConverter()
+    prepared = []
+    for symbol_code, payload, symbol_version, stored_hash in chunk:
+        payload_hash = catalog_payload_hash(payload)
+        geometry = None
+        if payload_hash != stored_hash:
+            geometry = normalize_catalog_geometry(symbol_code, payload, converter)
+        prepared.append((symbol_code, payload, symbol_version, payload_hash, geometry))
+    return prepared
+
+
+def prepare_catalog_entries(
+    entries: Iterable[tuple], workers: int = 0, chunk_size: int = 500
+) -> Iterator[tuple]:
+    """Run prepare_catalog_chunk() over entries, yielding results in input order.
+
+    With workers > 1, chunks are prepared on a process pool while the caller
+    consumes earlier results; at most two chunks per worker are in flight, so
+    memory stays bounded. Workers are spawned rather than forked, so open
+    SQLite connections and Qt threads are never copied into them.
+    """
+    chunks = iter(lambda: list(itertools.islice(entries, chunk_size)), [])
+    if workers <= 1:
+        for chunk in chunks:
+            yield from prepare_catalog_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(prepare_catalog_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -2,21 +2,168 @@
 # SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
 
 import os
+import itertools
 import json
+import re
 import shutil
 import sqlite3
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List
 
+from openiso.model.geometry_delta import apply_geometry_delta, diff_geometry
+from openiso.model.packed_geometry import pack_geometry, unpack_geometry
 from openiso.model.skey import SkeyData
 
 DB_PATH = "data/database/openiso.db"
+BUSY_TIMEOUT_MS = 5000
+STATEMENT_CACHE_SIZE = 256
+# Skeys read from the input of bulk_upsert_skeys() at a time.
+BULK_UPSERT_CHUNK_SIZE = 500
+
+# Schema version stored in PRAGMA user_version; bump together with a new entry in SkeyDB._MIGRATIONS.
+SCHEMA_VERSION = 7
+
+# app_metadata key selecting how new skey geometry revisions are written: 'text' (default) or 'packed'.
+GEOMETRY_STORAGE_KEY = "geometry_storage"
+GEOMETRY_STORAGE_MODES = ("text", "packed")
+
+# Every KEYFRAME_INTERVAL-th skey revision keeps a full snapshot; the ones in between are deltas,
+# so rebuilding any revision applies at most KEYFRAME_INTERVAL - 1 deltas.
+KEYFRAME_INTERVAL = 16
+
+# Full-text search index over skeys (FTS5, optional). Suffixes of the name make prefix queries
+# behave like the substring match of the tree filter for short SKEY codes ("SP" finds "01SP").
+_NAME_SUFFIXES_SQL = " || ' ' || ".join(f"substr(new.name, {start})" for start in range(2, 9))
+_SEARCH_INDEX_ROW_SQL = f"""
+    INSERT INTO skeys_fts (
+        rowid, name, name_suffixes, skey_group_key, skey_subgroup_key, skey_description_key,
+        pcf_identification, idf_record, translations
+    ) VALUES (
+        new.id, new.name, {_NAME_SUFFIXES_SQL}, new.skey_group_key, new.skey_subgroup_key,
+        new.skey_description_key, new.pcf_identification, new.idf_record,
+        (SELECT group_concat(text, ' ') FROM skey_translations WHERE skey_id = new.id)
+    );
+"""
+_SEARCH_TRANSLATIONS_SQL = """
+    UPDATE skeys_fts SET translations = (
+        SELECT group_concat(text, ' ') FROM skey_translations WHERE skey_id = {row}.skey_id
+    ) WHERE rowid = {row}.skey_id;
+"""
+SEARCH_INDEX_STATEMENTS = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS skeys_fts USING fts5(
+        name, name_suffixes, skey_group_key, skey_subgroup_key, skey_description_key,
+        pcf_identification, idf_record, translations,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3'
+    )
+    """,
+    f"CREATE TRIGGER IF NOT EXISTS skeys_fts_insert AFTER INSERT ON skeys BEGIN {_SEARCH_INDEX_ROW_SQL} END",
+    "CREATE TRIGGER IF NOT EXISTS skeys_fts_delete AFTER DELETE ON skeys BEGIN "
+    "DELETE FROM skeys_fts WHERE rowid = old.id; END",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS skeys_fts_update
+    AFTER UPDATE OF name, skey_group_key, skey_subgroup_key, skey_description_key, pcf_identification, idf_record
+    ON skeys
+    WHEN old.name IS NOT new.name OR old.skey_group_key IS NOT new.skey_group_key
+      OR old.skey_subgroup_key IS NOT new.skey_subgroup_key OR old.skey_description_key IS NOT new.skey_description_key
+      OR old.pcf_identification IS NOT new.pcf_identification OR old.idf_record IS NOT new.idf_record
+    BEGIN
+        DELETE FROM skeys_fts WHERE rowid = old.id;
+        {_SEARCH_INDEX_ROW_SQL}
+    END
+    """,
+    "CREATE TRIGGER IF NOT EXISTS skey_translations_fts_insert AFTER INSERT ON skey_translations BEGIN "
+    + _SEARCH_TRANSLATIONS_SQL.format(row="new") + " END",
+    "CREATE TRIGGER IF NOT EXISTS skey_translations_fts_update AFTER UPDATE ON skey_translations BEGIN "
+    + _SEARCH_TRANSLATIONS_SQL.format(row="new") + " END",
+    "CREATE TRIGGER IF NOT EXISTS skey_translations_fts_delete AFTER DELETE ON skey_translations BEGIN "
+    + _SEARCH_TRANSLATIONS_SQL.format(row="old") + " END",
+)
+# bm25 column weights, in skeys_fts column order: the SKEY code ranks first.
+_SEARCH_WEIGHTS = (10.0, 4.0, 2.0, 2.0, 1.0, 3.0, 3.0, 2.0)
+
+# Change log of skeys rows, read by SkeyService for incremental refreshes. Geometry changes
+# are logged through the current_transaction_id update that every saved revision makes.
+CHANGE_LOG_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS change_log (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        skey_id INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        op TEXT NOT NULL,
+        CHECK (op IN ('insert', 'update', 'delete'))
+    )
+    """,
+    "CREATE TRIGGER IF NOT EXISTS skeys_change_insert AFTER INSERT ON skeys BEGIN "
+    "INSERT INTO change_log (skey_id, name, op) VALUES (new.id, new.name, 'insert'); END",
+    "CREATE TRIGGER IF NOT EXISTS skeys_change_update AFTER UPDATE ON skeys BEGIN "
+    "INSERT INTO change_log (skey_id, name, op) SELECT old.id, old.name, 'delete' WHERE old.name IS NOT new.name; "
+    "INSERT INTO change_log (skey_id, name, op) VALUES (new.id, new.name, 'update'); END",
+    "CREATE TRIGGER IF NOT EXISTS skeys_change_delete AFTER DELETE ON skeys BEGIN "
+    "INSERT INTO change_log (skey_id, name, op) VALUES (old.id, old.name, 'delete'); END",
+)
+
+SKEY_SELECT_SQL = """
+    SELECT s.id, s.name, s.skey_group_key, s.skey_subgroup_key, s.skey_description_key,
+           s.spindle_skey, s.orientation, s.flow_arrow, s.dimensioned, s.tracing, s.insulation,
+           s.pcf_identification, s.idf_record, s.user_definable, s.flow_dependency,
+           s.source_id, ss.name, ss.source_type, ss.version, s.isogen_standard,
+           s.origin_type, s.is_official, s.is_user_modified,
+           s.upstream_symbol_code, s.upstream_release_version, s.upstream_symbol_version,
+           s.last_synced_upstream_version, s.upstream_payload_hash, s.local_revision, s.sync_state
+    FROM skeys s
+    LEFT JOIN symbol_sources ss ON ss.id = s.source_id
+"""
+
+SkeyRow = namedtuple("SkeyRow", [
+    "id", "name", "group_key", "subgroup_key", "description_key",
+    "spindle_skey", "orientation", "flow_arrow", "dimensioned", "tracing", "insulation",
+    "pcf_identification", "idf_record", "user_definable", "flow_dependency",
+    "source_id", "source_name", "source_type", "source_version", "isogen_standard",
+    "origin_type", "is_official", "is_user_modified",
+    "upstream_symbol_code", "upstream_release_version", "upstream_symbol_version",
+    "last_synced_upstream_version", "upstream_payload_hash", "local_revision", "sync_state",
+])
+
+
+def _skey_row_factory(_cursor: sqlite3.Cursor, row: tuple) -> SkeyRow:
+    return SkeyRow._make(row)
+
+
+# Tables holding the revision history of one kind of symbol; blobs/deltas are None when unsupported.
+HistoryTables = namedtuple("HistoryTables", ["owner", "transactions", "geometry", "owner_column", "blobs", "deltas"])
+
+
+@dataclass
+class CompactionReport:
+    """Result of SkeyDB.compact_history"""
+    revisions_deduplicated: int
+    revisions_pruned: int
+    bytes_before: int
+    bytes_after: int
+
+    @property
+    def bytes_reclaimed(self) -> int:
+        return max(self.bytes_before - self.bytes_after, 0)
+
 
 class SkeyDB:
-    def __init__(self, db_path: str = DB_PATH):
-        self.db_path = self._resolve_db_path(db_path)
-        self._ensure_schema_exists()
-        self._ensure_columns_exist()
+    def __init__(self, db_path: str = DB_PATH, fallback: bool = True):
+        """Open the database at db_path; with fallback=False use exactly that path, never user-local storage."""
+        self.db_path = self._resolve_db_path(db_path) if fallback else str(db_path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._search_index: bool | None = None
+        # Commits made through transaction() by any thread of this instance; PRAGMA
+        # data_version only reports commits from other connections.
+        self._commit_count = 0
+        self._migrate()
 
     def _resolve_db_path(self, db_path: str) -> str:
         """Return a writable DB path, falling back to user-local storage if needed."""
@@ -53,18 +200,38 @@ class SkeyDB:
 
         return True
 
-    def _ensure_schema_exists(self):
-        """Create minimal schema for first run if DB file is empty/new."""
-        conn = self.connect()
+    def _migrate(self):
+        """Bring the schema up to SCHEMA_VERSION. A current DB costs a single PRAGMA read."""
+        conn = self._connection()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+
         cur = conn.cursor()
         cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='skeys'")
-        has_skeys = cur.fetchone() is not None
-        if has_skeys:
-            conn.close()
+        if version == 0 and cur.fetchone() is None:
+            self._create_schema()
             return
 
-        conn.executescript(
-            """
+        for target_version, migration in self._MIGRATIONS:
+            if version >= target_version:
+                continue
+            with self.transaction() as cur:
+                # Re-read inside the write lock: another process may have migrated meanwhile.
+                version = cur.execute("PRAGMA user_version").fetchone()[0]
+                if version >= target_version:
+                    continue
+                print(f"Migrating database schema to version {target_version}...")
+                migration(self, cur)
+                cur.execute(f"PRAGMA user_version = {target_version}")
+                version = target_version
+
+    def _create_schema(self):
+        """Create the current schema for first run if DB file is empty/new."""
+        self._connection().executescript(
+            f"""
+            BEGIN;
+
             CREATE TABLE IF NOT EXISTS symbol_sources (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
@@ -106,6 +273,7 @@ class SkeyDB:
                 insulation INTEGER NOT NULL DEFAULT 0,
                 source_id INTEGER,
                 isogen_standard INTEGER NOT NULL DEFAULT 0,
+                current_transaction_id INTEGER,
                 CHECK (orientation IN (0, 1, 2, 3)),
                 CHECK (flow_arrow IN (0, 1, 2)),
                 CHECK (dimensioned IN (0, 1, 2)),
@@ -144,6 +312,7 @@ class SkeyDB:
                 upstream_payload_hash TEXT,
                 local_revision INTEGER NOT NULL DEFAULT 1,
                 sync_state TEXT NOT NULL DEFAULT 'synced',
+                current_transaction_id INTEGER,
                 CHECK (orientation IN (0, 1, 2, 3)),
                 CHECK (flow_arrow IN (0, 1, 2)),
                 CHECK (dimensioned IN (0, 1, 2)),
@@ -209,36 +378,90 @@ class SkeyDB:
                 PRIMARY KEY (release_version, symbol_code)
             );
 
+            CREATE TABLE IF NOT EXISTS geometry_blobs (
+                transaction_id INTEGER PRIMARY KEY,
+                skey_id INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                FOREIGN KEY (skey_id) REFERENCES skeys(id),
+                FOREIGN KEY (transaction_id) REFERENCES transactions(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS geometry_deltas (
+                transaction_id INTEGER PRIMARY KEY,
+                skey_id INTEGER NOT NULL,
+                base_transaction_id INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                ops TEXT NOT NULL,
+                FOREIGN KEY (skey_id) REFERENCES skeys(id),
+                FOREIGN KEY (transaction_id) REFERENCES transactions(id)
+            );
+
+            CREATE TABLE IF NOT EXISTS skey_translations (
+                skey_id INTEGER NOT NULL,
+                lang_code TEXT NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (skey_id, lang_code),
+                FOREIGN KEY (skey_id) REFERENCES skeys(id) ON DELETE CASCADE
+            );
+
             CREATE INDEX IF NOT EXISTS idx_geometry_skey_txn ON geometry(skey_id, transaction_id);
+            CREATE INDEX IF NOT EXISTS idx_geometry_blobs_skey ON geometry_blobs(skey_id);
+            CREATE INDEX IF NOT EXISTS idx_geometry_deltas_skey_txn ON geometry_deltas(skey_id, transaction_id);
             CREATE INDEX IF NOT EXISTS idx_transactions_skey ON transactions(skey_id);
             CREATE INDEX IF NOT EXISTS idx_spindle_geometry_spindle_txn ON spindle_geometry(spindle_id, transaction_id);
+
+            INSERT OR IGNORE INTO symbol_sources (id, name, source_type, version, description, url)
+            VALUES (1, 'ISOGEN / Alias Limited', 'standard', '2008',
+                    'ISOGEN Symbol Key (SKEY) Definitions', 'http://www.alias.ltd.uk');
+
+            {self._search_index_script(self._connection())}
+
+            {self._statements_script(CHANGE_LOG_STATEMENTS)}
+
+            PRAGMA user_version = {SCHEMA_VERSION};
+
+            COMMIT;
             """
         )
-        conn.commit()
-        conn.close()
 
     @staticmethod
-    def _column_exists(cur: sqlite3.Cursor, table: str, column: str) -> bool:
-        cur.execute(f"PRAGMA table_info({table})")
-        return any(row[1] == column for row in cur.fetchall())
+    def _fts5_available(conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+            conn.execute("DROP TABLE temp.fts5_probe")
+            return True
+        except sqlite3.OperationalError:
+            return False
 
-    def _ensure_columns_exist(self):
-        """Checks if all necessary columns exist and adds them if missing."""
-        conn = self.connect()
-        cur = conn.cursor()
+    @classmethod
+    def _search_index_script(cls, conn: sqlite3.Connection) -> str:
+        """SQL creating the search index, or nothing when this SQLite build has no FTS5."""
+        if not cls._fts5_available(conn):
+            print("SQLite FTS5 is not available; skey search falls back to substring matching.")
+            return ""
+        return cls._statements_script(SEARCH_INDEX_STATEMENTS)
 
-        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='skeys'")
-        if cur.fetchone() is None:
-            conn.close()
-            return
+    @staticmethod
+    def _statements_script(statements: Iterable[str]) -> str:
+        return "\n".join(f"{statement.strip()};" for statement in statements)
 
+    @staticmethod
+    def _table_columns(cur: sqlite3.Cursor, table: str) -> set[str]:
+        cur.execute(f"PRAGMA table_info({table})")
+        return {row[1] for row in cur.fetchall()}
+
+    @classmethod
+    def _column_exists(cls, cur: sqlite3.Cursor, table: str, column: str) -> bool:
+        return column in cls._table_columns(cur, table)
+
+    def _migrate_v1_legacy_columns(self, cur: sqlite3.Cursor):
+        """v1: add the columns and tables introduced before versioned migrations."""
         try:
             cur.execute("SELECT tracing FROM skeys LIMIT 1")
         except sqlite3.OperationalError:
             print("Adding 'tracing' column to 'skeys' table...")
             try:
                 cur.execute("ALTER TABLE skeys ADD COLUMN tracing INTEGER DEFAULT 0")
-                conn.commit()
             except Exception as e:
                 print(f"Failed to add 'tracing' column: {e}")
 
@@ -248,7 +471,6 @@ class SkeyDB:
             print("Adding 'insulation' column to 'skeys' table...")
             try:
                 cur.execute("ALTER TABLE skeys ADD COLUMN insulation INTEGER DEFAULT 0")
-                conn.commit()
             except Exception as e:
                 print(f"Failed to add 'insulation' column: {e}")
 
@@ -325,8 +547,126 @@ class SkeyDB:
             )
             """
         )
-        conn.commit()
-        conn.close()
+
+    def _migrate_v2_current_revision_pointer(self, cur: sqlite3.Cursor):
+        """v2: add current_transaction_id to skeys/spindles and backfill it from geometry history."""
+        if not self._column_exists(cur, "skeys", "current_transaction_id"):
+            cur.execute("ALTER TABLE skeys ADD COLUMN current_transaction_id INTEGER")
+        cur.execute(
+            """
+            UPDATE skeys SET current_transaction_id = (
+                SELECT MAX(transaction_id) FROM geometry WHERE geometry.skey_id = skeys.id
+            )
+            """
+        )
+
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('spindles', 'spindle_geometry')")
+        spindle_tables = {row[0] for row in cur.fetchall()}
+        if "spindles" not in spindle_tables:
+            return
+        if not self._column_exists(cur, "spindles", "current_transaction_id"):
+            cur.execute("ALTER TABLE spindles ADD COLUMN current_transaction_id INTEGER")
+        if "spindle_geometry" in spindle_tables:
+            cur.execute(
+                """
+                UPDATE spindles SET current_transaction_id = (
+                    SELECT MAX(transaction_id) FROM spindle_geometry WHERE spindle_geometry.spindle_id = spindles.id
+                )
+                """
+            )
+
+    def _migrate_v3_geometry_blobs(self, cur: sqlite3.Cursor):
+        """v3: add the geometry_blobs table for packed geometry revisions."""
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geometry_blobs (
+                transaction_id INTEGER PRIMARY KEY,
+                skey_id INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                FOREIGN KEY (skey_id) REFERENCES skeys(id),
+                FOREIGN KEY (transaction_id) REFERENCES transactions(id)
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_geometry_blobs_skey ON geometry_blobs(skey_id)")
+
+    def _migrate_v4_geometry_deltas(self, cur: sqlite3.Cursor):
+        """v4: add the geometry_deltas table; existing revisions stay full snapshots (keyframes)."""
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS geometry_deltas (
+                transaction_id INTEGER PRIMARY KEY,
+                skey_id INTEGER NOT NULL,
+                base_transaction_id INTEGER NOT NULL,
+                depth INTEGER NOT NULL,
+                ops TEXT NOT NULL,
+                FOREIGN KEY (skey_id) REFERENCES skeys(id),
+                FOREIGN KEY (transaction_id) REFERENCES transactions(id)
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_geometry_deltas_skey_txn ON geometry_deltas(skey_id, transaction_id)")
+
+    def _migrate_v5_search_index(self, cur: sqlite3.Cursor):
+        """v5: add skey_translations and, when FTS5 is available, the skeys_fts search index."""
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS skey_translations (
+                skey_id INTEGER NOT NULL,
+                lang_code TEXT NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (skey_id, lang_code),
+                FOREIGN KEY (skey_id) REFERENCES skeys(id) ON DELETE CASCADE
+            )
+            """
+        )
+        if not self._fts5_available(cur.connection):
+            print("SQLite FTS5 is not available; skey search falls back to substring matching.")
+            return
+        for statement in SEARCH_INDEX_STATEMENTS:
+            cur.execute(statement)
+        cur.execute("DELETE FROM skeys_fts")
+        cur.execute(
+            f"""
+            INSERT INTO skeys_fts (
+                rowid, name, name_suffixes, skey_group_key, skey_subgroup_key, skey_description_key,
+                pcf_identification, idf_record, translations
+            )
+            SELECT id, name, {_NAME_SUFFIXES_SQL.replace("new.", "")}, skey_group_key, skey_subgroup_key,
+                   skey_description_key, pcf_identification, idf_record,
+                   (SELECT group_concat(text, ' ') FROM skey_translations WHERE skey_id = skeys.id)
+            FROM skeys
+            """
+        )
+
+    def _migrate_v6_change_log(self, cur: sqlite3.Cursor):
+        """v6: change_log table and the skeys triggers that fill it."""
+        for statement in CHANGE_LOG_STATEMENTS:
+            cur.execute(statement)
+
+    def _migrate_v7_history_indexes(self, cur: sqlite3.Cursor):
+        """v7: history lookup indexes that until now only _create_schema created."""
+        cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('geometry', 'transactions', 'spindle_geometry')")
+        tables = {row[0] for row in cur.fetchall()}
+        if "geometry" in tables:
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_geometry_skey_txn ON geometry(skey_id, transaction_id)")
+        if "transactions" in tables:
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_transactions_skey ON transactions(skey_id)")
+        if "spindle_geometry" in tables:
+            cur.execute(
+                "CREATE INDEX IF NOT EXISTS idx_spindle_geometry_spindle_txn "
+                "ON spindle_geometry(spindle_id, transaction_id)"
+            )
+
+    _MIGRATIONS = (
+        (1, _migrate_v1_legacy_columns),
+        (2, _migrate_v2_current_revision_pointer),
+        (3, _migrate_v3_geometry_blobs),
+        (4, _migrate_v4_geometry_deltas),
+        (5, _migrate_v5_search_index),
+        (6, _migrate_v6_change_log),
+        (7, _migrate_v7_history_indexes),
+    )
 
     def _ensure_symbol_source(self, name: str, source_type: str = "standard", version: str = "") -> int | None:
         source_name = (name or "").strip()
@@ -337,52 +677,106 @@ class SkeyDB:
         if source_type not in ("standard", "company", "project"):
             source_type = "standard"
 
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT id FROM symbol_sources WHERE name = ? AND source_type = ? AND COALESCE(version, '') = COALESCE(?, '')",
-            (source_name, source_type, version),
-        )
-        row = cur.fetchone()
-        if row:
-            conn.close()
-            return row[0]
+        with self.transaction() as cur:
+            cur.execute(
+                "SELECT id FROM symbol_sources WHERE name = ? AND source_type = ? AND COALESCE(version, '') = COALESCE(?, '')",
+                (source_name, source_type, version),
+            )
+            row = cur.fetchone()
+            if row:
+                return row[0]
 
-        cur.execute(
-            "INSERT INTO symbol_sources (name, source_type, version) VALUES (?, ?, ?)",
-            (source_name, source_type, version),
-        )
-        source_id = cur.lastrowid
-        conn.commit()
-        conn.close()
+            cur.execute(
+                "INSERT INTO symbol_sources (name, source_type, version) VALUES (?, ?, ?)",
+                (source_name, source_type, version),
+            )
+            source_id = cur.lastrowid
         return source_id if source_id is not None else None
 
-    def connect(self):
-        conn = sqlite3.connect(self.db_path)
+    def connect(self) -> sqlite3.Connection:
+        """Open a new configured connection. The caller owns it and must close it."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
         conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.OperationalError:
+            # Read-only media or file systems without shared memory support keep the rollback journal.
+            pass
+        conn.execute("PRAGMA synchronous = NORMAL")
         return conn
 
+    def _connection(self) -> sqlite3.Connection:
+        """Return the connection reused by the calling thread, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.connect()
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Group operations into one transaction on the thread's connection.
+
+        Nested calls become savepoints, so SkeyDB methods can be composed inside a
+        caller's transaction and are committed (or rolled back) together.
+        """
+        conn = self._connection()
+        depth = self._local.depth
+        savepoint = f"skeydb_{depth}"
+        conn.execute("BEGIN IMMEDIATE" if depth == 0 else f"SAVEPOINT {savepoint}")
+        self._local.depth = depth + 1
+        try:
+            yield conn.cursor()
+        except BaseException:
+            if depth == 0:
+                conn.execute("ROLLBACK")
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            if depth == 0:
+                conn.execute("COMMIT")
+                with self._connections_lock:
+                    self._commit_count += 1
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            self._local.depth = depth
+
+    def close(self) -> None:
+        """Close every connection opened by this instance, from any thread."""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
     def get_metadata(self, key: str) -> str | None:
-        conn = self.connect()
-        cur = conn.cursor()
+        cur = self._connection().cursor()
         cur.execute("SELECT value FROM app_metadata WHERE key = ?", (key,))
         row = cur.fetchone()
-        conn.close()
         return row[0] if row else None
 
     def set_metadata(self, key: str, value: str) -> None:
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO app_metadata (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
-            (key, value),
-        )
-        conn.commit()
-        conn.close()
+        with self.transaction() as cur:
+            cur.execute(
+                "INSERT INTO app_metadata (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                (key, value),
+            )
 
     def get_sync_conflicts(self) -> list[dict]:
-        conn = self.connect()
-        cur = conn.cursor()
+        cur = self._connection().cursor()
         cur.execute(
             """
             SELECT name, origin_type, sync_state, upstream_symbol_code,
@@ -393,7 +787,6 @@ class SkeyDB:
             """
         )
         rows = cur.fetchall()
-        conn.close()
         return [
             {
                 "name": row[0],
@@ -407,8 +800,7 @@ class SkeyDB:
         ]
 
     def get_catalog_symbol(self, release_version: str, symbol_code: str) -> dict | None:
-        conn = self.connect()
-        cur = conn.cursor()
+        cur = self._connection().cursor()
         cur.execute(
             """
             SELECT symbol_version, payload_hash, payload_json
@@ -418,7 +810,6 @@ class SkeyDB:
             (release_version, symbol_code),
         )
         row = cur.fetchone()
-        conn.close()
         if not row:
             return None
         return {
@@ -427,6 +818,45 @@ class SkeyDB:
             "payload": json.loads(row[2]),
         }
 
+    def get_catalog_hashes(self, release_version: str) -> Dict[str, tuple]:
+        """Map symbol_code -> (symbol_version, payload_hash) of a stored catalog release."""
+        cur = self._connection().cursor()
+        cur.execute(
+            "SELECT symbol_code, symbol_version, payload_hash FROM catalog_symbols WHERE release_version = ?",
+            (release_version,),
+        )
+        return {code: (version, payload_hash) for code, version, payload_hash in cur.fetchall()}
+
+    def get_upstream_states(self) -> Dict[str, tuple]:
+        """Map skey name -> (origin_type, is_user_modified, upstream_payload_hash,
+        upstream_release_version, upstream_symbol_version), for sync decisions in one query."""
+        cur = self._connection().cursor()
+        cur.execute(
+            """
+            SELECT name, origin_type, is_user_modified, upstream_payload_hash,
+                   upstream_release_version, upstream_symbol_version
+            FROM skeys
+            """
+        )
+        return {row[0]: row[1:] for row in cur.fetchall()}
+
+    def mark_official_skeys_current(self, release_version: str, symbols: Iterable[tuple]) -> None:
+        """Record that unchanged official skeys match release_version.
+
+        symbols holds (name, upstream_symbol_version) pairs; no geometry revision is written.
+        """
+        with self.transaction() as cur:
+            cur.executemany(
+                """
+                UPDATE skeys
+                SET upstream_release_version = ?,
+                    upstream_symbol_version = ?,
+                    last_synced_upstream_version = ?
+                WHERE name = ?
+                """,
+                [(release_version, version, version, name) for name, version in symbols],
+            )
+
     def upsert_catalog_symbol(
         self,
         release_version: str,
@@ -435,21 +865,18 @@ class SkeyDB:
         payload_hash: str,
         payload: dict,
     ) -> None:
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO catalog_symbols (release_version, symbol_code, symbol_version, payload_hash, payload_json)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(release_version, symbol_code) DO UPDATE SET
-                symbol_version=excluded.symbol_version,
-                payload_hash=excluded.payload_hash,
-                payload_json=excluded.payload_json
-            """,
-            (release_version, symbol_code, symbol_version, payload_hash, json.dumps(payload, ensure_ascii=False, sort_keys=True)),
-        )
-        conn.commit()
-        conn.close()
+        with self.transaction() as cur:
+            cur.execute(
+                """
+                INSERT INTO catalog_symbols (release_version, symbol_code, symbol_version, payload_hash, payload_json)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(release_version, symbol_code) DO UPDATE SET
+                    symbol_version=excluded.symbol_version,
+                    payload_hash=excluded.payload_hash,
+                    payload_json=excluded.payload_json
+                """,
+                (release_version, symbol_code, symbol_version, payload_hash, json.dumps(payload, ensure_ascii=False, sort_keys=True)),
+            )
 
     def upsert_official_skey(
         self,
@@ -460,372 +887,329 @@ class SkeyDB:
         upstream_payload_hash: str,
     ) -> str:
         """Upsert official symbol while preserving user-created and user-modified symbols."""
-        self.ensure_subgroup_exists(skey.group_key, skey.subgroup_key)
-
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            SELECT id, origin_type, is_user_modified
-            FROM skeys
-            WHERE name = ?
-            """,
-            (skey.name,),
-        )
-        row = cur.fetchone()
-
-        if not row:
-            spindle_skey = skey.spindle_skey or None
-            source_id = self._ensure_symbol_source(skey.source_name, skey.source_type, skey.source_version)
+        with self.transaction() as cur:
+            self.ensure_subgroup_exists(skey.group_key, skey.subgroup_key)
             cur.execute(
                 """
-                INSERT INTO skeys (
-                    name, skey_group_key, skey_subgroup_key, skey_description_key,
-                    spindle_skey, orientation, flow_arrow, dimensioned, tracing, insulation,
-                    pcf_identification, idf_record, user_definable, flow_dependency,
-                    source_id, isogen_standard,
-                    origin_type, is_official, is_user_modified,
-                    upstream_symbol_code, upstream_release_version,
-                    upstream_symbol_version, last_synced_upstream_version,
-                    upstream_payload_hash, local_revision, sync_state
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                SELECT id, origin_type, is_user_modified
+                FROM skeys
+                WHERE name = ?
                 """,
-                (
-                    skey.name, skey.group_key, skey.subgroup_key, skey.description_key,
-                    spindle_skey, skey.orientation, skey.flow_arrow, skey.dimensioned,
-                    skey.tracing, skey.insulation, skey.pcf_identification, skey.idf_record,
-                    skey.user_definable, skey.flow_dependency, source_id, skey.isogen_standard,
-                    "official", 1, 0,
-                    upstream_symbol_code, release_version,
-                    upstream_symbol_version, upstream_symbol_version,
-                    upstream_payload_hash, 1, "synced",
-                ),
+                (skey.name,),
             )
-            skey_id = cur.lastrowid
-            cur.execute(
-                "INSERT INTO transactions (skey_id, user, action, comment) VALUES (?, ?, ?, ?)",
-                (skey_id, "system", "create", f"official sync {release_version}"),
-            )
-            transaction_id = cur.lastrowid
-            for geom in skey.geometry:
+            row = cur.fetchone()
+
+            if not row:
+                spindle_skey = skey.spindle_skey or None
+                source_id = self._ensure_symbol_source(skey.source_name, skey.source_type, skey.source_version)
                 cur.execute(
-                    "INSERT INTO geometry (skey_id, type, data, transaction_id) VALUES (?, ?, ?, ?)",
-                    (skey_id, geom.split(":")[0], geom, transaction_id),
+                    """
+                    INSERT INTO skeys (
+                        name, skey_group_key, skey_subgroup_key, skey_description_key,
+                        spindle_skey, orientation, flow_arrow, dimensioned, tracing, insulation,
+                        pcf_identification, idf_record, user_definable, flow_dependency,
+                        source_id, isogen_standard,
+                        origin_type, is_official, is_user_modified,
+                        upstream_symbol_code, upstream_release_version,
+                        upstream_symbol_version, last_synced_upstream_version,
+                        upstream_payload_hash, local_revision, sync_state
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        skey.name, skey.group_key, skey.subgroup_key, skey.description_key,
+                        spindle_skey, skey.orientation, skey.flow_arrow, skey.dimensioned,
+                        skey.tracing, skey.insulation, skey.pcf_identification, skey.idf_record,
+                        skey.user_definable, skey.flow_dependency, source_id, skey.isogen_standard,
+                        "official", 1, 0,
+                        upstream_symbol_code, release_version,
+                        upstream_symbol_version, upstream_symbol_version,
+                        upstream_payload_hash, 1, "synced",
+                    ),
                 )
-            conn.commit()
-            conn.close()
-            return "inserted"
+                skey_id = cur.lastrowid
+                self._insert_revision(cur, skey_id, skey.geometry, "system", "create", f"official sync {release_version}")
+                return "inserted"
 
-        skey_id, origin_type, is_user_modified = row
+            skey_id, origin_type, is_user_modified = row
 
-        if origin_type in ("user", "imported"):
-            cur.execute(
-                """
-                UPDATE skeys
-                SET upstream_symbol_code = ?,
-                    upstream_release_version = ?,
-                    upstream_symbol_version = ?,
-                    upstream_payload_hash = ?,
-                    sync_state = 'upstream_newer'
-                WHERE id = ?
-                """,
-                (
-                    upstream_symbol_code,
-                    release_version,
-                    upstream_symbol_version,
-                    upstream_payload_hash,
-                    skey_id,
-                ),
-            )
-            conn.commit()
-            conn.close()
-            return "skipped_user"
+            if origin_type in ("user", "imported"):
+                cur.execute(
+                    """
+                    UPDATE skeys
+                    SET upstream_symbol_code = ?,
+                        upstream_release_version = ?,
+                        upstream_symbol_version = ?,
+                        upstream_payload_hash = ?,
+                        sync_state = 'upstream_newer'
+                    WHERE id = ?
+                    """,
+                    (
+                        upstream_symbol_code,
+                        release_version,
+                        upstream_symbol_version,
+                        upstream_payload_hash,
+                        skey_id,
+                    ),
+                )
+                return "skipped_user"
 
-        if is_user_modified:
+            if is_user_modified:
+                cur.execute(
+                    """
+                    UPDATE skeys
+                    SET upstream_symbol_code = ?,
+                        upstream_release_version = ?,
+                        upstream_symbol_version = ?,
+                        upstream_payload_hash = ?,
+                        sync_state = 'conflict'
+                    WHERE id = ?
+                    """,
+                    (
+                        upstream_symbol_code,
+                        release_version,
+                        upstream_symbol_version,
+                        upstream_payload_hash,
+                        skey_id,
+                    ),
+                )
+                return "conflict"
+
+            spindle_skey = skey.spindle_skey or None
+            source_id = self._ensure_symbol_source(skey.source_name, skey.source_type, skey.source_version)
             cur.execute(
                 """
-                UPDATE skeys
-                SET upstream_symbol_code = ?,
+                UPDATE skeys SET
+                    skey_group_key = ?,
+                    skey_subgroup_key = ?,
+                    skey_description_key = ?,
+                    spindle_skey = ?,
+                    orientation = ?,
+                    flow_arrow = ?,
+                    dimensioned = ?,
+                    tracing = ?,
+                    insulation = ?,
+                    pcf_identification = ?,
+                    idf_record = ?,
+                    user_definable = ?,
+                    flow_dependency = ?,
+                    source_id = ?,
+                    isogen_standard = ?,
+                    origin_type = 'official',
+                    is_official = 1,
+                    is_user_modified = 0,
+                    upstream_symbol_code = ?,
                     upstream_release_version = ?,
                     upstream_symbol_version = ?,
+                    last_synced_upstream_version = ?,
                     upstream_payload_hash = ?,
-                    sync_state = 'conflict'
+                    sync_state = 'synced'
                 WHERE id = ?
                 """,
                 (
-                    upstream_symbol_code,
-                    release_version,
-                    upstream_symbol_version,
-                    upstream_payload_hash,
+                    skey.group_key, skey.subgroup_key, skey.description_key,
+                    spindle_skey, skey.orientation, skey.flow_arrow, skey.dimensioned,
+                    skey.tracing, skey.insulation,
+                    skey.pcf_identification, skey.idf_record, skey.user_definable,
+                    skey.flow_dependency, source_id, skey.isogen_standard,
+                    upstream_symbol_code, release_version, upstream_symbol_version,
+                    upstream_symbol_version, upstream_payload_hash,
                     skey_id,
                 ),
             )
-            conn.commit()
-            conn.close()
-            return "conflict"
+            self._insert_revision(cur, skey_id, skey.geometry, "system", "edit", f"official sync {release_version}")
+            return "updated"
+
+    def get_all_skeys(self) -> List[SkeyData]:
+        cur = self._connection().cursor()
+        cur.row_factory = _skey_row_factory
+        cur.execute(SKEY_SELECT_SQL + " ORDER BY s.name")
+        rows = cur.fetchall()
+        cur = self._connection().cursor()
+        geometry_by_skey = self._fetch_latest_geometry(cur, "skeys", "geometry", "skey_id")
+        geometry_by_skey.update(self._fetch_packed_geometry(cur))
+        return [self._skey_from_row(row, geometry_by_skey.get(row.id, [])) for row in rows]
+
+    def get_all_skey_metadata(self) -> List[SkeyData]:
+        """Load every skey without geometry (geometry is left empty); see get_skey_geometry."""
+        cur = self._connection().cursor()
+        cur.row_factory = _skey_row_factory
+        cur.execute(SKEY_SELECT_SQL + " ORDER BY s.name")
+        return [self._skey_from_row(row, []) for row in cur.fetchall()]
+
+    def get_skey_metadata(self, skey_name: str) -> SkeyData | None:
+        """Load one skey without geometry; None if it does not exist."""
+        cur = self._connection().cursor()
+        cur.row_factory = _skey_row_factory
+        cur.execute(SKEY_SELECT_SQL + " WHERE s.name = ?", (skey_name,))
+        row = cur.fetchone()
+        return self._skey_from_row(row, []) if row else None
 
-        spindle_skey = skey.spindle_skey or None
-        source_id = self._ensure_symbol_source(skey.source_name, skey.source_type, skey.source_version)
+    def get_skey_metadata_by_group(self, group_key: str, subgroup_key: str | None = None) -> List[SkeyData]:
+        """Load the skeys of a group (or of one of its subgroups) without geometry."""
+        cur = self._connection().cursor()
+        cur.row_factory = _skey_row_factory
         cur.execute(
-            """
-            UPDATE skeys SET
-                skey_group_key = ?,
-                skey_subgroup_key = ?,
-                skey_description_key = ?,
-                spindle_skey = ?,
-                orientation = ?,
-                flow_arrow = ?,
-                dimensioned = ?,
-                tracing = ?,
-                insulation = ?,
-                pcf_identification = ?,
-                idf_record = ?,
-                user_definable = ?,
-                flow_dependency = ?,
-                source_id = ?,
-                isogen_standard = ?,
-                origin_type = 'official',
-                is_official = 1,
-                is_user_modified = 0,
-                upstream_symbol_code = ?,
-                upstream_release_version = ?,
-                upstream_symbol_version = ?,
-                last_synced_upstream_version = ?,
-                upstream_payload_hash = ?,
-                sync_state = 'synced'
-            WHERE id = ?
-            """,
-            (
-                skey.group_key, skey.subgroup_key, skey.description_key,
-                spindle_skey, skey.orientation, skey.flow_arrow, skey.dimensioned,
-                skey.tracing, skey.insulation,
-                skey.pcf_identification, skey.idf_record, skey.user_definable,
-                skey.flow_dependency, source_id, skey.isogen_standard,
-                upstream_symbol_code, release_version, upstream_symbol_version,
-                upstream_symbol_version, upstream_payload_hash,
-                skey_id,
-            ),
+            SKEY_SELECT_SQL + " WHERE s.skey_group_key = ? AND (? IS NULL OR s.skey_subgroup_key = ?) ORDER BY s.name",
+            (group_key, subgroup_key, subgroup_key),
         )
+        return [self._skey_from_row(row, []) for row in cur.fetchall()]
+
+    def get_skey_metadata_by_ids(self, skey_ids: Iterable[int]) -> List[SkeyData]:
+        """Load the given skeys without geometry; ids that no longer exist are skipped."""
+        cur = self._connection().cursor()
+        cur.row_factory = _skey_row_factory
         cur.execute(
-            "INSERT INTO transactions (skey_id, user, action, comment) VALUES (?, ?, ?, ?)",
-            (skey_id, "system", "edit", f"official sync {release_version}"),
+            SKEY_SELECT_SQL + " WHERE s.id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(skey_ids)),),
         )
-        transaction_id = cur.lastrowid
-        for geom in skey.geometry:
-            cur.execute(
-                "INSERT INTO geometry (skey_id, type, data, transaction_id) VALUES (?, ?, ?, ?)",
-                (skey_id, geom.split(":")[0], geom, transaction_id),
-            )
-        conn.commit()
-        conn.close()
-        return "updated"
+        return [self._skey_from_row(row, []) for row in cur.fetchall()]
+
+    def change_token(self) -> tuple:
+        """Value that changes whenever skeys or spindles were committed to, by this instance or another process.
+
+        Built only from state shared by every connection (the change log position, the
+        spindle revision marker and this instance's commit count), so tokens taken on
+        different threads compare equal when nothing changed.
+        """
+        change_seq, *spindle_marker = self._connection().execute(
+            "SELECT (SELECT COALESCE(MAX(seq), 0) FROM change_log), COUNT(*), COALESCE(MAX(id), 0) "
+            "FROM spindle_transactions"
+        ).fetchone()
+        return change_seq, *spindle_marker, self._commit_count
+
+    def latest_change_seq(self) -> int:
+        return self._connection().execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+
+    def library_state_key(self) -> tuple:
+        """Identify the stored library state, for validating caches across processes.
+
+        Combines the DB file identity and schema version with the change log position
+        and the spindle revision count. PRAGMA data_version is per connection, so it
+        cannot tell one process about another's earlier writes.
+        """
+        try:
+            stat = os.stat(self.db_path)
+            identity = (os.path.realpath(self.db_path), stat.st_dev, stat.st_ino)
+        except OSError:
+            identity = (self.db_path, 0, 0)
+        cur = self._connection().cursor()
+        change_seq = cur.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+        spindle_marker = cur.execute(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM spindle_transactions"
+        ).fetchone()
+        return (*identity, SCHEMA_VERSION, change_seq, *spindle_marker)
+
+    def get_changes_since(self, seq: int) -> tuple[int, list[tuple]] | None:
+        """Return (latest seq, [(seq, skey_id, name, op), ...]) for skeys changes after seq.
+
+        Returns None if entries after seq were pruned, in which case the caller must reload everything.
+        """
+        cur = self._connection().cursor()
+        cur.execute("SELECT MIN(seq) FROM change_log")
+        first_seq = cur.fetchone()[0]
+        if first_seq is not None and first_seq > seq + 1:
+            return None
+        cur.execute("SELECT seq, skey_id, name, op FROM change_log WHERE seq > ? ORDER BY seq", (seq,))
+        changes = cur.fetchall()
+        return (changes[-1][0] if changes else seq), changes
 
-    def get_all_skeys(self) -> List[SkeyData]:
-        conn = self.connect()
-        cur = conn.cursor()
-        has_tracing = self._column_exists(cur, "skeys", "tracing")
-        has_insulation = self._column_exists(cur, "skeys", "insulation")
-        has_pcf = self._column_exists(cur, "skeys", "pcf_identification")
-        has_idf = self._column_exists(cur, "skeys", "idf_record")
-        has_user_definable = self._column_exists(cur, "skeys", "user_definable")
-        has_flow_dependency = self._column_exists(cur, "skeys", "flow_dependency")
-        has_source_id = self._column_exists(cur, "skeys", "source_id")
-        has_isogen_standard = self._column_exists(cur, "skeys", "isogen_standard")
-        has_origin_type = self._column_exists(cur, "skeys", "origin_type")
-        has_is_official = self._column_exists(cur, "skeys", "is_official")
-        has_is_user_modified = self._column_exists(cur, "skeys", "is_user_modified")
-        has_upstream_symbol_code = self._column_exists(cur, "skeys", "upstream_symbol_code")
-        has_upstream_release_version = self._column_exists(cur, "skeys", "upstream_release_version")
-        has_upstream_symbol_version = self._column_exists(cur, "skeys", "upstream_symbol_version")
-        has_last_synced_upstream_version = self._column_exists(cur, "skeys", "last_synced_upstream_version")
-        has_upstream_payload_hash = self._column_exists(cur, "skeys", "upstream_payload_hash")
-        has_local_revision = self._column_exists(cur, "skeys", "local_revision")
-        has_sync_state = self._column_exists(cur, "skeys", "sync_state")
-
-        select_columns = [
-            "s.id", "s.name", "s.skey_group_key", "s.skey_subgroup_key", "s.skey_description_key",
-            "s.spindle_skey", "s.orientation", "s.flow_arrow", "s.dimensioned",
-        ]
-        if has_tracing:
-            select_columns.append("s.tracing")
-        if has_insulation:
-            select_columns.append("s.insulation")
-        if has_pcf:
-            select_columns.append("s.pcf_identification")
-        if has_idf:
-            select_columns.append("s.idf_record")
-        if has_user_definable:
-            select_columns.append("s.user_definable")
-        if has_flow_dependency:
-            select_columns.append("s.flow_dependency")
-        if has_source_id:
-            select_columns.extend(["s.source_id", "ss.name", "ss.source_type", "ss.version"])
-        if has_isogen_standard:
-            select_columns.append("s.isogen_standard")
-        if has_origin_type:
-            select_columns.append("s.origin_type")
-        if has_is_official:
-            select_columns.append("s.is_official")
-        if has_is_user_modified:
-            select_columns.append("s.is_user_modified")
-        if has_upstream_symbol_code:
-            select_columns.append("s.upstream_symbol_code")
-        if has_upstream_release_version:
-            select_columns.append("s.upstream_release_version")
-        if has_upstream_symbol_version:
-            select_columns.append("s.upstream_symbol_version")
-        if has_last_synced_upstream_version:
-            select_columns.append("s.last_synced_upstream_version")
-        if has_upstream_payload_hash:
-            select_columns.append("s.upstream_payload_hash")
-        if has_local_revision:
-            select_columns.append("s.local_revision")
-        if has_sync_state:
-            select_columns.append("s.sync_state")
-
-        query = f"SELECT {', '.join(select_columns)} FROM skeys s"
-        if has_source_id:
-            query += " LEFT JOIN symbol_sources ss ON ss.id = s.source_id"
-        query += " ORDER BY s.name"
-        cur.execute(query)
+    @staticmethod
+    def _skey_from_row(row: SkeyRow, geometry: List[str]) -> SkeyData:
+        return SkeyData(
+            name=row.name,
+            group_key=row.group_key,
+            subgroup_key=row.subgroup_key,
+            description_key=row.description_key,
+            spindle_skey=row.spindle_skey or "",  # NULL -> '' for the model
+            orientation=row.orientation,
+            flow_arrow=row.flow_arrow,
+            dimensioned=row.dimensioned,
+            tracing=row.tracing or 0,
+            insulation=row.insulation or 0,
+            pcf_identification=row.pcf_identification or "",
+            idf_record=row.idf_record or "",
+            user_definable=row.user_definable,
+            flow_dependency=row.flow_dependency,
+            source_id=row.source_id,
+            source_name=row.source_name or "",
+            source_type=row.source_type or "standard",
+            source_version=row.source_version or "",
+            isogen_standard=row.isogen_standard,
+            origin_type=row.origin_type or "user",
+            is_official=row.is_official or 0,
+            is_user_modified=row.is_user_modified or 0,
+            upstream_symbol_code=row.upstream_symbol_code or "",
+            upstream_release_version=row.upstream_release_version or "",
+            upstream_symbol_version=row.upstream_symbol_version or 1,
+            last_synced_upstream_version=row.last_synced_upstream_version or 1,
+            upstream_payload_hash=row.upstream_payload_hash or "",
+            local_revision=row.local_revision or 1,
+            sync_state=row.sync_state or "synced",
+            geometry=geometry,
+        )
 
-        rows = cur.fetchall()
-        skeys = []
-        for row in rows:
-            idx = 0
-            skey_id = row[idx]; idx += 1
-            name = row[idx]; idx += 1
-            skey_group_key = row[idx]; idx += 1
-            skey_subgroup_key = row[idx]; idx += 1
-            skey_description_key = row[idx]; idx += 1
-            spindle_skey = row[idx]; idx += 1
-            orientation = row[idx]; idx += 1
-            flow_arrow = row[idx]; idx += 1
-            dimensioned = row[idx]; idx += 1
-
-            tracing = row[idx] if has_tracing else 0
-            if has_tracing:
-                idx += 1
-            insulation = row[idx] if has_insulation else 0
-            if has_insulation:
-                idx += 1
-
-            pcf_identification = row[idx] if has_pcf else ""
-            if has_pcf:
-                idx += 1
-            idf_record = row[idx] if has_idf else ""
-            if has_idf:
-                idx += 1
-            user_definable = row[idx] if has_user_definable else 1
-            if has_user_definable:
-                idx += 1
-            flow_dependency = row[idx] if has_flow_dependency else 0
-            if has_flow_dependency:
-                idx += 1
-
-            source_id = row[idx] if has_source_id else None
-            source_name = ""
-            source_type = "standard"
-            source_version = ""
-            if has_source_id:
-                idx += 1
-                source_name = row[idx] or ""
-                idx += 1
-                source_type = row[idx] or "standard"
-                idx += 1
-                source_version = row[idx] or ""
-                idx += 1
-
-            isogen_standard = row[idx] if has_isogen_standard else 0
-            if has_isogen_standard:
-                idx += 1
-
-            origin_type = row[idx] if has_origin_type else "user"
-            if has_origin_type:
-                idx += 1
-            is_official = row[idx] if has_is_official else 0
-            if has_is_official:
-                idx += 1
-            is_user_modified = row[idx] if has_is_user_modified else 0
-            if has_is_user_modified:
-                idx += 1
-            upstream_symbol_code = row[idx] if has_upstream_symbol_code else ""
-            if has_upstream_symbol_code:
-                idx += 1
-            upstream_release_version = row[idx] if has_upstream_release_version else ""
-            if has_upstream_release_version:
-                idx += 1
-            upstream_symbol_version = row[idx] if has_upstream_symbol_version else 1
-            if has_upstream_symbol_version:
-                idx += 1
-            last_synced_upstream_version = row[idx] if has_last_synced_upstream_version else 1
-            if has_last_synced_upstream_version:
-                idx += 1
-            upstream_payload_hash = row[idx] if has_upstream_payload_hash else ""
-            if has_upstream_payload_hash:
-                idx += 1
-            local_revision = row[idx] if has_local_revision else 1
-            if has_local_revision:
-                idx += 1
-            sync_state = row[idx] if has_sync_state else "synced"
-
-            geometry = self.get_latest_geometry_for_skey(skey_id)
-            skeys.append(SkeyData(
-                name=name,
-                group_key=skey_group_key,
-                subgroup_key=skey_subgroup_key,
-                description_key=skey_description_key,
-                spindle_skey=spindle_skey or "",  # NULL -> '' for the model
-                orientation=orientation,
-                flow_arrow=flow_arrow,
-                dimensioned=dimensioned,
-                tracing=tracing,
-                insulation=insulation,
-                pcf_identification=pcf_identification or "",
-                idf_record=idf_record or "",
-                user_definable=user_definable,
-                flow_dependency=flow_dependency,
-                source_id=source_id,
-                source_name=source_name,
-                source_type=source_type,
-                source_version=source_version,
-                isogen_standard=isogen_standard,
-                origin_type=origin_type or "user",
-                is_official=is_official or 0,
-                is_user_modified=is_user_modified or 0,
-                upstream_symbol_code=upstream_symbol_code or "",
-                upstream_release_version=upstream_release_version or "",
-                upstream_symbol_version=upstream_symbol_version or 1,
-                last_synced_upstream_version=last_synced_upstream_version or 1,
-                upstream_payload_hash=upstream_payload_hash or "",
-                local_revision=local_revision or 1,
-                sync_state=sync_state or "synced",
-                geometry=geometry
-            ))
-        conn.close()
-        return skeys
+    @staticmethod
+    def _fetch_latest_geometry(
+        cur: sqlite3.Cursor, owner_table: str, geometry_table: str, owner_column: str
+    ) -> Dict[int, List[str]]:
+        """Fetch the current-revision geometry of every owner in one indexed join."""
+        cur.execute(
+            f"""
+            SELECT o.id, g.data
+            FROM {owner_table} o
+            JOIN {geometry_table} g ON g.{owner_column} = o.id AND g.transaction_id = o.current_transaction_id
+            ORDER BY o.id, g.id
+            """
+        )
+        geometry_by_owner: Dict[int, List[str]] = {}
+        for owner_id, data in cur.fetchall():
+            geometry_by_owner.setdefault(owner_id, []).append(data)
+        return geometry_by_owner
+
+    @staticmethod
+    def _fetch_packed_geometry(cur: sqlite3.Cursor) -> Dict[int, List[str]]:
+        """Fetch the current revision of every skey stored in packed form, one row per skey."""
+        cur.execute(
+            """
+            SELECT s.id, b.data FROM skeys s
+            JOIN geometry_blobs b ON b.transaction_id = s.current_transaction_id
+            """
+        )
+        return {skey_id: unpack_geometry(data) for skey_id, data in cur.fetchall()}
 
     def get_latest_geometry_for_skey(self, skey_id: int) -> List[str]:
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT MAX(transaction_id) FROM geometry WHERE skey_id = ?", (skey_id,))
-        row = cur.fetchone()
-        if not row or row[0] is None:
-            conn.close()
-            return []
-        transaction_id = row[0]
-        cur.execute("SELECT data FROM geometry WHERE skey_id = ? AND transaction_id = ? ORDER BY id ASC", (skey_id, transaction_id))
-        geometry = [r[0] for r in cur.fetchall()]
-        conn.close()
-        return geometry
+        """Fetch the latest geometry of a single skey (use get_all_skeys for bulk loads)."""
+        return self._fetch_current_geometry("s.id = ?", skey_id)
 
-    def insert_skey(self, skey: SkeyData, user: str = "system", comment: str = "create") -> int:
-        conn = self.connect()
-        cur = conn.cursor()
-        spindle_skey = skey.spindle_skey or None  # '' -> NULL for proper FK behavior
-        source_id = skey.source_id if skey.source_id is not None else self._ensure_symbol_source(
-            skey.source_name, skey.source_type, skey.source_version
+    def get_skey_geometry(self, skey_name: str) -> List[str]:
+        """Fetch the current geometry of a single skey by name."""
+        return self._fetch_current_geometry("s.name = ?", skey_name)
+
+    def _fetch_current_geometry(self, where: str, value) -> List[str]:
+        cur = self._connection().cursor()
+        cur.execute(
+            f"""
+            SELECT b.data FROM skeys s
+            JOIN geometry_blobs b ON b.transaction_id = s.current_transaction_id
+            WHERE {where}
+            """,
+            (value,),
         )
+        row = cur.fetchone()
+        if row:
+            return unpack_geometry(row[0])
+        cur.execute(
+            f"""
+            SELECT g.data FROM skeys s
+            JOIN geometry g ON g.skey_id = s.id AND g.transaction_id = s.current_transaction_id
+            WHERE {where}
+            ORDER BY g.id ASC
+            """,
+            (value,),
+        )
+        return [r[0] for r in cur.fetchall()]
+
+    def _insert_skey_row(self, cur: sqlite3.Cursor, skey: SkeyData, source_id: int | None) -> int:
         cur.execute(
             """
             INSERT INTO skeys (
@@ -839,53 +1223,11 @@ class SkeyDB:
                 upstream_payload_hash, local_revision, sync_state
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                skey.name, skey.group_key, skey.subgroup_key, skey.description_key,
-                spindle_skey, skey.orientation, skey.flow_arrow, skey.dimensioned,
-                skey.tracing, skey.insulation,
-                skey.pcf_identification, skey.idf_record, skey.user_definable,
-                skey.flow_dependency, source_id, skey.isogen_standard,
-                skey.origin_type, skey.is_official, skey.is_user_modified,
-                skey.upstream_symbol_code, skey.upstream_release_version,
-                skey.upstream_symbol_version, skey.last_synced_upstream_version,
-                skey.upstream_payload_hash, skey.local_revision, skey.sync_state,
-            ),
+            (skey.name, *self._skey_row_values(skey, source_id)),
         )
-        skey_id = cur.lastrowid
-        cur.execute("INSERT INTO transactions (skey_id, user, action, comment) VALUES (?, ?, ?, ?)", (skey_id, user, "create", comment))
-        transaction_id = cur.lastrowid
-        for geom in skey.geometry:
-            cur.execute("INSERT INTO geometry (skey_id, type, data, transaction_id) VALUES (?, ?, ?, ?)", (skey_id, geom.split(":")[0], geom, transaction_id))
-        conn.commit()
-        conn.close()
-        return skey_id if skey_id is not None else 0
-
-    def delete_skey(self, skey_name: str):
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id FROM skeys WHERE name = ?", (skey_name,))
-        row = cur.fetchone()
-        if row:
-            skey_id = row[0]
-            cur.execute("DELETE FROM geometry WHERE skey_id = ?", (skey_id,))
-            cur.execute("DELETE FROM transactions WHERE skey_id = ?", (skey_id,))
-            cur.execute("DELETE FROM skeys WHERE id = ?", (skey_id,))
-            conn.commit()
-        conn.close()
+        return cur.lastrowid or 0
 
-    def update_skey(self, skey: SkeyData, user: str = "system", comment: str = "edit"):
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id FROM skeys WHERE name = ?", (skey.name,))
-        row = cur.fetchone()
-        if not row:
-            conn.close()
-            return self.insert_skey(skey, user, comment)
-        skey_id = row[0]
-        spindle_skey = skey.spindle_skey or None  # '' → NULL
-        source_id = skey.source_id if skey.source_id is not None else self._ensure_symbol_source(
-            skey.source_name, skey.source_type, skey.source_version
-        )
+    def _update_skey_row(self, cur: sqlite3.Cursor, skey_id: int, skey: SkeyData, source_id: int | None) -> None:
         cur.execute(
             """
             UPDATE skeys SET
@@ -916,56 +1258,618 @@ class SkeyDB:
                 sync_state = ?
             WHERE id = ?
             """,
-            (
-                skey.group_key, skey.subgroup_key, skey.description_key,
-                spindle_skey, skey.orientation, skey.flow_arrow, skey.dimensioned,
-                skey.tracing, skey.insulation,
-                skey.pcf_identification, skey.idf_record, skey.user_definable,
-                skey.flow_dependency, source_id, skey.isogen_standard,
-                skey.origin_type, skey.is_official, skey.is_user_modified,
-                skey.upstream_symbol_code, skey.upstream_release_version,
-                skey.upstream_symbol_version, skey.last_synced_upstream_version,
-                skey.upstream_payload_hash, skey.local_revision, skey.sync_state,
-                skey_id,
-            ),
+            (*self._skey_row_values(skey, source_id), skey_id),
+        )
+
+    @staticmethod
+    def _skey_row_values(skey: SkeyData, source_id: int | None) -> tuple:
+        """Column values shared by the skeys INSERT and UPDATE statements (name and id excluded)."""
+        return (
+            skey.group_key, skey.subgroup_key, skey.description_key,
+            skey.spindle_skey or None,  # '' -> NULL for proper FK behavior
+            skey.orientation, skey.flow_arrow, skey.dimensioned,
+            skey.tracing, skey.insulation,
+            skey.pcf_identification, skey.idf_record, skey.user_definable,
+            skey.flow_dependency, source_id, skey.isogen_standard,
+            skey.origin_type, skey.is_official, skey.is_user_modified,
+            skey.upstream_symbol_code, skey.upstream_release_version,
+            skey.upstream_symbol_version, skey.last_synced_upstream_version,
+            skey.upstream_payload_hash, skey.local_revision, skey.sync_state,
+        )
+
+    def _insert_revision(
+        self, cur: sqlite3.Cursor, skey_id: int, geometry: List[str], user: str, action: str, comment: str
+    ) -> int:
+        """Record a new transaction for skey_id and store its geometry.
+
+        The new revision becomes the head and is stored in full. Unless it is a
+        keyframe it also gets a delta against the previous head, whose full copy
+        is then dropped (keyframes keep theirs). A revision without geometry
+        leaves current_transaction_id on the previous snapshot.
+        """
+        cur.execute(
+            "INSERT INTO transactions (skey_id, user, action, comment) VALUES (?, ?, ?, ?)",
+            (skey_id, user, action, comment),
         )
-        cur.execute("INSERT INTO transactions (skey_id, user, action, comment) VALUES (?, ?, ?, ?)", (skey_id, user, "edit", comment))
         transaction_id = cur.lastrowid
-        for geom in skey.geometry:
-            cur.execute("INSERT INTO geometry (skey_id, type, data, transaction_id) VALUES (?, ?, ?, ?)", (skey_id, geom.split(":")[0], geom, transaction_id))
-        conn.commit()
-        conn.close()
-        return skey_id if skey_id is not None else 0
+        if geometry:
+            tables = self._HISTORY_TABLES[0]
+            cur.execute(
+                """
+                SELECT s.current_transaction_id, d.depth FROM skeys s
+                LEFT JOIN geometry_deltas d ON d.transaction_id = s.current_transaction_id
+                WHERE s.id = ?
+                """,
+                (skey_id,),
+            )
+            previous_txn, previous_depth = cur.fetchone() or (None, None)
+            if previous_txn is not None:
+                depth = (previous_depth or 0) + 1
+                if depth < KEYFRAME_INTERVAL:
+                    previous_geometry = self._read_snapshot(cur, tables, skey_id, previous_txn)
+                    cur.execute(
+                        "INSERT INTO geometry_deltas (transaction_id, skey_id, base_transaction_id, depth, ops) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (transaction_id, skey_id, previous_txn, depth,
+                         json.dumps(diff_geometry(previous_geometry, geometry))),
+                    )
+                if previous_depth:
+                    self._drop_snapshot(cur, tables, skey_id, previous_txn)
+            self._write_snapshot(
+                cur, tables, skey_id, transaction_id, geometry, self._geometry_storage(cur) == "packed"
+            )
+            cur.execute("UPDATE skeys SET current_transaction_id = ? WHERE id = ?", (transaction_id, skey_id))
+        return transaction_id
 
-    def get_spindle_geometry(self, spindle_name: str) -> List[str]:
+    @staticmethod
+    def _write_snapshot(
+        cur: sqlite3.Cursor, tables: HistoryTables, owner_id: int, transaction_id: int,
+        geometry: List[str], packed: bool = False,
+    ) -> None:
+        if packed and tables.blobs:
+            cur.execute(
+                f"INSERT INTO {tables.blobs} (transaction_id, {tables.owner_column}, data) VALUES (?, ?, ?)",
+                (transaction_id, owner_id, pack_geometry(geometry)),
+            )
+        else:
+            cur.executemany(
+                f"INSERT INTO {tables.geometry} ({tables.owner_column}, type, data, transaction_id) VALUES (?, ?, ?, ?)",
+                [(owner_id, geom.split(":")[0], geom, transaction_id) for geom in geometry],
+            )
 
-        conn = self.connect()
-        cur = conn.cursor()
-        try:
-            cur.execute("SELECT id FROM spindles WHERE name = ?", (spindle_name,))
+    @staticmethod
+    def _drop_snapshot(cur: sqlite3.Cursor, tables: HistoryTables, owner_id: int, transaction_id: int) -> None:
+        cur.execute(
+            f"DELETE FROM {tables.geometry} WHERE {tables.owner_column} = ? AND transaction_id = ?",
+            (owner_id, transaction_id),
+        )
+        if tables.blobs:
+            cur.execute(f"DELETE FROM {tables.blobs} WHERE transaction_id = ?", (transaction_id,))
+
+    @staticmethod
+    def _read_snapshot(cur: sqlite3.Cursor, tables: HistoryTables, owner_id: int, transaction_id: int) -> List[str]:
+        """Full geometry stored for transaction_id, or [] if that revision is kept as a delta."""
+        if tables.blobs:
+            cur.execute(f"SELECT data FROM {tables.blobs} WHERE transaction_id = ?", (transaction_id,))
+            row = cur.fetchone()
+            if row:
+                return unpack_geometry(row[0])
+        cur.execute(
+            f"SELECT data FROM {tables.geometry} WHERE {tables.owner_column} = ? AND transaction_id = ? ORDER BY id",
+            (owner_id, transaction_id),
+        )
+        return [r[0] for r in cur.fetchall()]
+
+    def _geometry_at(self, cur: sqlite3.Cursor, tables: HistoryTables, owner_id: int, transaction_id: int) -> List[str]:
+        """Rebuild the geometry that was current at transaction_id from the nearest full snapshot."""
+        sources = [tables.geometry] + [table for table in (tables.blobs, tables.deltas) if table]
+        cur.execute(
+            "SELECT MAX(transaction_id) FROM ("
+            + " UNION ALL ".join(
+                f"SELECT MAX(transaction_id) AS transaction_id FROM {table} "
+                f"WHERE {tables.owner_column} = :owner AND transaction_id <= :txn"
+                for table in sources
+            )
+            + ")",
+            {"owner": owner_id, "txn": transaction_id},
+        )
+        txn = cur.fetchone()[0]
+        deltas = []
+        while txn is not None:
+            geometry = self._read_snapshot(cur, tables, owner_id, txn)
+            if geometry:
+                for delta in reversed(deltas):
+                    geometry = apply_geometry_delta(geometry, delta)
+                return geometry
+            if not tables.deltas:
+                break
+            cur.execute(f"SELECT base_transaction_id, ops FROM {tables.deltas} WHERE transaction_id = ?", (txn,))
+            row = cur.fetchone()
+            if row is None:
+                break
+            txn = row[0]
+            deltas.append(json.loads(row[1]))
+        return []
+
+    @staticmethod
+    def _geometry_storage(cur: sqlite3.Cursor) -> str:
+        cur.execute("SELECT value FROM app_metadata WHERE key = ?", (GEOMETRY_STORAGE_KEY,))
+        row = cur.fetchone()
+        return row[0] if row else "text"
+
+    def get_geometry_storage(self) -> str:
+        """Return how new geometry revisions are written: 'text' or 'packed'."""
+        return self._geometry_storage(self._connection().cursor())
+
+    def set_geometry_storage(self, mode: str) -> int:
+        """Switch geometry storage mode and convert every stored revision to it.
+
+        Returns the number of revisions converted. The conversion is lossless in
+        both directions and runs in a single transaction.
+        """
+        if mode not in GEOMETRY_STORAGE_MODES:
+            raise ValueError(f"Unknown geometry storage mode: {mode!r}")
+
+        with self.transaction() as cur:
+            if mode == "packed":
+                cur.execute("SELECT transaction_id, skey_id, data FROM geometry ORDER BY transaction_id, id")
+                revisions: Dict[int, tuple] = {}
+                for transaction_id, skey_id, data in cur.fetchall():
+                    revisions.setdefault(transaction_id, (skey_id, []))[1].append(data)
+                cur.executemany(
+                    "INSERT INTO geometry_blobs (transaction_id, skey_id, data) VALUES (?, ?, ?)",
+                    [(transaction_id, skey_id, pack_geometry(geometry))
+                     for transaction_id, (skey_id, geometry) in revisions.items()],
+                )
+                cur.execute("DELETE FROM geometry")
+                converted = len(revisions)
+            else:
+                cur.execute("SELECT transaction_id, skey_id, data FROM geometry_blobs ORDER BY transaction_id")
+                blobs = cur.fetchall()
+                cur.executemany(
+                    "INSERT INTO geometry (skey_id, type, data, transaction_id) VALUES (?, ?, ?, ?)",
+                    [(skey_id, geom.split(":")[0], geom, transaction_id)
+                     for transaction_id, skey_id, data in blobs for geom in unpack_geometry(data)],
+                )
+                cur.execute("DELETE FROM geometry_blobs")
+                converted = len(blobs)
+            self.set_metadata(GEOMETRY_STORAGE_KEY, mode)
+        return converted
+
+    _HISTORY_TABLES = (
+        HistoryTables("skeys", "transactions", "geometry", "skey_id", "geometry_blobs", "geometry_deltas"),
+        HistoryTables("spindles", "spindle_transactions", "spindle_geometry", "spindle_id", None, None),
+    )
+
+    def get_skey_history(self, skey_name: str) -> list[dict]:
+        """List the transactions of a skey, newest first."""
+        cur = self._connection().cursor()
+        cur.execute(
+            """
+            SELECT t.id, t.user, t.action, t.timestamp, t.comment
+            FROM transactions t JOIN skeys s ON s.id = t.skey_id
+            WHERE s.name = ?
+            ORDER BY t.id DESC
+            """,
+            (skey_name,),
+        )
+        return [
+            {"transaction_id": row[0], "user": row[1], "action": row[2], "timestamp": row[3], "comment": row[4]}
+            for row in cur.fetchall()
+        ]
+
+    def get_skey_at(self, skey_name: str, transaction_id: int) -> SkeyData | None:
+        """Return the skey with the geometry it had at transaction_id.
+
+        Only geometry is versioned; the other fields are the current ones.
+        Returns None if the skey or the transaction (for this skey) does not exist.
+        """
+        cur = self._connection().cursor()
+        cur.row_factory = _skey_row_factory
+        cur.execute(SKEY_SELECT_SQL + " WHERE s.name = ?", (skey_name,))
+        row = cur.fetchone()
+        if row is None:
+            return None
+        cur = self._connection().cursor()
+        cur.execute("SELECT 1 FROM transactions WHERE id = ? AND skey_id = ?", (transaction_id, row.id))
+        if cur.fetchone() is None:
+            return None
+        return self._skey_from_row(row, self._geometry_at(cur, self._HISTORY_TABLES[0], row.id, transaction_id))
+
+    def rollback_skey(self, skey_name: str, transaction_id: int, user: str = "system") -> int | None:
+        """Make the geometry of transaction_id current again by recording it as a new revision.
+
+        History is kept; returns the new transaction id, or None if there is nothing to roll back to.
+        """
+        with self.transaction() as cur:
+            cur.execute(
+                "SELECT s.id FROM skeys s JOIN transactions t ON t.skey_id = s.id WHERE s.name = ? AND t.id = ?",
+                (skey_name, transaction_id),
+            )
+            row = cur.fetchone()
+            if row is None:
+                return None
+            skey_id = row[0]
+            geometry = self._geometry_at(cur, self._HISTORY_TABLES[0], skey_id, transaction_id)
+            if not geometry:
+                return None
+            return self._insert_revision(cur, skey_id, geometry, user, "rollback", f"rollback to {transaction_id}")
+
+    def compact_history(
+        self, keep_last: int | None = None, older_than: datetime | str | None = None
+    ) -> CompactionReport:
+        """Shrink revision history, then VACUUM and ANALYZE the database.
+
+        Identical consecutive geometry revisions of a symbol are collapsed into the
+        earliest one; the later transactions stay as audit rows without geometry.
+        A transaction is then pruned when it is not among the symbol's `keep_last`
+        newest and is older than `older_than` (UTC); either limit may be omitted.
+        A kept audit row whose source revision is pruned takes over its geometry.
+        The current revision of a symbol is never removed. The surviving history
+        is re-encoded as keyframes and deltas. If any revision cannot be decoded,
+        sqlite3.DatabaseError is raised and nothing is changed.
+        """
+        if keep_last is not None and keep_last < 1:
+            raise ValueError("keep_last must be at least 1")
+        cutoff = older_than
+        if isinstance(older_than, datetime):
+            if older_than.tzinfo is not None:
+                older_than = older_than.astimezone(timezone.utc)
+            cutoff = older_than.strftime("%Y-%m-%d %H:%M:%S")
+
+        bytes_before = self._database_size()
+        deduplicated = pruned = 0
+        with self.transaction() as cur:
+            cur.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            existing_tables = {row[0] for row in cur.fetchall()}
+            packed = self._geometry_storage(cur) == "packed"
+            for tables in self._HISTORY_TABLES:
+                if not existing_tables.issuperset((tables.owner, tables.transactions, tables.geometry)):
+                    continue
+                history = self._load_history(cur, tables)
+
+                duplicates = set()
+                for owner_id, revisions in history.items():
+                    kept = []
+                    for transaction_id, geometry in revisions:
+                        if kept and kept[-1][1] == geometry:
+                            duplicates.add(transaction_id)
+                        else:
+                            kept.append((transaction_id, geometry))
+                    history[owner_id] = kept
+                deduplicated += len(duplicates)
+                # Point at the surviving revisions before pruning, so the current one is protected.
+                cur.executemany(
+                    f"UPDATE {tables.owner} SET current_transaction_id = ? WHERE id = ?",
+                    [(revisions[-1][0], owner_id) for owner_id, revisions in history.items() if revisions],
+                )
+
+                doomed = set()
+                if keep_last is not None or cutoff is not None:
+                    doomed = self._prunable_transactions(cur, tables, keep_last, cutoff)
+                    self._carry_pruned_revisions(cur, tables, history, doomed)
+                pruned += len(doomed)
+
+                cur.execute(f"DELETE FROM {tables.geometry}")
+                for table in (tables.blobs, tables.deltas):
+                    if table:
+                        cur.execute(f"DELETE FROM {table}")
+                cur.executemany(f"DELETE FROM {tables.transactions} WHERE id = ?", [(txn,) for txn in doomed])
+                for owner_id, revisions in history.items():
+                    self._write_history(
+                        cur, tables, owner_id, [revision for revision in revisions if revision[0] not in doomed], packed
+                    )
+            # Readers behind the newest entry fall back to a full reload (see get_changes_since).
+            cur.execute("DELETE FROM change_log WHERE seq < (SELECT MAX(seq) FROM change_log)")
+
+        conn = self._connection()
+        conn.execute("VACUUM")
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return CompactionReport(deduplicated, pruned, bytes_before, self._database_size())
+
+    def _database_size(self) -> int:
+        conn = self._connection()
+        return conn.execute("PRAGMA page_count").fetchone()[0] * conn.execute("PRAGMA page_size").fetchone()[0]
+
+    @staticmethod
+    def _load_history(cur: sqlite3.Cursor, tables: HistoryTables) -> Dict[int, List[tuple]]:
+        """Decode every geometry revision: owner id -> [(transaction_id, geometry)] in order.
+
+        Raises sqlite3.DatabaseError if a delta's base revision is missing, rather than
+        leaving revisions out that compact_history would then delete.
+        """
+        snapshots: Dict[int, tuple] = {}
+        cur.execute(f"SELECT transaction_id, {tables.owner_column}, data FROM {tables.geometry} ORDER BY id")
+        for transaction_id, owner_id, data in cur.fetchall():
+            snapshots.setdefault(transaction_id, (owner_id, []))[1].append(data)
+        if tables.blobs:
+            cur.execute(f"SELECT transaction_id, {tables.owner_column}, data FROM {tables.blobs}")
+            for transaction_id, owner_id, data in cur.fetchall():
+                snapshots[transaction_id] = (owner_id, unpack_geometry(data))
+        deltas: Dict[int, tuple] = {}
+        if tables.deltas:
+            cur.execute(f"SELECT transaction_id, {tables.owner_column}, base_transaction_id, ops FROM {tables.deltas}")
+            deltas = {row[0]: row[1:] for row in cur.fetchall()}
+
+        decoded: Dict[int, List[str]] = {}
+        history: Dict[int, List[tuple]] = {}
+        for transaction_id in sorted(snapshots.keys() | deltas.keys()):
+            if transaction_id in snapshots:
+                owner_id, geometry = snapshots[transaction_id]
+            else:
+                owner_id, base_txn, ops = deltas[transaction_id]
+                if base_txn not in decoded:
+                    raise sqlite3.DatabaseError(
+                        f"{tables.deltas}: transaction {transaction_id} is based on missing transaction {base_txn}"
+                    )
+                geometry = apply_geometry_delta(decoded[base_txn], json.loads(ops))
+            decoded[transaction_id] = geometry
+            history.setdefault(owner_id, []).append((transaction_id, geometry))
+        return history
+
+    def _write_history(
+        self, cur: sqlite3.Cursor, tables: HistoryTables, owner_id: int, revisions: List[tuple], packed: bool
+    ) -> None:
+        """Store revisions as keyframes and deltas, with the last one (the head) in full."""
+        for index, (transaction_id, geometry) in enumerate(revisions):
+            depth = index % KEYFRAME_INTERVAL if tables.deltas else 0
+            if depth:
+                base_txn, base_geometry = revisions[index - 1]
+                cur.execute(
+                    f"INSERT INTO {tables.deltas} "
+                    f"(transaction_id, {tables.owner_column}, base_transaction_id, depth, ops) VALUES (?, ?, ?, ?, ?)",
+                    (transaction_id, owner_id, base_txn, depth, json.dumps(diff_geometry(base_geometry, geometry))),
+                )
+            if depth == 0 or index == len(revisions) - 1:
+                self._write_snapshot(cur, tables, owner_id, transaction_id, geometry, packed)
+        cur.execute(
+            f"UPDATE {tables.owner} SET current_transaction_id = ? WHERE id = ?",
+            (revisions[-1][0] if revisions else None, owner_id),
+        )
+
+    @staticmethod
+    def _carry_pruned_revisions(
+        cur: sqlite3.Cursor, tables: HistoryTables, history: Dict[int, List[tuple]], doomed: set
+    ) -> None:
+        """Keep the geometry of transactions without their own revision when their source is pruned.
+
+        Such audit rows (e.g. collapsed duplicates) read the nearest earlier revision.
+        If that revision is doomed, its geometry moves to the first surviving audit row
+        that reads it, so every kept transaction still resolves to the same geometry.
+        """
+        if not doomed:
+            return
+        cur.execute(f"SELECT id, {tables.owner_column} FROM {tables.transactions}")
+        transactions: Dict[int, set] = {}
+        for transaction_id, owner_id in cur.fetchall():
+            transactions.setdefault(owner_id, set()).add(transaction_id)
+        for owner_id, revisions in history.items():
+            stored = dict(revisions)
+            carried = []
+            geometry, source_kept = None, True
+            for transaction_id in sorted(stored.keys() | transactions.get(owner_id, set())):
+                if transaction_id in stored:
+                    geometry = stored[transaction_id]
+                    source_kept = transaction_id not in doomed
+                    if source_kept:
+                        carried.append((transaction_id, geometry))
+                elif transaction_id not in doomed and not source_kept:
+                    carried.append((transaction_id, geometry))
+                    source_kept = True
+            history[owner_id] = carried
+
+    @staticmethod
+    def _prunable_transactions(
+        cur: sqlite3.Cursor, tables: HistoryTables, keep_last: int | None, cutoff: str | None
+    ) -> set:
+        cur.execute(
+            f"""
+            SELECT t.id
+            FROM (
+                SELECT id, {tables.owner_column}, timestamp,
+                       ROW_NUMBER() OVER (PARTITION BY {tables.owner_column} ORDER BY id DESC) AS position
+                FROM {tables.transactions}
+            ) t
+            LEFT JOIN {tables.owner} o ON o.id = t.{tables.owner_column}
+            WHERE (:keep_last IS NULL OR t.position > :keep_last)
+              AND (:cutoff IS NULL OR t.timestamp < :cutoff)
+              AND t.id IS NOT o.current_transaction_id
+            """,
+            {"keep_last": keep_last, "cutoff": cutoff},
+        )
+        return {row[0] for row in cur.fetchall()}
+
+    def _resolve_source_id(self, skey: SkeyData) -> int | None:
+        if skey.source_id is not None:
+            return skey.source_id
+        return self._ensure_symbol_source(skey.source_name, skey.source_type, skey.source_version)
+
+    def insert_skey(self, skey: SkeyData, user: str = "system", comment: str = "create") -> int:
+        with self.transaction() as cur:
+            skey_id = self._insert_skey_row(cur, skey, self._resolve_source_id(skey))
+            self._insert_revision(cur, skey_id, skey.geometry, user, "create", comment)
+            return skey_id
+
+    def delete_skey(self, skey_name: str):
+        with self.transaction() as cur:
+            cur.execute("SELECT id FROM skeys WHERE name = ?", (skey_name,))
+            row = cur.fetchone()
+            if row:
+                skey_id = row[0]
+                cur.execute("DELETE FROM geometry WHERE skey_id = ?", (skey_id,))
+                cur.execute("DELETE FROM geometry_blobs WHERE skey_id = ?", (skey_id,))
+                cur.execute("DELETE FROM geometry_deltas WHERE skey_id = ?", (skey_id,))
+                cur.execute("DELETE FROM transactions WHERE skey_id = ?", (skey_id,))
+                cur.execute("DELETE FROM skey_translations WHERE skey_id = ?", (skey_id,))
+                cur.execute("DELETE FROM skeys WHERE id = ?", (skey_id,))
+
+    def update_skey(self, skey: SkeyData, user: str = "system", comment: str = "edit"):
+        with self.transaction() as cur:
+            cur.execute("SELECT id FROM skeys WHERE name = ?", (skey.name,))
             row = cur.fetchone()
             if not row:
-                return []
-            spindle_id = row[0]
+                return self.insert_skey(skey, user, comment)
+            skey_id = row[0]
+            self._update_skey_row(cur, skey_id, skey, self._resolve_source_id(skey))
+            self._insert_revision(cur, skey_id, skey.geometry, user, "edit", comment)
+            return skey_id
+
+    def bulk_upsert_skeys(self, skeys: Iterable[SkeyData], user: str = "system", comment: str = "import") -> int:
+        """Insert or update many skeys in a single transaction; returns the number of skeys written.
+
+        skeys is consumed in chunks of BULK_UPSERT_CHUNK_SIZE, so a generator (e.g. a
+        streaming importer) is written without being materialized. Groups and subgroups
+        are created in one batch per chunk, symbol sources are resolved once per distinct
+        source and geometry rows are written with executemany.
+        """
+        skeys = iter(skeys)
+        chunk = list(itertools.islice(skeys, BULK_UPSERT_CHUNK_SIZE))
+        if not chunk:
+            return 0
+
+        count = 0
+        with self.transaction() as cur:
+            cur.execute("SELECT name, id FROM skeys")
+            existing_ids = dict(cur.fetchall())
+            source_ids: Dict[tuple, int | None] = {}
+            ensured_subgroups = set()
+
+            while chunk:
+                subgroups = {(skey.group_key, skey.subgroup_key) for skey in chunk} - ensured_subgroups
+                if subgroups:
+                    self._ensure_subgroups(cur, subgroups)
+                    ensured_subgroups |= subgroups
+                self._upsert_skey_chunk(cur, chunk, existing_ids, source_ids, user, comment)
+                count += len(chunk)
+                chunk = list(itertools.islice(skeys, BULK_UPSERT_CHUNK_SIZE))
+        return count
+
+    def _upsert_skey_chunk(
+        self,
+        cur: sqlite3.Cursor,
+        skeys: List[SkeyData],
+        existing_ids: Dict[str, int],
+        source_ids: Dict[tuple, int | None],
+        user: str,
+        comment: str,
+    ) -> None:
+        for skey in skeys:
+            if skey.source_id is not None:
+                source_id = skey.source_id
+            else:
+                source_key = (skey.source_name, skey.source_type, skey.source_version)
+                if source_key not in source_ids:
+                    source_ids[source_key] = self._ensure_symbol_source(*source_key)
+                source_id = source_ids[source_key]
+
+            skey_id = existing_ids.get(skey.name)
+            if skey_id is None:
+                skey_id = self._insert_skey_row(cur, skey, source_id)
+                existing_ids[skey.name] = skey_id
+                action = "create"
+            else:
+                self._update_skey_row(cur, skey_id, skey, source_id)
+                action = "edit"
+            self._insert_revision(cur, skey_id, skey.geometry, user, action, comment)
+
+    def has_search_index(self) -> bool:
+        """True if the FTS5 search index exists in this database."""
+        if self._search_index is None:
+            cur = self._connection().execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'skeys_fts'"
+            )
+            self._search_index = cur.fetchone() is not None
+        return self._search_index
+
+    def set_skey_translations(self, lang_code: str, texts: Dict[str, str]) -> int:
+        """Store the translated text searched for each skey name in lang_code.
+
+        Only rows whose text changed are written, so the search index is touched
+        for those skeys only. Returns the number of rows written.
+        """
+        sql = """
+            SELECT s.name, s.id, t.text FROM skeys s
+            LEFT JOIN skey_translations t ON t.skey_id = s.id AND t.lang_code = ?
+        """
+        params = [lang_code]
+        if len(texts) <= BULK_UPSERT_CHUNK_SIZE:
+            # A few names (e.g. one edited skey): look those up instead of scanning every skey.
+            sql += f" WHERE s.name IN ({', '.join('?' * len(texts))})"
+            params += texts
+        with self.transaction() as cur:
+            cur.execute(sql, params)
+            changed = [
+                (skey_id, lang_code, texts[name])
+                for name, skey_id, text in cur.fetchall()
+                if name in texts and texts[name] != (text or "")
+            ]
+            cur.executemany(
+                """
+                INSERT INTO skey_translations (skey_id, lang_code, text) VALUES (?, ?, ?)
+                ON CONFLICT(skey_id, lang_code) DO UPDATE SET text = excluded.text
+                """,
+                changed,
+            )
+        return len(changed)
 
-            cur.execute("SELECT MAX(transaction_id) FROM spindle_geometry WHERE spindle_id = ?", (spindle_id,))
-            trans_row = cur.fetchone()
-            if not trans_row or trans_row[0] is None:
-                return []
-            transaction_id = trans_row[0]
+    def search_skeys(self, query: str, limit: int | None = 50) -> List[str]:
+        """Return skey names matching every word of query, best match first (all of them if limit is None).
 
-            cur.execute("SELECT data FROM spindle_geometry WHERE spindle_id = ? AND transaction_id = ? ORDER BY id ASC",
-                       (spindle_id, transaction_id))
+        Words match as prefixes of the name (or of any name suffix), group, subgroup,
+        description, PCF identification, IDF record or stored translations.
+        Without FTS5 this degrades to an unranked substring match on the same columns.
+        """
+        terms = re.findall(r"\w+", query.lower())
+        if not terms or (limit is not None and limit <= 0):
+            return []
+        cur = self._connection().cursor()
+        if self.has_search_index():
+            match = " ".join('"' + term + '"*' for term in terms)
+            weights = ", ".join(str(weight) for weight in _SEARCH_WEIGHTS)
+            cur.execute(
+                f"""
+                SELECT s.name FROM skeys_fts f JOIN skeys s ON s.id = f.rowid
+                WHERE skeys_fts MATCH ?
+                ORDER BY bm25(skeys_fts, {weights}), s.name
+                LIMIT ?
+                """,
+                (match, -1 if limit is None else limit),
+            )
+        else:
+            # SQLite lower()/LIKE only fold ASCII, so match in Python to handle translations too.
+            cur.execute(
+                """
+                SELECT s.name, s.name || ' ' || s.skey_group_key || ' ' || s.skey_subgroup_key || ' ' ||
+                       COALESCE(s.skey_description_key, '') || ' ' || COALESCE(s.pcf_identification, '') || ' ' ||
+                       COALESCE(s.idf_record, '') || ' ' ||
+                       COALESCE((SELECT group_concat(t.text, ' ') FROM skey_translations t WHERE t.skey_id = s.id), '')
+                FROM skeys s ORDER BY s.name
+                """
+            )
+            return [
+                name for name, haystack in cur.fetchall()
+                if all(term in haystack.lower() for term in terms)
+            ][:limit]
+        return [row[0] for row in cur.fetchall()]
+
+    def get_spindle_geometry(self, spindle_name: str) -> List[str]:
+
+        cur = self._connection().cursor()
+        try:
+            cur.execute("""
+                SELECT g.data FROM spindles s
+                JOIN spindle_geometry g ON g.spindle_id = s.id AND g.transaction_id = s.current_transaction_id
+                WHERE s.name = ?
+                ORDER BY g.id ASC
+            """, (spindle_name,))
             return [r[0] for r in cur.fetchall()]
         except sqlite3.OperationalError:
             return []
-        finally:
-            conn.close()
 
     def get_all_spindles(self) -> List[SkeyData]:
         """Returns all spindles as SkeyData objects from the database."""
-        conn = self.connect()
-        cur = conn.cursor()
+        cur = self._connection().cursor()
         spindles = []
         try:
             cur.execute("""
@@ -974,9 +1878,10 @@ class SkeyDB:
                 FROM spindles ORDER BY name
             """)
             rows = cur.fetchall()
+            geometry_by_spindle = self._fetch_latest_geometry(cur, "spindles", "spindle_geometry", "spindle_id")
             for row in rows:
-                _, name, group_key, subgroup_key, desc_key, s_skey, orient, flow, dim, tracing, insul = row
-                geometry = self.get_spindle_geometry(name)
+                spindle_id, name, group_key, subgroup_key, desc_key, s_skey, orient, flow, dim, tracing, insul = row
+                geometry = geometry_by_spindle.get(spindle_id, [])
                 spindles.append(SkeyData(
                     name=name,
                     group_key=group_key,
@@ -992,129 +1897,116 @@ class SkeyDB:
                 ))
         except sqlite3.OperationalError:
             # Table may be missing or have an outdated structure
-            self._init_spindles_table(conn)
-        finally:
-            conn.close()
+            self._init_spindles_table()
         return spindles
 
     def insert_spindle(self, spindle: SkeyData, user: str = "system", comment: str = "create") -> int:
         """Inserts a new spindle into the database (similar to Skey)."""
-        conn = self.connect()
-        cur = conn.cursor()
-        spindle_skey = spindle.spindle_skey or None  # '' → NULL
-        cur.execute("""
-            INSERT INTO spindles (name, skey_group_key, skey_subgroup_key, skey_description_key,
-                                 spindle_skey, orientation, flow_arrow, dimensioned, tracing, insulation)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (spindle.name, spindle.group_key, spindle.subgroup_key, spindle.description_key,
-              spindle_skey, spindle.orientation, spindle.flow_arrow, spindle.dimensioned,
-              spindle.tracing, spindle.insulation))
-        spindle_id = cur.lastrowid
-
-        cur.execute("INSERT INTO spindle_transactions (spindle_id, user, action, comment) VALUES (?, ?, ?, ?)",
-                   (spindle_id, user, "create", comment))
-        transaction_id = cur.lastrowid
-
-        for geom in spindle.geometry:
-            cur.execute("INSERT INTO spindle_geometry (spindle_id, type, data, transaction_id) VALUES (?, ?, ?, ?)",
-                       (spindle_id, geom.split(":")[0], geom, transaction_id))
-        conn.commit()
-        conn.close()
-        return spindle_id if spindle_id is not None else 0
+        with self.transaction() as cur:
+            spindle_skey = spindle.spindle_skey or None  # '' → NULL
+            cur.execute("""
+                INSERT INTO spindles (name, skey_group_key, skey_subgroup_key, skey_description_key,
+                                     spindle_skey, orientation, flow_arrow, dimensioned, tracing, insulation)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (spindle.name, spindle.group_key, spindle.subgroup_key, spindle.description_key,
+                  spindle_skey, spindle.orientation, spindle.flow_arrow, spindle.dimensioned,
+                  spindle.tracing, spindle.insulation))
+            spindle_id = cur.lastrowid
+            self._insert_spindle_revision(cur, spindle_id, spindle.geometry, user, "create", comment)
+            return spindle_id if spindle_id is not None else 0
 
     def update_spindle(self, spindle: SkeyData, user: str = "system", comment: str = "edit"):
         """Updates spindle data or creates a new one if it does not exist."""
-        conn = self.connect()
-        cur = conn.cursor()
-        cur.execute("SELECT id FROM spindles WHERE name = ?", (spindle.name,))
-        row = cur.fetchone()
-        if not row:
-            conn.close()
-            return self.insert_spindle(spindle, user, comment)
-
-        spindle_id = row[0]
-        sp_skey = spindle.spindle_skey or None  # '' → NULL
-        cur.execute("""
-            UPDATE spindles SET skey_group_key = ?, skey_subgroup_key = ?, skey_description_key = ?,
-                               spindle_skey = ?, orientation = ?, flow_arrow = ?, dimensioned = ?,
-                               tracing = ?, insulation = ?
-            WHERE id = ?
-        """, (spindle.group_key, spindle.subgroup_key, spindle.description_key,
-              sp_skey, spindle.orientation, spindle.flow_arrow, spindle.dimensioned,
-              spindle.tracing, spindle.insulation, spindle_id))
+        with self.transaction() as cur:
+            cur.execute("SELECT id FROM spindles WHERE name = ?", (spindle.name,))
+            row = cur.fetchone()
+            if not row:
+                return self.insert_spindle(spindle, user, comment)
+
+            spindle_id = row[0]
+            sp_skey = spindle.spindle_skey or None  # '' → NULL
+            cur.execute("""
+                UPDATE spindles SET skey_group_key = ?, skey_subgroup_key = ?, skey_description_key = ?,
+                                   spindle_skey = ?, orientation = ?, flow_arrow = ?, dimensioned = ?,
+                                   tracing = ?, insulation = ?
+                WHERE id = ?
+            """, (spindle.group_key, spindle.subgroup_key, spindle.description_key,
+                  sp_skey, spindle.orientation, spindle.flow_arrow, spindle.dimensioned,
+                  spindle.tracing, spindle.insulation, spindle_id))
+            self._insert_spindle_revision(cur, spindle_id, spindle.geometry, user, "edit", comment)
+            return spindle_id
 
+    @staticmethod
+    def _insert_spindle_revision(
+        cur: sqlite3.Cursor, spindle_id: int, geometry: List[str], user: str, action: str, comment: str
+    ) -> int:
+        """Spindle counterpart of _insert_revision; spindle revisions are always full snapshots."""
         cur.execute("INSERT INTO spindle_transactions (spindle_id, user, action, comment) VALUES (?, ?, ?, ?)",
-                   (spindle_id, user, "edit", comment))
+                   (spindle_id, user, action, comment))
         transaction_id = cur.lastrowid
+        if geometry:
+            cur.executemany("INSERT INTO spindle_geometry (spindle_id, type, data, transaction_id) VALUES (?, ?, ?, ?)",
+                           [(spindle_id, geom.split(":")[0], geom, transaction_id) for geom in geometry])
+            cur.execute("UPDATE spindles SET current_transaction_id = ? WHERE id = ?", (transaction_id, spindle_id))
+        return transaction_id
 
-        for geom in spindle.geometry:
-            cur.execute("INSERT INTO spindle_geometry (spindle_id, type, data, transaction_id) VALUES (?, ?, ?, ?)",
-                       (spindle_id, geom.split(":")[0], geom, transaction_id))
-        conn.commit()
-        conn.close()
-        return spindle_id
-
-    def _init_spindles_table(self, conn):
+    def _init_spindles_table(self):
         """Creates spindle tables with the new schema (similar to skeys)."""
-        cur = conn.cursor()
-        cur.execute('''CREATE TABLE IF NOT EXISTS spindles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL UNIQUE,
-            skey_group_key TEXT NOT NULL,
-            skey_subgroup_key TEXT NOT NULL,
-            skey_description_key TEXT,
-            spindle_skey TEXT,
-            orientation INTEGER NOT NULL DEFAULT 0,
-            flow_arrow INTEGER NOT NULL DEFAULT 0,
-            dimensioned INTEGER NOT NULL DEFAULT 0,
-            tracing INTEGER NOT NULL DEFAULT 0,
-            insulation INTEGER NOT NULL DEFAULT 0,
-            CHECK (orientation IN (0, 1, 2, 3)),
-            CHECK (flow_arrow IN (0, 1, 2)),
-            CHECK (dimensioned IN (0, 1, 2)),
-            CHECK (tracing IN (0, 1, 2)),
-            CHECK (insulation IN (0, 1, 2)),
-            FOREIGN KEY (skey_group_key) REFERENCES skey_groups(skey_group_key) ON DELETE RESTRICT ON UPDATE CASCADE,
-            FOREIGN KEY (skey_group_key, skey_subgroup_key) REFERENCES skey_subgroups(skey_group_key, skey_subgroup_key) ON DELETE RESTRICT ON UPDATE CASCADE
-        )''')
-
-        cur.execute('''CREATE TABLE IF NOT EXISTS spindle_transactions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            spindle_id INTEGER NOT NULL,
-            user TEXT NOT NULL,
-            action TEXT NOT NULL,
-            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            comment TEXT,
-            FOREIGN KEY (spindle_id) REFERENCES spindles(id)
-        )''')
-
-        cur.execute('''CREATE TABLE IF NOT EXISTS spindle_geometry (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            spindle_id INTEGER NOT NULL,
-            type TEXT NOT NULL,
-            data TEXT NOT NULL,
-            transaction_id INTEGER NOT NULL,
-            FOREIGN KEY (spindle_id) REFERENCES spindles(id),
-            FOREIGN KEY (transaction_id) REFERENCES spindle_transactions(id)
-        )''')
-        conn.commit()
+        with self.transaction() as cur:
+            cur.execute('''CREATE TABLE IF NOT EXISTS spindles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL UNIQUE,
+                skey_group_key TEXT NOT NULL,
+                skey_subgroup_key TEXT NOT NULL,
+                skey_description_key TEXT,
+                spindle_skey TEXT,
+                orientation INTEGER NOT NULL DEFAULT 0,
+                flow_arrow INTEGER NOT NULL DEFAULT 0,
+                dimensioned INTEGER NOT NULL DEFAULT 0,
+                tracing INTEGER NOT NULL DEFAULT 0,
+                insulation INTEGER NOT NULL DEFAULT 0,
+                current_transaction_id INTEGER,
+                CHECK (orientation IN (0, 1, 2, 3)),
+                CHECK (flow_arrow IN (0, 1, 2)),
+                CHECK (dimensioned IN (0, 1, 2)),
+                CHECK (tracing IN (0, 1, 2)),
+                CHECK (insulation IN (0, 1, 2)),
+                FOREIGN KEY (skey_group_key) REFERENCES skey_groups(skey_group_key) ON DELETE RESTRICT ON UPDATE CASCADE,
+                FOREIGN KEY (skey_group_key, skey_subgroup_key) REFERENCES skey_subgroups(skey_group_key, skey_subgroup_key) ON DELETE RESTRICT ON UPDATE CASCADE
+            )''')
+
+            cur.execute('''CREATE TABLE IF NOT EXISTS spindle_transactions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                spindle_id INTEGER NOT NULL,
+                user TEXT NOT NULL,
+                action TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                comment TEXT,
+                FOREIGN KEY (spindle_id) REFERENCES spindles(id)
+            )''')
+
+            cur.execute('''CREATE TABLE IF NOT EXISTS spindle_geometry (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                spindle_id INTEGER NOT NULL,
+                type TEXT NOT NULL,
+                data TEXT NOT NULL,
+                transaction_id INTEGER NOT NULL,
+                FOREIGN KEY (spindle_id) REFERENCES spindles(id),
+                FOREIGN KEY (transaction_id) REFERENCES spindle_transactions(id)
+            )''')
 
     def get_all_groups(self) -> List[str]:
         """Returns all group keys from the database."""
-        conn = self.connect()
-        cur = conn.cursor()
+        cur = self._connection().cursor()
         try:
             cur.execute("SELECT skey_group_key FROM skey_groups ORDER BY skey_group_key")
             return [row[0] for row in cur.fetchall()]
         except sqlite3.OperationalError:
             return []
-        finally:
-            conn.close()
 
     def get_subgroups_by_group(self, group_key: str) -> List[str]:
         """Returns all subgroup keys for the specified group."""
-        conn = self.connect()
-        cur = conn.cursor()
+        cur = self._connection().cursor()
         try:
             cur.execute("""
                 SELECT s.skey_subgroup_key
@@ -1126,28 +2018,29 @@ class SkeyDB:
             return [row[0] for row in cur.fetchall()]
         except sqlite3.OperationalError:
             return []
-        finally:
-            conn.close()
 
     def ensure_group_exists(self, group_key: str):
         """Ensures that a group key exists in the skey_groups table."""
-        conn = self.connect()
-        cur = conn.cursor()
-        try:
+        with self.transaction() as cur:
             cur.execute("INSERT OR IGNORE INTO skey_groups (skey_group_key) VALUES (?)", (group_key,))
-            conn.commit()
-        finally:
-            conn.close()
 
     def ensure_subgroup_exists(self, group_key: str, subgroup_key: str):
         """Ensures that a subgroup key exists in skey_subgroups for the given group."""
-        self.ensure_group_exists(group_key)
-        conn = self.connect()
-        cur = conn.cursor()
-        try:
-            cur.execute("SELECT id FROM skey_groups WHERE skey_group_key = ?", (group_key,))
-            group_id = cur.fetchone()[0]
-            cur.execute("INSERT OR IGNORE INTO skey_subgroups (group_id, skey_group_key, skey_subgroup_key) VALUES (?, ?, ?)", (group_id, group_key, subgroup_key))
-            conn.commit()
-        finally:
-            conn.close()
+        with self.transaction() as cur:
+            self._ensure_subgroups(cur, {(group_key, subgroup_key)})
+
+    @staticmethod
+    def _ensure_subgroups(cur: sqlite3.Cursor, pairs: Iterable[tuple]) -> None:
+        """Create any missing (group_key, subgroup_key) pairs in one batch."""
+        pairs = sorted(set(pairs))
+        cur.executemany(
+            "INSERT OR IGNORE INTO skey_groups (skey_group_key) VALUES (?)",
+            sorted({(group_key,) for group_key, _ in pairs}),
+        )
+        cur.executemany(
+            """
+            INSERT OR IGNORE INTO skey_subgroups (group_id, skey_group_key, skey_subgroup_key)
+            SELECT id, skey_group_key, ? FROM skey_groups WHERE skey_group_key = ?
+            """,
+            [(subgroup_key, group_key) for group_key, subgroup_key in pairs],
+        )
@@ -0,0 +1,69 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+
+"""
+Bounded LRU cache of skey geometry, keyed by skey name.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+
+class GeometryCache:
+    """Least-recently-used geometry cache with hit/miss counters.
+
+    Safe to share between the GUI thread and the writer thread.
+    """
+
+    def __init__(self, max_size: int = 128):
+        if max_size < 1:
+            raise ValueError(f"max_size must be positive, got {max_size}")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate/clear so a load racing with a write is not cached.
+        self._generation = 0
+
+    def get(self, name: str, loader: Callable[[str], List[str]]) -> List[str]:
+        """Return the cached geometry of name, calling loader(name) on a miss."""
+        with self._lock:
+            geometry = self._entries.get(name)
+            if geometry is not None:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return geometry
+            self.misses += 1
+            generation = self._generation
+
+        geometry = loader(name)
+        with self._lock:
+            if generation != self._generation:
+                return geometry
+            self._entries[name] = geometry
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return geometry
+
+    def invalidate(self, name: str) -> None:
+        with self._lock:
+            self._entries.pop(name, None)
+            self._generation += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for diagnostics: hits, misses, current size and capacity."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "max_size": self.max_size}
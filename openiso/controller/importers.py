@@ -4,12 +4,85 @@
 """
 Importers for Skey files - GUI-independent
 """
+import io
+import math
+import mmap
+import multiprocessing
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from openiso.model.geometry import GeometryConverter
+from openiso.model.geometry import PEN_ACTION_CODES, GeometryConverter
 from openiso.model.skey import SkeyData, SkeyGroup
 
+# Columns of the four (pen action, x, y) fields of a fixed-width 502 record.
+_PEN_RECORD_FIELDS = (
+    (slice(5, 14), slice(15, 22), slice(23, 30)),
+    (slice(31, 38), slice(39, 46), slice(47, 54)),
+    (slice(55, 63), slice(64, 70), slice(71, 78)),
+    (slice(79, 86), slice(87, 94), slice(95, 103)),
+)
+_PEN_RECORD_TOKENS = 1 + 3 * len(_PEN_RECORD_FIELDS)
+
+# Approximate size of the file ranges parsed by each worker of a parallel import.
+IMPORT_RANGE_BYTES = 1 << 20
+
+
+class _CoordinateCache(dict):
+    """Memo of float(token): symbol files reuse a few hundred coordinate values."""
+
+    max_size = 4096
+
+    def __missing__(self, token: str) -> float:
+        if len(self) >= self.max_size:
+            self.clear()
+        value = self[token] = float(token)
+        return value
+
+
+_coordinates = _CoordinateCache()
+
+
+def decode_502_record(row: str, geometry: array) -> None:
+    """Append the (pen action, x, y) triples of one fixed-width 502 record to geometry.
+
+    Pen actions are stored as PEN_ACTION_CODES (NaN for others). Raises ValueError
+    or IndexError on a malformed field; the triples before it are kept.
+    """
+    for action, pos_x, pos_y in _PEN_RECORD_FIELDS:
+        pen_action = PEN_ACTION_CODES.get(row[action].strip(), math.nan)
+        geometry.extend((pen_action, float(row[pos_x].strip()), float(row[pos_y].strip())))
+
+
+def decode_502_records(rows: List[str]) -> array:
+    """Decode a block of 502 records into one array('d') of (pen action, x, y) triples.
+
+    Records whose fields are separated by blanks (all files seen in practice) are
+    tokenized for the whole block with one split(): when every row yields the same
+    number of tokens, starting with the record type, the twelve tokens after it are
+    the fixed-width fields and anything after column 103 is dropped, as before.
+    Any other block is decoded column by column with decode_502_record().
+    """
+    tokens = " ".join(rows).split()
+    width = len(tokens) // len(rows) if rows else 0
+    if width < _PEN_RECORD_TOKENS or width * len(rows) != len(tokens) or tokens[::width].count("502") != len(rows):
+        geometry = array('d')
+        for row in rows:
+            decode_502_record(row, geometry)
+        return geometry
+
+    while width > _PEN_RECORD_TOKENS:
+        del tokens[width - 1::width]
+        width -= 1
+    del tokens[::width]
+    tokens[::3] = [PEN_ACTION_CODES.get(action, math.nan) for action in tokens[::3]]
+    tokens[1::3] = map(_coordinates.__getitem__, tokens[1::3])
+    tokens[2::3] = map(_coordinates.__getitem__, tokens[2::3])
+    return array('d', tokens)
+
 
 @dataclass
 class ImportResult:
@@ -18,10 +91,23 @@ class ImportResult:
     skeys: Dict[str, SkeyData]
     groups: SkeyGroup
     errors: List[str]
+    elapsed_seconds: float = 0.0
+    # Number of skeys read; skeys stays empty when SkeyService streams them into the database.
+    imported_count: int = 0
+
+    @property
+    def symbols_per_second(self) -> float:
+        """Import throughput, including the database write when done through SkeyService."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.imported_count / self.elapsed_seconds
 
 class BaseSkeyImporter:
     """Base class for Skey importers"""
 
+    # Whether records other than 501/502 finish the current skey.
+    other_records_end_skey = False
+
     def __init__(self, descriptions: Optional[Dict[str, list]] = None,
                  geometry_converter: Optional[GeometryConverter] = None):
         self.descriptions = descriptions or {}
@@ -63,73 +149,142 @@ class BaseSkeyImporter:
         """Add skey to groups hierarchy"""
         groups.add_skey(group, subgroup, skey_name)
 
-    def import_from_file(self, file_path: str) -> 'ImportResult':
-        """Import skeys from file - to be implemented by subclasses"""
-        raise NotImplementedError
-
-class ASCIISkeyImporter(BaseSkeyImporter):
-    """Importer for ASCII skey files (Intergraph format)"""
+    @property
+    def errors(self) -> List[str]:
+        """Errors collected by the last import."""
+        return self._errors
 
-    def import_from_file(self, file_path: str) -> ImportResult:
-        """Import skeys from ASCII file"""
+    def import_from_file(self, file_path: str, workers: int = 0) -> ImportResult:
+        """Import skeys from file, on worker processes if workers > 1 (see iter_file_skeys)"""
         skeys: Dict[str, SkeyData] = {}
         groups = SkeyGroup()
         self._errors = []
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as symbol_file:
-                contents = symbol_file.readlines()
-        except Exception as e:
-            self._errors.append(f"Failed to read file: {e}")
+            for skey in self.iter_file_skeys(file_path, workers):
+                if skey.name in skeys:
+                    self._add_to_groups(groups, skey.group_key, skey.subgroup_key, skey.name)
+                else:
+                    # A name new to this import is not listed yet: skip add_skey()'s linear check.
+                    groups.groups.setdefault(skey.group_key, {}).setdefault(skey.subgroup_key, []).append(skey.name)
+                skeys[skey.name] = skey
+        except (OSError, UnicodeDecodeError) as e:
+            self._errors = [f"Failed to read file: {e}"]
             return ImportResult(success=False, skeys={}, groups=SkeyGroup(), errors=self._errors)
 
+        return ImportResult(
+            success=len(self._errors) == 0,
+            skeys=skeys,
+            groups=groups,
+            errors=self._errors,
+            imported_count=len(skeys)
+        )
+
+    def iter_file_skeys(self, file_path: str, workers: int = 0,
+                        range_bytes: int = IMPORT_RANGE_BYTES) -> Iterator[SkeyData]:
+        """Yield the skeys of file_path in file order.
+
+        With workers > 1 the file is split before 501 records into ranges of about
+        range_bytes (scan_skey_ranges), which are parsed and converted on a process
+        pool. Results and errors, with their line numbers in the file, are merged in
+        file order; at most two ranges per worker are in flight. Workers are spawned
+        rather than forked, so open SQLite connections are never copied into them.
+        """
+        if workers <= 1:
+            with open(file_path, 'r', encoding='utf-8') as symbol_file:
+                yield from self.iter_skeys(symbol_file)
+            return
+
+        ranges = self.scan_skey_ranges(file_path, range_bytes)
+        self._errors = []
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_range_worker, initargs=(self,)
+        ) as pool:
+            pending = deque()
+            for start, end, first_line in ranges:
+                pending.append(pool.submit(_import_file_range, file_path, start, end, first_line))
+                if len(pending) >= workers * 2:
+                    yield from self._range_result(pending.popleft())
+            while pending:
+                yield from self._range_result(pending.popleft())
+
+    def _range_result(self, future) -> List[SkeyData]:
+        range_skeys, range_errors = future.result()
+        self._errors.extend(range_errors)
+        return range_skeys
+
+    def scan_skey_ranges(self, file_path: str, range_bytes: int = IMPORT_RANGE_BYTES) -> List[Tuple[int, int, int]]:
+        """Split file_path before 501 records into (start, end, first_line) byte ranges.
+
+        Parsing state is reset by every 501 record, so each range imports on its
+        own. The file is memory-mapped and only scanned near the range ends.
+        """
+        ranges = []
+        with open(file_path, 'rb') as symbol_file:
+            if os.fstat(symbol_file.fileno()).st_size == 0:
+                return ranges
+            with mmap.mmap(symbol_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                start, first_line = 0, 1
+                while start < len(data):
+                    end = self._next_501_offset(data, start + max(range_bytes, 1))
+                    ranges.append((start, end, first_line))
+                    first_line += data[start:end].count(b"\n")
+                    start = end
+        return ranges
+
+    def _next_501_offset(self, data: mmap.mmap, offset: int) -> int:
+        """Offset of the first 501 record starting at or after offset, else len(data)."""
+        if offset >= len(data):
+            return len(data)
+        if data[offset - 1] != ord("\n"):
+            offset = data.find(b"\n", offset) + 1
+        while 0 < offset < len(data):
+            if self._record_type(data[offset:offset + 8].decode('utf-8', 'replace')) == "501":
+                return offset
+            offset = data.find(b"\n", offset) + 1
+        return len(data)
+
+    def iter_skeys(self, file_obj: Iterable[str], first_line: int = 1) -> Iterator[SkeyData]:
+        """Yield each skey of a text file as soon as its geometry is complete.
+
+        A skey is finished by the next 501 record (or, for IDF, any other record)
+        or by the end of the file, so only one skey's 502 records are held at a
+        time; they are decoded as one block. Parse errors are collected in errors,
+        numbering lines from first_line, and the faulty record skipped.
+        """
+        self._errors = []
+        pending: Optional[SkeyData] = None
+        rows: List[str] = []
+        line_numbers: List[int] = []
         skip_line = False
-        new_skey = ""
-        base_skey = ""
-        geometry: List[Any] = []
-        spindle_skey = ""
-        orientation = 0
-        flow_arrow = 0
-        dimensioned = 0
-
-        for line_index, row in enumerate(contents):
+
+        for line_number, row in enumerate(file_obj, first_line):
             if row[:1] == "!":
                 skip_line = True
                 continue
 
-            record_type = row[:4].strip()
+            record_type = self._record_type(row)
 
             if record_type == "501":
-                # Save previous skey
-                if new_skey or base_skey:
-                    target_skey = new_skey if new_skey else base_skey
-                    if target_skey in skeys:
-                        skeys[target_skey].geometry = self.geometry_converter.convert_graphics(
-                            target_skey, geometry
-                        )
-
-                geometry = []
+                skey = self._finish_skey(pending, rows, line_numbers)
+                if skey is not None:
+                    yield skey
+                pending = None
+                rows, line_numbers = [], []
                 skip_line = False
 
-                # Parse 501 record
-                new_skey = row[5:10].strip()
-                base_skey = row[11:15].strip()
-                spindle_skey = row[16:20].strip()
-
                 try:
-                    orientation = int(row[30:37].strip())
-                    flow_arrow = int(row[38:45].strip())
-                    dimensioned = int(row[46:53].strip())
+                    new_skey, base_skey, spindle_skey, orientation, flow_arrow, dimensioned = \
+                        self._parse_501_record(row)
                 except (ValueError, IndexError) as e:
-                    self._errors.append(f"Line {line_index + 1}: Failed to parse 501 record: {e}")
+                    self._errors.append(f"Line {line_number}: Failed to parse 501 record: {e}")
                     continue
 
-                # Determine target skey and group info
                 target_skey = new_skey if new_skey else base_skey
                 if target_skey:
                     skey_group, skey_subgroup = self._get_description_info(target_skey)
-
-                    skeys[target_skey] = SkeyData(
+                    pending = SkeyData(
                         name=target_skey,
                         group_key=skey_group,
                         subgroup_key=skey_subgroup,
@@ -141,186 +296,105 @@ class ASCIISkeyImporter(BaseSkeyImporter):
                         geometry=[]
                     )
 
-                    self._add_to_groups(groups, skey_group, skey_subgroup, target_skey)
-
             elif record_type == "502":
-                if skip_line:
-                    continue
-
-                try:
-                    self._parse_502_record(row, geometry)
-                except (ValueError, IndexError) as e:
-                    self._errors.append(f"Line {line_index + 1}: Failed to parse 502 record: {e}")
-                    continue
-
-                # Check if last line
-                if line_index == len(contents) - 1:
-                    target_skey = new_skey if new_skey else base_skey
-                    if target_skey and target_skey in skeys:
-                        skeys[target_skey].geometry = self.geometry_converter.convert_graphics(
-                            target_skey, geometry
-                        )
-                    geometry = []
-
-        return ImportResult(
-            success=len(self._errors) == 0,
-            skeys=skeys,
-            groups=groups,
-            errors=self._errors
-        )
-
-    def _parse_502_record(self, row: str, geometry: List[Any]):
-        """Parse a 502 record and append to geometry"""
-        positions = [
-            (5, 14, 15, 22, 23, 30),
-            (31, 38, 39, 46, 47, 54),
-            (55, 63, 64, 70, 71, 78),
-            (79, 86, 87, 94, 95, 103)
-        ]
-
-        for start_action, end_action, start_x, end_x, start_y, end_y in positions:
-            pen_action = row[start_action:end_action].strip()
-            pos_x = float(row[start_x:end_x].strip())
-            pos_y = float(row[start_y:end_y].strip())
+                if not skip_line:
+                    rows.append(row)
+                    line_numbers.append(line_number)
+
+            elif self.other_records_end_skey:
+                skey = self._finish_skey(pending, rows, line_numbers)
+                if skey is not None:
+                    yield skey
+                pending = None
+                rows, line_numbers = [], []
+
+        skey = self._finish_skey(pending, rows, line_numbers)
+        if skey is not None:
+            yield skey
+
+    def _record_type(self, row: str) -> str:
+        raise NotImplementedError
 
-            geometry.append(pen_action)
-            geometry.append(pos_x)
-            geometry.append(pos_y)
+    def _parse_501_record(self, row: str) -> Tuple[str, str, str, int, int, int]:
+        """Return (new_skey, base_skey, spindle_skey, orientation, flow_arrow, dimensioned)"""
+        raise NotImplementedError
 
+    def _finish_skey(self, skey: Optional[SkeyData], rows: List[str], line_numbers: List[int]) -> Optional[SkeyData]:
+        """Decode the 502 records read for skey and convert them into its geometry."""
+        if not rows:
+            geometry = array('d')
+        else:
+            try:
+                geometry = decode_502_records(rows)
+            except (ValueError, IndexError):
+                # Decode again row by row to report the faulty lines.
+                geometry = array('d')
+                for line_number, row in zip(line_numbers, rows):
+                    try:
+                        decode_502_record(row, geometry)
+                    except (ValueError, IndexError) as e:
+                        self._errors.append(f"Line {line_number}: Failed to parse 502 record: {e}")
+        if skey is None:
+            return None
+        skey.geometry = self.geometry_converter.convert_graphics(skey.name, geometry)
+        return skey
 
-class IDFSkeyImporter(BaseSkeyImporter):
-    """Importer for IDF skey files (AVEVA format)"""
 
-    def import_from_file(self, file_path: str) -> ImportResult:
-        """Import skeys from IDF file"""
-        skeys: Dict[str, SkeyData] = {}
-        groups = SkeyGroup()
-        self._errors = []
+_range_importer: Optional[BaseSkeyImporter] = None
 
-        try:
-            with open(file_path, 'r', encoding='utf-8') as symbol_file:
-                contents = symbol_file.readlines()
-        except Exception as e:
-            self._errors.append(f"Failed to read file: {e}")
-            return ImportResult(success=False, skeys={}, groups=SkeyGroup(), errors=self._errors)
 
-        skip_line = False
-        new_skey = ""
-        base_skey = ""
-        geometry: List[Any] = []
-        spindle_skey = ""
-        orientation = 0
-        flow_arrow = 0
-        dimensioned = 0
-
-        for line_index, row in enumerate(contents):
-            if row[:1] == "!":
-                skip_line = True
-                continue
-
-            record_type = row[:5].strip()
-
-            if record_type == "501":
-                # Save previous skey
-                if new_skey or base_skey:
-                    target_skey = new_skey if new_skey else base_skey
-                    if target_skey in skeys:
-                        skeys[target_skey].geometry = self.geometry_converter.convert_graphics(
-                            target_skey, geometry
-                        )
-
-                geometry = []
-                skip_line = False
+def _init_range_worker(importer: BaseSkeyImporter) -> None:
+    global _range_importer
+    _range_importer = importer
 
-                # Parse 501 record (IDF format uses comma-separated values)
-                try:
-                    skey_parts = row[5:21].strip().split(",")
-                    new_skey = skey_parts[0] if len(skey_parts) > 0 else ""
-                    base_skey = skey_parts[1] if len(skey_parts) > 1 else ""
-                    spindle_skey = skey_parts[2] if len(skey_parts) > 2 else ""
-
-                    orientation = int(row[30:37].strip())
-                    flow_arrow = int(row[38:45].strip())
-                    dimensioned = int(row[46:53].strip())
-                except (ValueError, IndexError) as e:
-                    self._errors.append(f"Line {line_index + 1}: Failed to parse 501 record: {e}")
-                    continue
 
-                # Determine target skey and group info
-                target_skey = new_skey if new_skey else base_skey
-                if target_skey:
-                    skey_group, skey_subgroup = self._get_description_info(target_skey)
+def _import_file_range(file_path: str, start: int, end: int, first_line: int) -> Tuple[List[SkeyData], List[str]]:
+    """Import bytes [start, end) of file_path; module level so it can run in a worker process."""
+    with open(file_path, 'rb') as symbol_file:
+        symbol_file.seek(start)
+        data = symbol_file.read(end - start)
+    rows = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8')
+    skeys = list(_range_importer.iter_skeys(rows, first_line))
+    return skeys, _range_importer.errors
 
-                    skeys[target_skey] = SkeyData(
-                        name=target_skey,
-                        group_key=skey_group,
-                        subgroup_key=skey_subgroup,
-                        description_key="",
-                        spindle_skey=spindle_skey,
-                        orientation=orientation,
-                        flow_arrow=flow_arrow,
-                        dimensioned=dimensioned,
-                        geometry=[]
-                    )
 
-                    self._add_to_groups(groups, skey_group, skey_subgroup, target_skey)
+class ASCIISkeyImporter(BaseSkeyImporter):
+    """Importer for ASCII skey files (Intergraph format)"""
 
-            elif record_type == "502":
-                if skip_line:
-                    continue
+    def _record_type(self, row: str) -> str:
+        return row[:4].strip()
+
+    def _parse_501_record(self, row: str) -> Tuple[str, str, str, int, int, int]:
+        return (
+            row[5:10].strip(),
+            row[11:15].strip(),
+            row[16:20].strip(),
+            int(row[30:37].strip()),
+            int(row[38:45].strip()),
+            int(row[46:53].strip()),
+        )
 
-                try:
-                    self._parse_502_record(row, geometry)
-                except (ValueError, IndexError) as e:
-                    self._errors.append(f"Line {line_index + 1}: Failed to parse 502 record: {e}")
-                    continue
 
-                # Check if last line
-                if line_index == len(contents) - 1:
-                    target_skey = new_skey if new_skey else base_skey
-                    if target_skey and target_skey in skeys:
-                        skeys[target_skey].geometry = self.geometry_converter.convert_graphics(
-                            target_skey, geometry
-                        )
-                    geometry = []
-
-            else:
-                # Other record types - finalize current skey
-                if new_skey or base_skey:
-                    target_skey = new_skey if new_skey else base_skey
-                    if target_skey in skeys and skeys[target_skey].geometry == []:
-                        skeys[target_skey].geometry = self.geometry_converter.convert_graphics(
-                            target_skey, geometry
-                        )
-                    geometry = []
-                    new_skey = ""
-                    base_skey = ""
+class IDFSkeyImporter(BaseSkeyImporter):
+    """Importer for IDF skey files (AVEVA format)"""
 
-        return ImportResult(
-            success=len(self._errors) == 0,
-            skeys=skeys,
-            groups=groups,
-            errors=self._errors
+    other_records_end_skey = True
+
+    def _record_type(self, row: str) -> str:
+        return row[:5].strip()
+
+    def _parse_501_record(self, row: str) -> Tuple[str, str, str, int, int, int]:
+        # IDF format uses comma-separated skey names
+        skey_parts = row[5:21].strip().split(",")
+        return (
+            skey_parts[0] if len(skey_parts) > 0 else "",
+            skey_parts[1] if len(skey_parts) > 1 else "",
+            skey_parts[2] if len(skey_parts) > 2 else "",
+            int(row[30:37].strip()),
+            int(row[38:45].strip()),
+            int(row[46:53].strip()),
         )
 
-    def _parse_502_record(self, row: str, geometry: List[Any]):
-        """Parse a 502 record and append to geometry"""
-        positions = [
-            (5, 14, 15, 22, 23, 30),
-            (31, 38, 39, 46, 47, 54),
-            (55, 63, 64, 70, 71, 78),
-            (79, 86, 87, 94, 95, 103)
-        ]
-
-        for start_action, end_action, start_x, end_x, start_y, end_y in positions:
-            pen_action = row[start_action:end_action].strip()
-            pos_x = float(row[start_x:end_x].strip())
-            pos_y = float(row[start_y:end_y].strip())
-
-            geometry.append(pen_action)
-            geometry.append(pos_x)
-            geometry.append(pos_y)
-
 
 class SkeyImporterFactory:
     """Factory for creating appropriate importer based on file extension"""
@@ -0,0 +1,78 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+
+"""
+Headless database maintenance commands, suitable for cron/scheduled tasks.
+
+Usage:
+    python -m openiso.controller.maintenance compact --db path/to/openiso.db --keep-last 20 --older-than-days 90
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from openiso.controller.db import DB_PATH, SkeyDB
+
+
+def _db_path_problem(path: str) -> Optional[str]:
+    """Return why the database at path cannot be compacted in place, or None if it can."""
+    if not os.path.isfile(path):
+        return f"no database file at {path}"
+    # SQLite writes its journal/WAL next to the database file.
+    if not os.access(path, os.W_OK) or not os.access(os.path.dirname(os.path.abspath(path)), os.W_OK):
+        return f"{path} is not writable"
+    return None
+
+
+def _compact(args: argparse.Namespace) -> int:
+    older_than = None
+    if args.older_than_days is not None:
+        older_than = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+
+    problem = _db_path_problem(args.db)
+    if problem:
+        print(f"Compaction aborted: {problem}", file=sys.stderr)
+        return 1
+
+    db = None
+    try:
+        # Never fall back to (or create) another database: compact exactly args.db.
+        db = SkeyDB(args.db, fallback=False)
+        report = db.compact_history(keep_last=args.keep_last, older_than=older_than)
+    except sqlite3.DatabaseError as exc:
+        print(f"Compaction aborted, history left unchanged: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        if db is not None:
+            db.close()
+
+    print(f"Deduplicated revisions: {report.revisions_deduplicated}")
+    print(f"Pruned revisions: {report.revisions_pruned}")
+    print(f"Size: {report.bytes_before} -> {report.bytes_after} bytes ({report.bytes_reclaimed} reclaimed)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="openiso-maintenance", description="OpenIso database maintenance.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser("compact", help="Deduplicate and prune revision history, then VACUUM/ANALYZE.")
+    compact.add_argument("--db", default=DB_PATH, help="Path to the symbol database.")
+    compact.add_argument("--keep-last", type=int, default=None, help="Revisions to keep per symbol.")
+    compact.add_argument("--older-than-days", type=float, default=None,
+                         help="Only prune revisions older than this many days.")
+    compact.set_defaults(handler=_compact)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -22,7 +22,7 @@ class SkeyRepository:
 
 	@property
 	def skeys(self) -> Dict[str, SkeyData]:
-		"""Get all skeys"""
+		"""Get all skeys (SkeyService keeps metadata only here; geometry is loaded on demand)"""
 		return self._skeys
 
 	@property
@@ -73,6 +73,8 @@ class SkeyRepository:
 	def build_groups(self) -> SkeyGroup:
 		"""Build SkeyGroup structure from loaded skeys"""
 		group_obj = SkeyGroup()
+		# Names are unique dict keys, so skip add_skey()'s linear duplicate check.
 		for skey_name, skey_data in self._skeys.items():
-			group_obj.add_skey(skey_data.group_key, skey_data.subgroup_key, skey_name)
+			subgroups = group_obj.groups.setdefault(skey_data.group_key, {})
+			subgroups.setdefault(skey_data.subgroup_key, []).append(skey_name)
 		return group_obj
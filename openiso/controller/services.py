@@ -1,17 +1,53 @@
 # SPDX-License-Identifier: MIT
 # SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
 
-import hashlib
 import json
 import os
-from typing import Optional
-
+import time
+from dataclasses import replace
+from typing import Iterable, Optional
+
+from openiso.controller.catalog_reader import (
+    iter_catalog_symbols,
+    normalize_catalog_geometry,
+    prepare_catalog_entries,
+)
 from openiso.controller.db import SkeyDB
+from openiso.controller.geometry_cache import GeometryCache
 from openiso.controller.repository import SkeyRepository
+from openiso.controller.snapshot import (
+    pack_records,
+    read_snapshot,
+    snapshot_path,
+    unpack_records,
+    write_snapshot,
+)
+from openiso.core.constants import AVAILABLE_LANGUAGES
 from openiso.model.geometry import GeometryConverter
+from openiso.model.geometry_list import LINE, POINT_OPCODES, RECTANGLE, SPINDLE_POINT, TEE_POINT, GeometryList
 from openiso.model.skey import SkeyData, SkeyGroup
 
 
+# Number of skey geometries kept in memory by SkeyService.get_skey().
+GEOMETRY_CACHE_SIZE = 128
+
+# Above this many change log rows, refresh_from_db() reloads all metadata instead.
+REFRESH_MAX_CHANGES = 1000
+
+# Worker processes used by sync_official_catalog() to hash and normalize payloads;
+# 0 or 1 keeps that work in-process. Entries are sent to workers in chunks.
+CATALOG_SYNC_WORKERS = 0
+CATALOG_SYNC_CHUNK_SIZE = 500
+
+# Worker processes used by import_from_ascii()/import_from_idf() to parse and convert
+# symbol files; 0 or 1 keeps the import in-process.
+IMPORT_WORKERS = 0
+
+
+class _ImportRolledBack(Exception):
+    """Raised inside the import transaction to discard an import with parse errors."""
+
+
 class GeometryService:
     """
     Service for geometry-related calculations.
@@ -40,6 +76,21 @@ class GeometryService:
         return result
 
 
+def _translated_names(translations: dict, skey: SkeyData) -> str:
+    """Join the translated group, subgroup, name and description of a skey for the search index."""
+    texts = []
+    node = translations
+    for part in (skey.group_key, skey.subgroup_key, skey.name.lower()):
+        node = node.get(part) if isinstance(node, dict) else None
+        if isinstance(node, str):
+            texts.append(node)
+        elif isinstance(node, dict):
+            texts.append(node.get("_name", ""))
+    if isinstance(node, dict):
+        texts.append(node.get("description", ""))
+    return " ".join(text for text in texts if isinstance(text, str) and text)
+
+
 class SkeyService:
     """
     Main service class that coordinates all Skey business logic.
@@ -47,29 +98,46 @@ class SkeyService:
     """
     def __init__(self, data_path: Optional[str] = None, use_db: bool = True):
         self._data_path = data_path
+        # Light metadata records only; geometry is loaded on demand through _geometry_cache.
         self._repository = SkeyRepository()
+        self._geometry_cache = GeometryCache(GEOMETRY_CACHE_SIZE)
+        # Position in the DB change log and change token of the last load/refresh.
+        self._change_seq = 0
+        self._change_token = None
+        self._db_groups_merged = False
         self._geometry_converter = GeometryConverter()
         self._groups = SkeyGroup()
         self._descriptions = {}
         self._use_db = use_db
+        # Spindles restored from the warm-start snapshot; None means read them from the DB.
+        self._spindles = None
+        # Source, size and duration of the last full load, for startup timing reports.
+        self.load_report = {}
 
         # Build database path from data_path
         if data_path:
             db_path = os.path.join(data_path, 'database', 'openiso.db')
             self._db = SkeyDB(db_path)
+            self._snapshot_path = snapshot_path(self._db.db_path)
         else:
             self._db = SkeyDB()
+            self._snapshot_path = None
+        # State key of the snapshot file when it is known to match the DB.
+        self._snapshot_key = None
 
         if self._use_db:
             self.load_skeys_from_db()
+            self.refresh_search_translations()
         elif data_path:
             # Optionally implement loading from JSON if needed
             pass
 
     def reload_groups(self):
-        """Reload skeys from DB and rebuild SkeyGroup from current repository data."""
-        self.load_skeys_from_db()
+        """Bring skeys and SkeyGroup up to date with the DB; does nothing if the DB has not changed."""
+        if not self.refresh_from_db() and self._db_groups_merged:
+            return
         # Populate the group structure from groups and subgroups tables
+        self._db_groups_merged = True
         db_groups = self._db.get_all_groups()
         for g_key in db_groups:
             if g_key not in self._groups.get_groups():
@@ -95,16 +163,49 @@ class SkeyService:
             return False
 
     def load_skeys_from_db(self) -> bool:
-        """Load skeys from the database and update groups."""
+        """Load skey metadata (no geometry) and groups, from the warm-start snapshot if it is current."""
         try:
+            start = time.perf_counter()
             print(f"Loading skeys from database: {self._db.db_path}")
-            skeys = self._db.get_all_skeys()
-            print(f"Loaded {len(skeys)} skeys from database")
+            # Read the change position first: changes racing with the load are re-applied by refresh_from_db.
+            self._change_token = self._db.change_token()
+            self._db_groups_merged = False
+            state_key = self._db.library_state_key() if self._snapshot_path else None
+            snapshot = read_snapshot(self._snapshot_path, state_key) if state_key else None
+            if snapshot is not None:
+                try:
+                    skeys = unpack_records(snapshot["skeys"], SkeyData)
+                    self._spindles = unpack_records(snapshot["spindles"], SkeyData)
+                    groups = SkeyGroup({
+                        group_key: {subgroup_key: list(names) for subgroup_key, names in subgroups.items()}
+                        for group_key, subgroups in snapshot["groups"].items()
+                    })
+                    change_seq = int(snapshot["change_seq"])
+                except (KeyError, TypeError, ValueError, AttributeError) as e:
+                    print(f"Ignoring malformed library snapshot: {e}")
+                    skeys = None
+                if skeys is None or self._spindles is None:
+                    snapshot = None
+            if snapshot is not None:
+                source = "snapshot"
+                self._change_seq = change_seq
+                self._snapshot_key = state_key
+            else:
+                source = "database"
+                self._change_seq = self._db.latest_change_seq()
+                skeys = self._db.get_all_skey_metadata()
+                self._spindles = None
+            print(f"Loaded {len(skeys)} skeys from {source}")
+            self._geometry_cache.clear()
             self._repository.skeys.clear()
             for skey in skeys:
                 self._repository.skeys[skey.name] = skey
-            self._groups = self._repository.build_groups() if hasattr(self._repository, 'build_groups') else SkeyGroup()
+            if snapshot is not None:
+                self._groups = groups
+            else:
+                self._groups = self._repository.build_groups() if hasattr(self._repository, 'build_groups') else SkeyGroup()
             print(f"Built groups with {len(self._groups.get_groups())} top-level groups")
+            self.load_report = {"source": source, "skeys": len(skeys), "seconds": time.perf_counter() - start}
             return True
         except Exception as e:
             print(f"Error loading skeys from DB: {e}")
@@ -112,6 +213,66 @@ class SkeyService:
             traceback.print_exc()
             return False
 
+    def save_snapshot(self) -> bool:
+        """Write the warm-start snapshot of the loaded library unless the cached one is current.
+
+        Returns True if a snapshot was written.
+        """
+        if not self._snapshot_path or not self._use_db:
+            return False
+        self.refresh_from_db()
+        state_key = self._db.library_state_key()
+        if state_key == self._snapshot_key or self._db.latest_change_seq() != self._change_seq:
+            return False
+        written = write_snapshot(
+            self._snapshot_path,
+            state_key,
+            change_seq=self._change_seq,
+            skeys=pack_records(self._repository.skeys.values()),
+            groups=self._groups.groups,
+            spindles=pack_records(self.get_all_spindles()),
+        )
+        if written:
+            self._snapshot_key = state_key
+        return written
+
+    def refresh_from_db(self) -> bool:
+        """Apply skeys rows inserted, updated or deleted since the last load or refresh.
+
+        Costs one small query when nothing was committed since; otherwise reads only the
+        changed rows from the change log (or reloads everything if the log was pruned
+        or holds more than REFRESH_MAX_CHANGES rows, e.g. after a catalog sync).
+        Returns True if the database changed.
+        """
+        token = self._db.change_token()
+        if token == self._change_token:
+            return False
+        changes = self._db.get_changes_since(self._change_seq)
+        if changes is None or len(changes[1]) > REFRESH_MAX_CHANGES:
+            self.load_skeys_from_db()
+            return True
+        self._change_token = token
+        self._change_seq, rows = changes
+
+        deleted_names = {name for _, _, name, op in rows if op == "delete"}
+        changed_ids = {skey_id for _, skey_id, _, op in rows if op != "delete"}
+        skeys = self._repository.skeys
+        for name in deleted_names:
+            old = skeys.pop(name, None)
+            if old is not None:
+                self._groups.remove_skey(old.group_key, old.subgroup_key, name)
+            self._geometry_cache.invalidate(name)
+        for skey in self._db.get_skey_metadata_by_ids(changed_ids):
+            old = skeys.get(skey.name)
+            moved = old is None or (old.group_key, old.subgroup_key) != (skey.group_key, skey.subgroup_key)
+            if old is not None and moved:
+                self._groups.remove_skey(old.group_key, old.subgroup_key, skey.name)
+            skeys[skey.name] = skey
+            if moved:
+                self._groups.add_skey(skey.group_key, skey.subgroup_key, skey.name)
+            self._geometry_cache.invalidate(skey.name)
+        return True
+
     def load_skeys(self) -> bool:
         """Alias for load_skeys_from_db to match expected interface."""
         return self.load_skeys_from_db()
@@ -120,20 +281,7 @@ class SkeyService:
         return self._db.get_sync_conflicts()
 
     def _normalize_catalog_geometry(self, symbol_code: str, payload: dict) -> list[str]:
-        raw_geometry = payload.get("geometry", [])
-        if not isinstance(raw_geometry, list):
-            return []
-
-        is_legacy_raw_geometry = any(not isinstance(item, str) for item in raw_geometry)
-        if not is_legacy_raw_geometry:
-            is_legacy_raw_geometry = any(
-                isinstance(item, str) and ":" not in item for item in raw_geometry if item
-            )
-
-        if is_legacy_raw_geometry:
-            return self._geometry_converter.convert_graphics(symbol_code, raw_geometry)
-
-        return [item for item in raw_geometry if isinstance(item, str) and item]
+        return normalize_catalog_geometry(symbol_code, payload, self._geometry_converter)
 
     def _serialize_skey_snapshot(self, skey: SkeyData) -> dict:
         return {
@@ -200,6 +348,7 @@ class SkeyService:
         payload_hash: str,
         *,
         local_revision: int = 1,
+        geometry: Optional[list] = None,
     ) -> SkeyData:
         return SkeyData(
             name=symbol_code,
@@ -212,7 +361,7 @@ class SkeyService:
             dimensioned=int(payload.get("dimensioned", 0)),
             tracing=int(payload.get("tracing", 0)),
             insulation=int(payload.get("insulation", 0)),
-            geometry=self._normalize_catalog_geometry(symbol_code, payload),
+            geometry=geometry if geometry is not None else self._normalize_catalog_geometry(symbol_code, payload),
             origin_type="official",
             is_official=1,
             is_user_modified=0,
@@ -251,7 +400,7 @@ class SkeyService:
 
         self._db.ensure_subgroup_exists(official_skey.group_key, official_skey.subgroup_key)
         self._db.update_skey(official_skey, comment="resolve_accept_upstream")
-        self.load_skeys_from_db()
+        self.refresh_from_db()
         return True
 
     def resolve_sync_conflict_keep_local(self, skey_name: str) -> bool:
@@ -264,11 +413,22 @@ class SkeyService:
         existing.sync_state = "synced"
         self._db.ensure_subgroup_exists(existing.group_key, existing.subgroup_key)
         self._db.update_skey(existing, comment="resolve_keep_local")
-        self.load_skeys_from_db()
+        self.refresh_from_db()
         return True
 
-    def sync_official_catalog(self, release_version: str) -> dict:
-        """Sync bundled official symbols into user DB without overwriting user content."""
+    def sync_official_catalog(
+        self, release_version: str, force: bool = False, workers: Optional[int] = None
+    ) -> dict:
+        """Sync bundled official symbols into user DB without overwriting user content.
+
+        Symbols whose payload hash matches the one already stored are skipped, so
+        re-syncing an unchanged catalog writes no geometry. The catalog (bundled map
+        or OpenIso.Canonical document) is streamed symbol by symbol inside one
+        transaction; the result includes a per-phase timing breakdown in seconds.
+        Set force to sync even if release_version was already synced. With workers > 1
+        (default CATALOG_SYNC_WORKERS), payload hashing and geometry normalization
+        run on that many processes while this thread does all database writes.
+        """
         if not self._data_path:
             return {"synced": False, "reason": "no_data_path"}
 
@@ -277,29 +437,87 @@ class SkeyService:
         if not os.path.exists(catalog_path):
             return {"synced": False, "reason": "catalog_missing"}
 
+        last_synced = self._db.get_metadata("last_synced_release_version")
+        if last_synced == release_version and not force:
+            return {"synced": False, "reason": "already_synced", "release": release_version}
+
+        timings = dict.fromkeys(("load", "hash", "prefetch", "write", "refresh"), 0.0)
+        start = time.perf_counter()
+
         manifest_data = {}
         if os.path.exists(manifest_path):
             with open(manifest_path, "r", encoding="utf-8") as manifest_file:
                 manifest_data = json.load(manifest_file)
-
         symbol_versions = manifest_data.get("symbols", {})
 
-        last_synced = self._db.get_metadata("last_synced_release_version")
-        if last_synced == release_version:
-            return {"synced": False, "reason": "already_synced", "release": release_version}
-
-        with open(catalog_path, "r", encoding="utf-8") as catalog_file:
-            catalog_data = json.load(catalog_file)
+        catalog_hashes = self._db.get_catalog_hashes(release_version)
+        upstream_states = self._db.get_upstream_states()
+        timings["prefetch"] = time.perf_counter() - start
+
+        stats = {"inserted": 0, "updated": 0, "conflict": 0, "skipped_user": 0, "unchanged": 0}
+        unchanged_official = []
+        if workers is None:
+            workers = CATALOG_SYNC_WORKERS
+
+        # Parse, prepare and upsert symbols as a pipeline; only a few chunks are held at once.
+        with open(catalog_path, "r", encoding="utf-8") as catalog_file, self._db.transaction():
+            def parsed_entries():
+                symbols = iter_catalog_symbols(catalog_file)
+                while True:
+                    step = time.perf_counter()
+                    entry = next(symbols, None)
+                    timings["load"] += time.perf_counter() - step
+                    if entry is None:
+                        return
+                    symbol_code, payload = entry
+                    manifest_entry = symbol_versions.get(symbol_code, {})
+                    symbol_version = int(manifest_entry.get("version", payload.get("symbol_version", 1)))
+                    state = upstream_states.get(symbol_code)
+                    yield symbol_code, payload, symbol_version, state[2] if state else None
+
+            prepared = prepare_catalog_entries(parsed_entries(), workers, CATALOG_SYNC_CHUNK_SIZE)
+            while True:
+                step = time.perf_counter()
+                entry = next(prepared, None)
+                # Includes parsing when run in-process; subtracted below.
+                timings["hash"] += time.perf_counter() - step
+                if entry is None:
+                    break
+
+                step = time.perf_counter()
+                self._sync_catalog_symbol(
+                    release_version, *entry,
+                    catalog_hashes, upstream_states, unchanged_official, stats,
+                )
+                timings["write"] += time.perf_counter() - step
+            timings["hash"] = max(0.0, timings["hash"] - timings["load"])
 
-        stats = {"inserted": 0, "updated": 0, "conflict": 0, "skipped_user": 0}
+            step = time.perf_counter()
+            self._db.mark_official_skeys_current(release_version, unchanged_official)
+            self._db.set_metadata("last_synced_release_version", release_version)
+        timings["write"] += time.perf_counter() - step
 
-        for symbol_code, payload in catalog_data.items():
-            manifest_entry = symbol_versions.get(symbol_code, {})
-            symbol_version = int(manifest_entry.get("version", payload.get("symbol_version", 1)))
-            payload_hash = hashlib.sha256(
-                json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
-            ).hexdigest()
+        step = time.perf_counter()
+        self.refresh_from_db()
+        timings["refresh"] = time.perf_counter() - step
+        timings["total"] = time.perf_counter() - start
+        return {"synced": True, "release": release_version, **stats, "timings": timings}
 
+    def _sync_catalog_symbol(
+        self,
+        release_version: str,
+        symbol_code: str,
+        payload: dict,
+        symbol_version: int,
+        payload_hash: str,
+        geometry: Optional[list],
+        catalog_hashes: dict,
+        upstream_states: dict,
+        unchanged_official: list,
+        stats: dict,
+    ) -> None:
+        """Sync one catalog symbol, skipping writes whose payload hash is already stored."""
+        if catalog_hashes.get(symbol_code) != (symbol_version, payload_hash):
             self._db.upsert_catalog_symbol(
                 release_version=release_version,
                 symbol_code=symbol_code,
@@ -308,49 +526,105 @@ class SkeyService:
                 payload=payload,
             )
 
-            skey = self._build_official_skey(
-                symbol_code=symbol_code,
-                payload=payload,
-                release_version=release_version,
-                symbol_version=symbol_version,
-                payload_hash=payload_hash,
-            )
-
-            result = self._db.upsert_official_skey(
-                skey=skey,
-                release_version=release_version,
-                upstream_symbol_code=symbol_code,
-                upstream_symbol_version=symbol_version,
-                upstream_payload_hash=payload_hash,
-            )
-            if result in stats:
-                stats[result] += 1
-
-        self._db.set_metadata("last_synced_release_version", release_version)
-        self.load_skeys_from_db()
-        return {"synced": True, "release": release_version, **stats}
+        state = upstream_states.get(symbol_code)
+        if state is not None and state[2] == payload_hash:
+            origin_type, is_user_modified, _, stored_release, stored_version = state
+            if (stored_release, stored_version) == (release_version, symbol_version):
+                stats["unchanged"] += 1
+                return
+            if origin_type == "official" and not is_user_modified:
+                unchanged_official.append((symbol_code, symbol_version))
+                stats["unchanged"] += 1
+                return
+
+        skey = self._build_official_skey(
+            symbol_code=symbol_code,
+            payload=payload,
+            release_version=release_version,
+            symbol_version=symbol_version,
+            payload_hash=payload_hash,
+            geometry=geometry,
+        )
+        result = self._db.upsert_official_skey(
+            skey=skey,
+            release_version=release_version,
+            upstream_symbol_code=symbol_code,
+            upstream_symbol_version=symbol_version,
+            upstream_payload_hash=payload_hash,
+        )
+        if result in stats:
+            stats[result] += 1
 
-    def delete_skey(self, skey_name: str) -> bool:
-        """Delete a skey from the database and refresh the groups."""
+    def delete_skey(self, skey_name: str, refresh: bool = True) -> bool:
+        """Delete a skey from the database and refresh the groups (later, by the caller, if refresh=False)."""
         try:
             self._db.delete_skey(skey_name)
-            self.reload_groups()
+            if refresh:
+                self.reload_groups()
             return True
         except Exception as e:
             print(f"Error deleting skey: {e}")
             return False
 
+    def get_skey_history(self, skey_name: str) -> list:
+        """List the saved revisions of a skey, newest first."""
+        return self._db.get_skey_history(skey_name)
+
+    def get_skey_at(self, skey_name: str, transaction_id: int):
+        """Get a SkeyData with the geometry it had at a given revision."""
+        return self._db.get_skey_at(skey_name, transaction_id)
+
+    def rollback_skey(self, skey_name: str, transaction_id: int) -> bool:
+        """Make the geometry of an older revision current again (recorded as a new revision)."""
+        new_transaction_id = self._db.rollback_skey(skey_name, transaction_id)
+        if new_transaction_id is None:
+            return False
+        self.refresh_from_db()
+        return True
+
     def get_spindle_geometry(self, spindle_name: str) -> list:
         """Fetch geometry for a given spindle name."""
         return self._db.get_spindle_geometry(spindle_name)
 
     def get_all_spindles(self) -> list:
-        """Fetch all spindles from the database."""
+        """Fetch all spindles from the database (or the warm-start snapshot they were loaded from)."""
+        if self._spindles is not None:
+            return list(self._spindles)
         return self._db.get_all_spindles()
 
-    def filter_groups(self, search_text: str):
-        """Filter SkeyGroup by search text."""
-        return self._groups.filter(search_text)
+    def search(self, query: str, limit: Optional[int] = 50) -> list[str]:
+        """Full-text search over skey names, keys, PCF/IDF identifiers and translations; best match first.
+
+        limit=None returns every match.
+        """
+        return self._db.search_skeys(query, limit)
+
+    def refresh_search_translations(self, names: Optional[Iterable[str]] = None) -> int:
+        """Copy the translations of skeys (all, or only names) into the search index.
+
+        Reads the in-memory trees of translation_store, so translations saved but not
+        yet written to disk are indexed too. Returns the number of translation rows that changed.
+        """
+        if names is None:
+            skeys = list(self._repository.skeys.values())
+        else:
+            skeys = [skey for skey in map(self._repository.skeys.get, names) if skey is not None]
+        return self._index_search_translations(skeys)
+
+    def _index_search_translations(self, skeys: list) -> int:
+        """Store the translations of skeys in the search index; touches the DB only."""
+        from openiso.core.i18n import translation_store
+
+        if not skeys:
+            return 0
+        changed = 0
+        for _, lang_code in AVAILABLE_LANGUAGES:
+            translations = translation_store.tree(lang_code)
+            if not translations:
+                continue
+            texts = {skey.name: _translated_names(translations, skey) for skey in skeys}
+            changed += self._db.set_skey_translations(lang_code, texts)
+        return changed
 
     def get_subgroup_names(self, group: str):
         """Get subgroup names for a group from database."""
@@ -361,9 +635,24 @@ class SkeyService:
         return self._groups.get_subgroups(group)
 
     def get_skey(self, name: str):
-        """Get a SkeyData by name."""
+        """Get a SkeyData by name, with its current geometry (loaded through the LRU cache)."""
+        metadata = self._repository.skeys.get(name)
+        if metadata is None:
+            return None
+        # The cache keeps the parsed GeometryList; callers get their own copy to edit.
+        return replace(metadata, geometry=self._geometry_cache.get(name, self._load_geometry_list).copy())
+
+    def _load_geometry_list(self, name: str) -> GeometryList:
+        return GeometryList.from_strings(self._db.get_skey_geometry(name))
+
+    def get_skey_metadata(self, name: str):
+        """Get a SkeyData by name without loading geometry (geometry is empty)."""
         return self._repository.skeys.get(name)
 
+    def geometry_cache_stats(self) -> dict:
+        """Hit/miss counters and size of the geometry cache."""
+        return self._geometry_cache.stats()
+
     def update_skey(
         self,
         name: str,
@@ -386,10 +675,15 @@ class SkeyService:
         source_type: str = "standard",
         source_version: str = "",
         isogen_standard: int = 0,
+        refresh: bool = True,
     ):
-        """Update or create a Skey in the database using hierarchical keys."""
-        from openiso.core.i18n import save_json_translation
+        """Update or create a Skey in the database using hierarchical keys.
 
+        With refresh=False only the database (and translation files) are written;
+        the caller applies the change to skeys and groups later with reload_groups(),
+        e.g. on the thread that owns them.
+        """
+        from openiso.core.i18n import save_json_translation, translation_store
 
         def clean_key(val):
             if not val: return "unknown"
@@ -405,23 +699,25 @@ class SkeyService:
         g_id = clean_key(group_key).lower().replace(' ', '_').replace('-', '_')
         sg_id = clean_key(subgroup_key).lower().replace(' ', '_').replace('-', '_')
 
-        # If we received a display name (not a key), store its translation
-        if "." not in group_key:
-            save_json_translation(f"{g_id}._name", group_key, lang_code)
-        if "." not in subgroup_key:
-            save_json_translation(f"{g_id}.{sg_id}._name", subgroup_key, lang_code)
-
         # Build hierarchical keys for Skey
         name_i18n_key = f"{g_id}.{sg_id}.{name.lower()}"
         desc_i18n_key = f"{name_i18n_key}.description"
 
-        # Save the Skey name translation
-        save_json_translation(name_i18n_key, name, lang_code)
+        # One translation file write per language for the whole save
+        with translation_store.batch():
+            # If we received a display name (not a key), store its translation
+            group_renamed = "." not in group_key and save_json_translation(f"{g_id}._name", group_key, lang_code)
+            subgroup_renamed = "." not in subgroup_key and save_json_translation(
+                f"{g_id}.{sg_id}._name", subgroup_key, lang_code
+            )
+
+            # Save the Skey name translation
+            save_json_translation(name_i18n_key, name, lang_code)
 
-        if description_key and "." not in description_key and not description_key.startswith("description."):
-            save_json_translation(desc_i18n_key, description_key, lang_code)
+            if description_key and "." not in description_key and not description_key.startswith("description."):
+                save_json_translation(desc_i18n_key, description_key, lang_code)
 
-        existing = self.get_skey(name)
+        existing = self._db.get_skey_metadata(name)
         if existing:
             if existing.origin_type in ("official", "forked_official"):
                 origin_type = "forked_official"
@@ -489,14 +785,25 @@ class SkeyService:
         # Update in database
         self._db.update_skey(skey)
 
-        # Update in repository
-        self._repository.skeys[name] = skey
+        # A renamed group or subgroup changes the searched text of every skey in it.
+        if group_renamed or subgroup_renamed:
+            reindexed = self._db.get_skey_metadata_by_group(g_id, None if group_renamed else sg_id)
+        else:
+            reindexed = [skey]
+        self._index_search_translations(reindexed)
 
-        # Rebuild groups
-        self._groups = self._repository.build_groups()
+        if refresh:
+            # Update repository and groups from the change log
+            self.refresh_from_db()
 
         print(f"Skey '{name}' updated successfully with hierarchy: {g_id} -> {sg_id}")
         return True
+    def close(self):
+        """Save the warm-start snapshot and close the database connections opened by this service."""
+        if self._use_db:
+            self.save_snapshot()
+        self._db.close()
+
     def save_skeys(self):
         """Save all skeys (called after updates)."""
         # Data is already saved in database by update_skey
@@ -504,26 +811,63 @@ class SkeyService:
         print("Skeys saved to database")
         return True
 
-    def import_from_ascii(self, file_path: str):
-        """Import skeys from ASCII file."""
-        from openiso.controller.importers import SkeyImporterFactory
+    def import_from_ascii(self, file_path: str, workers: Optional[int] = None, refresh: bool = True):
+        """Import skeys from ASCII file.
+
+        Skeys are streamed from the importer straight into one database transaction,
+        so memory does not grow with the file. Any parse error rolls the import back.
+        With workers > 1 (default IMPORT_WORKERS) the file is parsed on worker processes.
+        With refresh=False the loaded skeys are left for the caller to refresh_from_db().
+        """
+        from openiso.controller.importers import ImportResult, SkeyImporterFactory
+        start = time.perf_counter()
         importer = SkeyImporterFactory.create_importer(file_path, self._descriptions, self._geometry_converter)
-        result = importer.import_from_file(file_path)
-        if result.success:
-            for name, skey in result.skeys.items():
+        groups = SkeyGroup()
+        imported_names = set()
+        imported_count = 0
+
+        def imported_skeys():
+            nonlocal imported_count
+            for skey in importer.iter_file_skeys(file_path, IMPORT_WORKERS if workers is None else workers):
                 skey.origin_type = "imported"
                 skey.is_official = 0
                 skey.is_user_modified = 0
                 skey.local_revision = 1
                 skey.sync_state = "synced"
-                self._db.update_skey(skey)
-                self._repository.skeys[name] = skey
-            self._groups = self._repository.build_groups()
+                if skey.name in imported_names:
+                    groups.add_skey(skey.group_key, skey.subgroup_key, skey.name)
+                else:
+                    # Not listed yet: skip add_skey()'s linear duplicate check.
+                    groups.groups.setdefault(skey.group_key, {}).setdefault(skey.subgroup_key, []).append(skey.name)
+                    imported_names.add(skey.name)
+                imported_count += 1
+                yield skey
+
+        errors = []
+        try:
+            with self._db.transaction():
+                self._db.bulk_upsert_skeys(imported_skeys())
+                errors = importer.errors
+                if errors:
+                    raise _ImportRolledBack()
+        except _ImportRolledBack:
+            pass
+        except (OSError, UnicodeDecodeError) as e:
+            errors = [f"Failed to read file: {e}"]
+
+        result = ImportResult(
+            success=not errors, skeys={}, groups=groups, errors=errors, imported_count=imported_count
+        )
+        if result.success and refresh:
+            self.refresh_from_db()
+        result.elapsed_seconds = time.perf_counter() - start
+        print(f"Imported {result.imported_count} skeys in {result.elapsed_seconds:.3f}s "
+              f"({result.symbols_per_second:.0f} symbols/s)")
         return result
 
-    def import_from_idf(self, file_path: str):
+    def import_from_idf(self, file_path: str, workers: Optional[int] = None, refresh: bool = True):
         """Import skeys from IDF file."""
-        return self.import_from_ascii(file_path)
+        return self.import_from_ascii(file_path, workers, refresh)
 
     def export_skey_to_ascii(self, skey: SkeyData) -> str:
         """
@@ -545,39 +889,26 @@ class SkeyService:
         lines = [header]
 
         # 2. Geometry 502
-        # Convert standardized geometry strings to raw (Action, X, Y)
+        # Convert the typed primitives to raw (Action, X, Y)
         # Using scale 20.0 (inverse of 0.05) and an offset of 50.0 to keep coords positive
         raw_geom = []
         offset_val = 50.0
 
-        for item in skey.geometry:
-            try:
-                item_parts = item.split(":", 1)
-                item_type = item_parts[0].strip()
-                params_str = item_parts[1].strip()
-
-                vals = {}
-                for p in params_str.split(" "):
-                    if "=" in p:
-                        k, v = p.split("=")
-                        vals[k] = float(v)
-
-                if item_type in ("ArrivePoint", "LeavePoint", "TeePoint", "SpindlePoint"):
-                    action = "1"
-                    if item_type == "TeePoint": action = "3"
-                    elif item_type == "SpindlePoint": action = "6"
-                    raw_geom.append((action, round((vals["x0"] + offset_val) * 20.0, 1), round((vals["y0"] + offset_val) * 20.0, 1)))
-                elif item_type == "Line":
-                    raw_geom.append(("1", round((vals["x1"] + offset_val) * 20.0, 1), round((vals["y1"] + offset_val) * 20.0, 1)))
-                    raw_geom.append(("2", round((vals["x2"] + offset_val) * 20.0, 1), round((vals["y2"] + offset_val) * 20.0, 1)))
-                elif item_type == "Rectangle":
-                    x, y, w, h = vals["x0"], vals["y0"], vals["width"], vals["height"]
-                    rect_pts = [(x - w/2, y - h/2), (x + w/2, y - h/2), (x + w/2, y + h/2), (x - w/2, y + h/2), (x - w/2, y - h/2)]
-                    for i, (px, py) in enumerate(rect_pts):
-                        act = "1" if i == 0 else "2"
-                        raw_geom.append((act, round((px + offset_val) * 20.0, 1), round((py + offset_val) * 20.0, 1)))
-            except (ValueError, IndexError, KeyError):
-                continue
+        for opcode, coords, _, _ in skey.geometry_list().primitives():
+            if opcode in POINT_OPCODES:
+                action = "1"
+                if opcode == TEE_POINT: action = "3"
+                elif opcode == SPINDLE_POINT: action = "6"
+                raw_geom.append((action, round((coords[0] + offset_val) * 20.0, 1), round((coords[1] + offset_val) * 20.0, 1)))
+            elif opcode == LINE:
+                raw_geom.append(("1", round((coords[0] + offset_val) * 20.0, 1), round((coords[1] + offset_val) * 20.0, 1)))
+                raw_geom.append(("2", round((coords[2] + offset_val) * 20.0, 1), round((coords[3] + offset_val) * 20.0, 1)))
+            elif opcode == RECTANGLE:
+                x, y, w, h = coords
+                rect_pts = [(x - w/2, y - h/2), (x + w/2, y - h/2), (x + w/2, y + h/2), (x - w/2, y + h/2), (x - w/2, y - h/2)]
+                for i, (px, py) in enumerate(rect_pts):
+                    act = "1" if i == 0 else "2"
+                    raw_geom.append((act, round((px + offset_val) * 20.0, 1), round((py + offset_val) * 20.0, 1)))
 
         if not raw_geom:
             return "\n".join(lines)
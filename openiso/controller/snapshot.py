@@ -0,0 +1,100 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+
+"""
+Warm-start snapshot of the loaded skey library.
+
+The skey metadata, SkeyGroup tree and spindle list are written as JSON to the
+user cache directory together with SkeyDB.library_state_key(). On the next
+start the file is decoded in one step; any mismatch in the key (another DB
+file, a schema upgrade or a write since) or any decoding error makes it
+stale, and the caller loads from the database instead. JSON only holds plain
+data, so a tampered cache file cannot run code.
+
+Records are stored as plain rows plus their field names (see pack_records):
+decoding lists and calling the dataclass constructor is much faster than
+decoding one object per record.
+"""
+import dataclasses
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+from collections.abc import Sequence
+from typing import Iterable, List, Optional
+
+from openiso.core.constants import user_cache_dir
+
+# Bump when the stored layout or SkeyData fields change.
+SNAPSHOT_FORMAT = 2
+
+
+def _plain(value):
+    """json.dump() fallback: geometry sequences (e.g. GeometryList) are stored as their strings."""
+    if isinstance(value, Sequence):
+        return list(value)
+    raise TypeError(f"Cannot store {type(value).__name__} in a library snapshot")
+
+
+def pack_records(records: Iterable) -> dict:
+    """Pack dataclass instances of one type as {"fields": names, "rows": [tuple, ...]}."""
+    records = list(records)
+    if not records:
+        return {"fields": (), "rows": []}
+    names = tuple(field.name for field in dataclasses.fields(records[0]))
+    return {"fields": names, "rows": [tuple(getattr(record, name) for name in names) for record in records]}
+
+
+def unpack_records(packed: dict, cls) -> Optional[List]:
+    """Rebuild cls instances from pack_records() output; None if the fields of cls changed since."""
+    rows = packed["rows"]
+    if not rows:
+        return []
+    if tuple(packed["fields"]) != tuple(field.name for field in dataclasses.fields(cls)):
+        return None
+    try:
+        return list(itertools.starmap(cls, rows))
+    except TypeError:
+        # Rows of the wrong length or shape.
+        return None
+
+
+def snapshot_path(db_path: str) -> str:
+    """Cache file of the snapshot for the database at db_path."""
+    digest = hashlib.sha1(os.path.realpath(db_path).encode("utf-8")).hexdigest()[:16]
+    return user_cache_dir("snapshots", f"library-{digest}.json")
+
+
+def read_snapshot(path: str, key: tuple) -> Optional[dict]:
+    """Return the snapshot stored at path if it was written for key, else None."""
+    try:
+        with open(path, "rb") as f:
+            snapshot = json.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        # Empty, truncated or corrupt file (JSONDecodeError and UnicodeDecodeError are ValueErrors): treat as stale.
+        print(f"Ignoring unreadable library snapshot {path}: {e}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT or snapshot.get("key") != list(key):
+        return None
+    return snapshot
+
+
+def write_snapshot(path: str, key: tuple, **state) -> bool:
+    """Atomically write state (e.g. skeys, groups, spindles) as the snapshot for key."""
+    tmp_path = None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), suffix=".tmp", delete=False) as f:
+            tmp_path = f.name
+            f.write(json.dumps({"format": SNAPSHOT_FORMAT, "key": key, **state},
+                               default=_plain, separators=(",", ":")).encode("utf-8"))
+        os.replace(tmp_path, path)
+        return True
+    except (OSError, TypeError, ValueError) as e:
+        print(f"Failed to write library snapshot {path}: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
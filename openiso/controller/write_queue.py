@@ -0,0 +1,104 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+
+"""
+Write-behind queue for database writes.
+
+Save, delete and import jobs run one at a time, in submission order, on a
+single background thread so the GUI thread never waits for SQLite commits or
+translation file rewrites. Completion is reported through a callback invoked
+on the writer thread; GUI code forwards it to the Qt thread with a signal.
+"""
+
+import itertools
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class WriteJob:
+    """A queued write and, once finished, its outcome."""
+    job_id: int
+    kind: str
+    name: str = ""
+    result: Any = None
+    error: Optional[BaseException] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def success(self) -> bool:
+        return self.done and self.error is None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job has run; returns False on timeout."""
+        return self._done.wait(timeout)
+
+
+class SkeyWriteQueue:
+    """Serializes write jobs on one daemon thread, in FIFO order."""
+
+    def __init__(self, on_finished: Optional[Callable[[WriteJob], None]] = None):
+        self.on_finished = on_finished
+        self._jobs: queue.Queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="openiso-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, kind: str, name: str, func: Callable[..., Any], /, *args, **kwargs) -> WriteJob:
+        """Queue func(*args, **kwargs) to run after every job submitted before it.
+
+        kind and name (e.g. "save" and the skey name) only label the job for callbacks.
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            job = WriteJob(next(self._ids), kind, name)
+            self._jobs.put((job, func, args, kwargs))
+        return job
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs queued or running."""
+        return self._jobs.unfinished_tasks
+
+    def flush(self) -> None:
+        """Block until every job submitted so far has finished."""
+        self._jobs.join()
+
+    def close(self) -> None:
+        """Finish all queued jobs, then stop the writer thread. Safe to call twice."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._jobs.get()
+            try:
+                if item is None:
+                    return
+                job, func, args, kwargs = item
+                try:
+                    job.result = func(*args, **kwargs)
+                except Exception as e:
+                    job.error = e
+                    print(f"Write job {job.kind} '{job.name}' failed: {e}")
+                job._done.set()
+                if self.on_finished is not None:
+                    try:
+                        self.on_finished(job)
+                    except Exception as e:
+                        print(f"Error in write job callback: {e}")
+            finally:
+                self._jobs.task_done()
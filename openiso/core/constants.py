@@ -210,3 +210,9 @@ def _find_data_root() -> str:
 PROJECT_ROOT = _find_project_root()
 DATA_ROOT = _find_data_root()
 LOCALEDIR = os.path.join(os.path.dirname(DATA_ROOT), 'po') if os.path.basename(DATA_ROOT) == 'data' else os.path.join(DATA_ROOT, 'po')
+
+
+def user_cache_dir(*parts: str) -> str:
+    """Per-user cache directory for OpenIso ($XDG_CACHE_HOME/openiso), joined with parts."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'openiso', *parts)
@@ -1,90 +1,224 @@
 # SPDX-License-Identifier: MIT
 # SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
 
+import atexit
 import gettext
-import glob
 import json
 import locale
 import os
-import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
 from typing import Optional
 
-from openiso.core.constants import AVAILABLE_LANGUAGES, LOCALEDIR
+from openiso.core.constants import AVAILABLE_LANGUAGES, LOCALEDIR, user_cache_dir
 
 # Global translation state
 _gettext = None
 lang_trans = None
 _current_lang = 'en'
 _json_trans = {}
+# Lower-cased dotted key -> translation for the current language, built from
+# _json_trans; None marks a node without a display name (see _t).
+_json_index = {}
+_MISSING = object()
+
+# Seconds a translation change may wait before TranslationStore writes it out.
+TRANSLATION_FLUSH_DELAY = 0.5
+
+def _unquote_po(text: str) -> str:
+    # PO strings use C escapes; JSON string syntax covers the ones used in practice
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text.strip('"')
+
+
+def load_po_catalog(po_path: str) -> dict:
+    """Parse a .po file into {msgid: msgstr}, skipping fuzzy and untranslated entries like msgfmt.
+
+    Entries with a msgctxt are keyed "<context>\x04<msgid>", as in .mo files.
+    """
+    messages = {}
+    entry = {}
+    flags = ""
+    field = None
+
+    def finish():
+        msgid = entry.get('msgid')
+        msgstr = entry.get('msgstr', entry.get('msgstr[0]'))
+        if msgid and msgstr and 'fuzzy' not in flags:
+            key = f"{entry['msgctxt']}\x04{msgid}" if 'msgctxt' in entry else msgid
+            messages[key] = msgstr
+
+    with open(po_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('"'):
+                if field is not None:
+                    entry[field] += _unquote_po(line)
+                continue
+            has_msgstr = any(name.startswith('msgstr') for name in entry)
+            # Blank lines and comments (including "#~" obsolete entries) end an entry
+            if not line or line.startswith('#'):
+                if has_msgstr:
+                    finish()
+                    entry, flags, field = {}, "", None
+                if line.startswith('#,'):
+                    flags += line[2:]
+                continue
+            keyword, _, rest = line.partition(' ')
+            if keyword in ('msgctxt', 'msgid') and has_msgstr:
+                finish()
+                entry, flags = {}, ""
+            field = keyword
+            entry[field] = _unquote_po(rest.strip())
+    finish()
+    return messages
+
+
+def _load_cached_catalog(lang_code: str) -> Optional[dict]:
+    """Messages of LOCALEDIR/<lang>.po, cached on disk and reparsed only when the .po changes."""
+    po_path = os.path.join(LOCALEDIR, f"{lang_code}.po")
+    try:
+        po_stat = os.stat(po_path)
+    except OSError:
+        return None
+
+    stamp = [os.path.abspath(po_path), po_stat.st_mtime_ns, po_stat.st_size]
+    cache_path = user_cache_dir('translations', f"{lang_code}.json")
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('source') == stamp:
+            return cached['messages']
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    messages = load_po_catalog(po_path)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=os.path.dirname(cache_path), suffix='.tmp', delete=False
+        ) as f:
+            json.dump({'source': stamp, 'messages': messages}, f, ensure_ascii=False)
+        os.replace(f.name, cache_path)
+    except OSError as e:
+        print(f"[i18n] Failed to cache translations for {lang_code}: {e}")
+    return messages
+
+
+class _CatalogTranslations(gettext.NullTranslations):
+    """gettext translations backed by a parsed .po catalog."""
+
+    def __init__(self, messages: dict):
+        super().__init__()
+        self._catalog = messages
+
+    def gettext(self, message):
+        return self._catalog.get(message, message)
+
+    def pgettext(self, context, message):
+        return self._catalog.get(f"{context}\x04{message}", message)
 
-def compile_translations():
-    """Auto-compile .po to .mo for all available languages."""
-    for po_path in glob.glob(os.path.join(LOCALEDIR, '*.po')):
-        lang_code = os.path.splitext(os.path.basename(po_path))[0]
-        mo_dir = os.path.join(LOCALEDIR, lang_code, 'LC_MESSAGES')
-        mo_path = os.path.join(mo_dir, 'openiso.mo')
-        os.makedirs(mo_dir, exist_ok=True)
-        # Only recompile if .mo is missing or .po is newer
-        if not os.path.exists(mo_path) or os.path.getmtime(po_path) > os.path.getmtime(mo_path):
-            try:
-                subprocess.run([
-                    'msgfmt', po_path, '-o', mo_path
-                ], check=True)
-            except Exception as e:
-                print(f"[i18n] Failed to compile {po_path} to {mo_path}: {e}")
 
 def get_translator(lang_code):
-    """Set up and return a translator for the given language code."""
-    gettext.bindtextdomain('openiso', LOCALEDIR)
-    gettext.textdomain('openiso')
+    """Return a translator for the given language code.
+
+    Reads LOCALEDIR/<lang>.po in-process (through an mtime-keyed cache); without
+    a .po file, falls back to compiled .mo catalogs such as installed builds ship.
+    """
+    messages = _load_cached_catalog(lang_code)
+    if messages is not None:
+        return _CatalogTranslations(messages)
     return gettext.translation('openiso', LOCALEDIR, languages=[lang_code], fallback=True)
 
-# Initialize translations
-compile_translations()
 
 def get_current_language():
     """Returns the current language code."""
+    if _gettext is None:
+        setup_i18n()
     return _current_lang
 
+def _index_node(node):
+    """Index value of a translation tree node, mirroring the nested lookup of _t."""
+    if isinstance(node, str):
+        return node
+    if isinstance(node, dict) and "_name" in node:
+        return node["_name"]
+    return None
+
+
+def _indexable(part) -> bool:
+    # _t lower-cases each key part and splits on dots, so other keys are unreachable
+    return part == part.lower() and "." not in part
+
+
+def build_translation_index(tree: dict) -> dict:
+    """Flatten a nested translation tree into {dotted lower-case key: value} for _t."""
+    index = {}
+    stack = [("", tree)]
+    while stack:
+        prefix, node = stack.pop()
+        for part, child in node.items():
+            if not _indexable(part):
+                continue
+            path = f"{prefix}{part}"
+            index[path] = _index_node(child)
+            if isinstance(child, dict):
+                stack.append((path + ".", child))
+    return index
+
+
+def _reindex_key(tree: dict, key: str):
+    """Update _json_index along one key path after translation_store changed it."""
+    parts = key.split('.')
+    node = tree
+    path = ""
+    for part in parts:
+        if not isinstance(node, dict) or part not in node or not _indexable(part):
+            return
+        node = node[part]
+        path = f"{path}.{part}" if path else part
+        _json_index[path] = _index_node(node)
+        # A string node turned into a dict keeps its text as a new "_name" child
+        if isinstance(node, dict) and "_name" in node:
+            _json_index[f"{path}._name"] = _index_node(node["_name"])
+    if isinstance(node, dict):
+        for part, child in node.items():
+            if _indexable(part):
+                _json_index[f"{path}.{part}"] = _index_node(child)
+                if isinstance(child, dict):
+                    _json_index.update(
+                        (f"{path}.{part}.{sub_path}", value)
+                        for sub_path, value in build_translation_index(child).items()
+                    )
+
+
 def _t(key):
-    """Translate using JSON data (supports nested dictionaries) or fallback to gettext."""
-    global _json_trans, _gettext
+    """Translate using JSON data (supports nested dictionaries) or fallback to gettext.
 
+    Dotted keys are case-insensitive; a node's "_name" is its display name, and
+    a node without one translates to the last key segment.
+    """
     if not key:
         return key
+    if _gettext is None:
+        setup_i18n()
 
-    # Try nested lookup using dot notation (always lowercase for path components)
-    parts = key.split('.')
-    curr = _json_trans
-    for part in parts:
-        # Normalize part to lowercase for key lookup
-        p = part.lower()
-        if isinstance(curr, dict) and p in curr:
-            curr = curr[p]
-        else:
-            # Fallback to gettext if path not found in JSON
-            if _gettext:
-                return _gettext(key)
-            return key
-
-    # If we found a result
-    if isinstance(curr, str):
-        return curr
-    elif isinstance(curr, dict) and "_name" in curr:
-        # Special case: dictionary node has a display name
-        return curr["_name"]
-
-    # If it's still a dict but no _name, return the last part of the key
-    if parts:
-        return parts[-1]
-
-    if _gettext:
-        return _gettext(key)
-    return key
+    value = _json_index.get(key.lower(), _MISSING)
+    if value is _MISSING:
+        # Fallback to gettext if path not found in JSON
+        if _gettext:
+            return _gettext(key)
+        return key
+    if value is None:
+        return key.rsplit('.', 1)[-1]
+    return value
 
 def setup_i18n(lang_code=None):
     """Initialize or switch the current translation language."""
-    global _gettext, lang_trans, _current_lang, _json_trans
+    global _gettext, lang_trans, _current_lang, _json_trans, _json_index
 
     # If already set and no new code provided, just return current translator
     if lang_code is None and _gettext is not None:
@@ -126,67 +260,150 @@ def setup_i18n(lang_code=None):
     _current_lang = lang_code
 
     # Load JSON translations
-    _json_trans = {}
+    # Shared with translation_store, so saved translations show up immediately
     json_path = os.path.join(LOCALEDIR, f"{lang_code}.json")
+    _json_trans = translation_store.tree(lang_code)
+    _json_index = build_translation_index(_json_trans)
     if os.path.exists(json_path):
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                _json_trans = json.load(f)
-            print(f"[i18n] Loaded JSON translations from {json_path}")
-        except Exception as e:
-            print(f"[i18n] Failed to load JSON translations from {json_path}: {e}")
+        print(f"[i18n] Loaded JSON translations from {json_path}")
     else:
         print(f"[i18n] JSON translation file not found: {json_path}")
 
     return _t
 
-def save_json_translation(key: str, text: str, lang_code: Optional[str] = None):
-    """Saves a translation to the JSON file for the given language (supports nested structure)."""
-    global _current_lang, _json_trans
-    if lang_code is None:
-        lang_code = _current_lang or 'en'
+class TranslationStore:
+    """Nested JSON translations held in memory and written back in batches.
 
-    json_path = os.path.join(LOCALEDIR, f"{lang_code}.json")
-    trans_data = {}
+    set() only updates the in-memory tree. Changed languages are written once
+    when the outermost batch() exits, or flush_delay seconds after the last
+    set() outside a batch. Files are replaced atomically (temp file + rename)
+    and unchanged languages are never rewritten.
+    """
 
-    if os.path.exists(json_path):
-        try:
-            with open(json_path, 'r', encoding='utf-8') as f:
-                trans_data = json.load(f)
-        except Exception:
-            pass
+    def __init__(self, localedir: str = LOCALEDIR, flush_delay: float = TRANSLATION_FLUSH_DELAY):
+        self.localedir = localedir
+        self.flush_delay = flush_delay
+        self.files_written = 0
+        self._trees = {}
+        self._dirty = set()
+        self._batch_depth = 0
+        self._timer = None
+        self._lock = threading.RLock()
 
-    # Build nested structure
-    parts = key.split('.')
-    curr = trans_data
-    for i, part in enumerate(parts[:-1]):
-        if part not in curr or not isinstance(curr[part], dict):
-            # If current node is a string and we need to go deeper,
-            # preserve the string as _name and convert to dict
-            old_val = curr.get(part)
-            curr[part] = {}
-            if isinstance(old_val, str):
-                curr[part]["_name"] = old_val
-        curr = curr[part]
-
-    leaf = parts[-1]
-    if leaf not in curr or curr[leaf] != text:
-        # If the leaf would overwrite a dict, store it as _name instead?
-        # But usually keys like skey_name and skey_description are at the end.
-        if isinstance(curr.get(leaf), dict):
-            curr[leaf]["_name"] = text
-        else:
-            curr[leaf] = text
+    def _path(self, lang_code: str) -> str:
+        return os.path.join(self.localedir, f"{lang_code}.json")
+
+    def tree(self, lang_code: str) -> dict:
+        """Return the live translation tree of lang_code, loading it on first use."""
+        with self._lock:
+            trans_data = self._trees.get(lang_code)
+            if trans_data is None:
+                trans_data = {}
+                json_path = self._path(lang_code)
+                if os.path.exists(json_path):
+                    try:
+                        with open(json_path, 'r', encoding='utf-8') as f:
+                            trans_data = json.load(f)
+                    except Exception as e:
+                        print(f"[i18n] Failed to load JSON translations from {json_path}: {e}")
+                self._trees[lang_code] = trans_data
+            return trans_data
+
+    def set(self, key: str, text: str, lang_code: Optional[str] = None) -> bool:
+        """Store text under a dotted key (nested structure); returns True if anything changed."""
+        if lang_code is None:
+            lang_code = get_current_language() or 'en'
+
+        with self._lock:
+            curr = self.tree(lang_code)
+            changed = False
+            parts = key.split('.')
+            for part in parts[:-1]:
+                if part not in curr or not isinstance(curr[part], dict):
+                    # If current node is a string and we need to go deeper,
+                    # preserve the string as _name and convert to dict
+                    old_val = curr.get(part)
+                    curr[part] = {}
+                    if isinstance(old_val, str):
+                        curr[part]["_name"] = old_val
+                    changed = True
+                curr = curr[part]
+
+            leaf = parts[-1]
+            if isinstance(curr.get(leaf), dict):
+                if curr[leaf].get("_name") != text:
+                    curr[leaf]["_name"] = text
+                    changed = True
+            elif curr.get(leaf) != text:
+                curr[leaf] = text
+                changed = True
 
+            if changed:
+                if self._trees[lang_code] is _json_trans:
+                    _reindex_key(_json_trans, key)
+                self._dirty.add(lang_code)
+                if self._batch_depth == 0:
+                    self._schedule_flush()
+            return changed
+
+    @contextmanager
+    def batch(self):
+        """Group set() calls; changes are written once when the outermost batch exits."""
+        with self._lock:
+            self._batch_depth += 1
         try:
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(trans_data, f, ensure_ascii=False, indent=2)
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def _schedule_flush(self):
+        if self.flush_delay <= 0:
+            self.flush()
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> int:
+        """Write every changed language file now; returns the number of files written."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            written = 0
+            for lang_code in sorted(self._dirty):
+                json_path = self._path(lang_code)
+                tmp_path = None
+                try:
+                    with tempfile.NamedTemporaryFile(
+                        'w', encoding='utf-8', dir=self.localedir, prefix=f".{lang_code}.", suffix=".tmp", delete=False
+                    ) as f:
+                        tmp_path = f.name
+                        json.dump(self._trees[lang_code], f, ensure_ascii=False, indent=2)
+                    os.replace(tmp_path, json_path)
+                    self._dirty.discard(lang_code)
+                    written += 1
+                except Exception as e:
+                    print(f"[i18n] Failed to save JSON translation: {e}")
+                    if tmp_path and os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            self.files_written += written
+            return written
+
+
+translation_store = TranslationStore()
+atexit.register(translation_store.flush)
+
 
-            # Also update the in-memory global _json_trans if same language
-            if lang_code == _current_lang:
-                _json_trans = trans_data
-        except Exception as e:
-            print(f"[i18n] Failed to save JSON translation: {e}")
+def save_json_translation(key: str, text: str, lang_code: Optional[str] = None) -> bool:
+    """Saves a translation for the given language (supports nested structure).
 
-# Initial setup with system locale
-setup_i18n()
+    The JSON file is written by translation_store, batched and debounced.
+    Returns True if the translation changed.
+    """
+    return translation_store.set(key, text, lang_code)
@@ -5,19 +5,22 @@
 Geometry item base and concrete classes for Skey Library
 """
 import math
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from itertools import compress
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
 
+from .geometry_list import ARRIVE_POINT, LEAVE_POINT, LINE, SPINDLE_POINT, TEE_POINT, GeometryList
 from .point2d import Point2D
 
 
-@dataclass
+@dataclass(slots=True)
 class GeometryItem:
     item_type: str
     def to_string(self) -> str:
         raise NotImplementedError
 
-@dataclass
+@dataclass(slots=True)
 class PointGeometry(GeometryItem):
     x: float
     y: float
@@ -31,7 +34,7 @@ class PointGeometry(GeometryItem):
         y = float(parts[1].split("=")[1])
         return cls(item_type=item_type, x=x, y=y)
 
-@dataclass
+@dataclass(slots=True)
 class LineGeometry(GeometryItem):
     item_type: str = "Line"
     x1: float = 0.0
@@ -50,7 +53,7 @@ class LineGeometry(GeometryItem):
         y2 = float(parts[3].split("=")[1])
         return cls(item_type="Line", x1=x1, y1=y1, x2=x2, y2=y2)
 
-@dataclass
+@dataclass(slots=True)
 class RectangleGeometry(GeometryItem):
     item_type: str = "Rectangle"
     x: float = 0.0
@@ -68,7 +71,7 @@ class RectangleGeometry(GeometryItem):
         height = float(parts[3].split("=")[1])
         return cls(item_type="Rectangle", x=x, y=y, width=width, height=height)
 
-@dataclass
+@dataclass(slots=True)
 class PolygonGeometry(GeometryItem):
     item_type: str = "Polygon"
     points: List[Point2D] = field(default_factory=list)
@@ -79,6 +82,121 @@ class PolygonGeometry(GeometryItem):
         return f"Polygon: {' '.join(parts)}"
 
 
+# Numeric codes of the pen actions convert_graphics() understands in raw geometry;
+# any other action is stored as NaN and ignored, as its string form always was.
+PEN_ACTION_CODES = {"0": 0.0, "1": 1.0, "2": 2.0, "3": 3.0, "6": 6.0}
+_DRAWING_CODES = (1.0, 2.0, 3.0, 6.0)
+
+
+def raw_geometry_array(geometry: Union[array, Sequence]) -> array:
+    """Return flat [pen action, x, y, ...] raw geometry as array('d') of numeric triples.
+
+    String pen actions are mapped through PEN_ACTION_CODES. Coordinates of
+    actions that are not drawn are never read, so they may hold anything.
+    """
+    if isinstance(geometry, array):
+        return geometry
+    values = array('d', bytes(8 * (len(geometry) // 3 * 3)))
+    for x in range(0, len(values), 3):
+        action = geometry[x]
+        code = PEN_ACTION_CODES.get(action, math.nan) if isinstance(action, str) else math.nan
+        values[x] = code
+        if code in _DRAWING_CODES:
+            values[x + 1] = float(geometry[x + 1])
+            values[x + 2] = float(geometry[x + 2])
+    return values
+
+
+class _Rounded(dict):
+    """Memo of round(value, ndigits) / divisor; symbols reuse few coordinates."""
+
+    max_size = 65536
+
+    def __init__(self, ndigits: int, divisor: float):
+        super().__init__()
+        self.ndigits = ndigits
+        self.divisor = divisor
+
+    def __missing__(self, value: float) -> float:
+        if self.divisor == 1.0:
+            rounded = round(value, self.ndigits)
+        else:
+            rounded = round(value, self.ndigits) / self.divisor
+        # 0.0 and -0.0 are equal keys but print differently: never store zeros.
+        if value:
+            if len(self) >= self.max_size:
+                self.clear()
+            self[value] = rounded
+        return rounded
+
+
+_rounded: dict = {}
+
+
+def convert_raw_geometry(
+    skey: str,
+    geometry: Union[array, Sequence],
+    ndigits: int = 3,
+    divisor: float = 1.0,
+    min_extent: float = 1.0,
+) -> GeometryList:
+    """Convert raw [pen action, x, y, ...] geometry to a GeometryList.
+
+    Raw units are scaled by 0.05 (1/20) and centred on half the largest drawn
+    x and y, clamped to at least min_extent; each coordinate is rounded to
+    ndigits and divided by divisor. Bounds and coordinates are computed per
+    axis over the whole symbol, then a single pass over the pen actions emits
+    the primitives: action 1 moves the pen (Arrive/SpindlePoint on the first
+    record, LeavePoint on the last or the one before the 0 end marker), 2 draws
+    a Line, 3 a TeePoint and 6 a SpindlePoint.
+    """
+    geometry = raw_geometry_array(geometry)
+    codes = geometry[0::3]
+    xs = geometry[1::3]
+    ys = geometry[2::3]
+    drawn = [code in _DRAWING_CODES for code in codes]
+    if not any(drawn):
+        return GeometryList()
+
+    scale = 0.05
+    half_width = max(min_extent, max(compress(xs, drawn), default=min_extent)) * scale / 2
+    half_height = max(min_extent, max(compress(ys, drawn), default=min_extent)) * scale / 2
+    rounded = _rounded.get((ndigits, divisor))
+    if rounded is None:
+        rounded = _rounded[(ndigits, divisor)] = _Rounded(ndigits, divisor)
+    points_x = list(map(rounded.__getitem__, [x * scale - half_width for x in xs]))
+    points_y = list(map(rounded.__getitem__, [y * scale - half_height for y in ys]))
+
+    last = len(codes) - 1
+    before_end = codes.index(0.0) - 1 if 0.0 in codes else -1
+    is_spindle = "SP" in skey
+    start_x = start_y = 0.0
+    opcodes = bytearray()
+    coordinates = []
+    for index, code, x, y in zip(range(len(codes)), codes, points_x, points_y):
+        if code == 1.0:
+            start_x, start_y = x, y
+            if index == 0:
+                opcodes.append(SPINDLE_POINT if is_spindle else ARRIVE_POINT)
+                coordinates += (x, y)
+            elif (index == last or index == before_end) and not is_spindle:
+                opcodes.append(LEAVE_POINT)
+                coordinates += (x, y)
+        elif code == 2.0:
+            opcodes.append(LINE)
+            coordinates += (start_x, start_y, x, y)
+            start_x, start_y = x, y
+        elif code == 3.0:
+            opcodes.append(TEE_POINT)
+            coordinates += (x, y)
+            start_x, start_y = x, y
+        elif code == 6.0:
+            opcodes.append(SPINDLE_POINT)
+            coordinates += (x, y)
+            start_x, start_y = x, y
+    return GeometryList.from_columns(opcodes, array('d', coordinates))
+
+
 @dataclass
 class GeometrySettings:
     """Settings for geometry conversion"""
@@ -92,87 +210,23 @@ class GeometryConverter:
     def __init__(self, settings: Optional[GeometrySettings] = None):
         self.settings = settings or GeometrySettings()
 
-    def convert_graphics(self, skey: str, geometry: List) -> List[str]:
+    def convert_graphics(self, skey: str, geometry: Union[array, Sequence]) -> GeometryList:
         """
         Convert raw geometry data to standardized geometry strings.
 
         Args:
             skey: Skey name
-            geometry: Raw geometry data (list of coordinates)
+            geometry: Raw geometry data, a flat [pen action, x, y, ...] list or
+                the array('d') produced by raw_geometry_array()/the importers
 
         Returns:
-            List of geometry strings in standardized format
+            GeometryList of the converted primitives (a sequence of geometry strings)
         """
-        start_point_x = 0.0
-        start_point_y = 0.0
-        new_geometry = []
-        # Use a fixed scale of 0.05 (1/20) for 100px units
-        scale = 0.05
-        max_size = 1.0
-        max_width = 1.0
-        max_height = 1.0
-        min_width = 10000.0
-        min_height = 10000.0
-
-        # First pass: find bounds
-        for x in range(0, len(geometry), 3):
-            if geometry[x] in ("1", "2", "3", "6"):
-                point_x = float(geometry[x + 1])
-                point_y = float(geometry[x + 2])
-                min_width = min(point_x, min_width)
-                min_height = min(point_y, min_height)
-                max_width = max(point_x, max_width)
-                max_height = max(point_y, max_height)
-
-        symbol_width = max_width * scale
-        symbol_height = max_height * scale
-
-        # Find end of geometry
-        index_of_end_geometry = 0
-        for x in range(0, len(geometry), 3):
-            if geometry[x] == "0":
-                index_of_end_geometry = x
-                break
-
-        # Second pass: convert geometry
-        for x in range(0, len(geometry), 3):
-            pen_action = geometry[x]
-
-            if pen_action == "1":
-                start_point_x = round(float(geometry[x + 1]) * scale - symbol_width / 2, 3)
-                start_point_y = round(float(geometry[x + 2]) * scale - symbol_height / 2, 3)
-
-                if x == 0:
-                    point_type = "SpindlePoint" if "SP" in skey else "ArrivePoint"
-                    new_geometry.append(f"{point_type}: x0={start_point_x} y0={start_point_y}")
-                elif x == (len(geometry) - 3) or x == (index_of_end_geometry - 3):
-                    if "SP" not in skey:
-                        new_geometry.append(f"LeavePoint: x0={start_point_x} y0={start_point_y}")
-
-            elif pen_action == "2":
-                end_point_x = round(float(geometry[x + 1]) * scale - symbol_width / 2, 3)
-                end_point_y = round(float(geometry[x + 2]) * scale - symbol_height / 2, 3)
-                new_geometry.append(
-                    f"Line: x1={start_point_x} y1={start_point_y} x2={end_point_x} y2={end_point_y}"
-                )
-                start_point_x = end_point_x
-                start_point_y = end_point_y
-
-            elif pen_action == "3":
-                end_point_x = round(float(geometry[x + 1]) * scale - symbol_width / 2, 3)
-                end_point_y = round(float(geometry[x + 2]) * scale - symbol_height / 2, 3)
-                new_geometry.append(f"TeePoint: x0={end_point_x} y0={end_point_y}")
-                start_point_x = end_point_x
-                start_point_y = end_point_y
-
-            elif pen_action == "6":
-                end_point_x = round(float(geometry[x + 1]) * scale - symbol_width / 2, 3)
-                end_point_y = round(float(geometry[x + 2]) * scale - symbol_height / 2, 3)
-                new_geometry.append(f"SpindlePoint: x0={end_point_x} y0={end_point_y}")
-                start_point_x = end_point_x
-                start_point_y = end_point_y
-
-        return new_geometry
+        return convert_raw_geometry(skey, geometry)
+
+    def convert_graphics_batch(self, symbols: Iterable[Tuple[str, Union[array, Sequence]]]) -> List[GeometryList]:
+        """Convert the raw geometry of many (skey, geometry) pairs, in order."""
+        return [convert_raw_geometry(skey, geometry) for skey, geometry in symbols]
 
     @staticmethod
     def parse_geometry_value(item: str, index: int) -> float:
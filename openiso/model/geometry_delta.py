@@ -0,0 +1,31 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+
+"""
+Primitive-level deltas between two geometry revisions.
+
+A delta is a list of [start, end, items] edits against the base revision:
+base[start:end] is replaced by items, which covers added, removed and
+modified primitives. Edits are ordered by position and do not overlap.
+"""
+from difflib import SequenceMatcher
+from typing import List, Sequence
+
+
+def diff_geometry(base: Sequence[str], target: Sequence[str]) -> List[list]:
+    """Return the edits that turn base into target (lists or GeometryLists)."""
+    base, target = list(base), list(target)
+    matcher = SequenceMatcher(None, base, target, autojunk=False)
+    return [
+        [i1, i2, target[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+        if tag != "equal"
+    ]
+
+
+def apply_geometry_delta(base: List[str], delta: List[list]) -> List[str]:
+    """Rebuild the target revision from base and the edits returned by diff_geometry."""
+    geometry = list(base)
+    for start, end, items in reversed(delta):
+        geometry[start:end] = items
+    return geometry
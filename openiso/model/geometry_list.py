@@ -0,0 +1,260 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+
+"""
+Typed, array-backed geometry of one symbol.
+
+GeometryList stores primitives column-wise: one opcode byte per primitive,
+its coordinates as a slice of one array('d') (located through an offsets
+array), and its connection type and spindle name attributes, kept sparsely
+by primitive index since few primitives have them. It is a
+sequence of the geometry strings used everywhere else ("Line: x1=0.0 ..."),
+formatted on demand, and is built once per symbol - by the raw geometry
+converter or by parsing strings - so the exporter, the scene loader and the
+packed storage read numbers instead of re-parsing text.
+
+A string that cannot be rebuilt exactly from its parsed values (another
+number spelling, unknown keys) is kept verbatim, and one that does not parse
+as a known shape is kept as a RAW primitive without coordinates, so
+from_strings/to_strings always round-trip losslessly.
+"""
+from array import array
+from collections.abc import Sequence
+from itertools import accumulate
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+RAW = 0
+LINE = 1
+ARRIVE_POINT = 2
+LEAVE_POINT = 3
+TEE_POINT = 4
+SPINDLE_POINT = 5
+RECTANGLE = 6
+POLYGON = 7
+CIRCLE = 8
+
+# opcode -> (item type, coordinate names); numbered as in packed_geometry, append only.
+# Polygon coordinates are a variable number of p{i}x/p{i}y pairs.
+SHAPES: Dict[int, Tuple[str, Tuple[str, ...]]] = {
+    LINE: ("Line", ("x1", "y1", "x2", "y2")),
+    ARRIVE_POINT: ("ArrivePoint", ("x0", "y0")),
+    LEAVE_POINT: ("LeavePoint", ("x0", "y0")),
+    TEE_POINT: ("TeePoint", ("x0", "y0")),
+    SPINDLE_POINT: ("SpindlePoint", ("x0", "y0")),
+    RECTANGLE: ("Rectangle", ("x0", "y0", "width", "height")),
+    POLYGON: ("Polygon", ()),
+    CIRCLE: ("Circle", ("x0", "y0", "r")),
+}
+OPCODES = {item_type: opcode for opcode, (item_type, _) in SHAPES.items()}
+ITEM_TYPES = {opcode: item_type for opcode, (item_type, _) in SHAPES.items()}
+POINT_OPCODES = frozenset((ARRIVE_POINT, LEAVE_POINT, TEE_POINT, SPINDLE_POINT))
+
+_TEMPLATES = {
+    opcode: f"{item_type}: " + " ".join(f"{name}=%s" for name in names)
+    for opcode, (item_type, names) in SHAPES.items()
+    if opcode != POLYGON
+}
+# opcode byte -> coordinate count byte, for bytes.translate(); Polygon and RAW have no fixed count.
+_COORDINATE_COUNTS = bytes(
+    len(SHAPES[opcode][1]) if opcode in SHAPES and opcode != POLYGON else 0 for opcode in range(256)
+)
+
+
+class _FloatText(dict):
+    """Memo of str(value); symbols reuse few coordinates."""
+
+    max_size = 65536
+
+    def __missing__(self, value: float) -> str:
+        text = str(value)
+        # 0.0 and -0.0 are equal keys but print differently: never store zeros.
+        if value:
+            if len(self) >= self.max_size:
+                self.clear()
+            self[value] = text
+        return text
+
+
+_float_text = _FloatText()
+
+
+class GeometryList(Sequence):
+    """Geometry primitives of one symbol as parallel arrays; a sequence of geometry strings."""
+
+    __slots__ = ("opcodes", "offsets", "coordinates", "connection_types", "spindle_names", "_texts")
+
+    def __init__(self, items: Iterable[str] = ()):
+        self.opcodes = bytearray()
+        # Coordinates of primitive i are coordinates[offsets[i]:offsets[i + 1]].
+        self.offsets = array('I', [0])
+        self.coordinates = array('d')
+        self.connection_types: Dict[int, str] = {}
+        self.spindle_names: Dict[int, str] = {}
+        # index -> original string, for primitives whose text is not the canonical form.
+        self._texts: Dict[int, str] = {}
+        self.extend(items)
+
+    @classmethod
+    def from_strings(cls, items: Iterable[str]) -> 'GeometryList':
+        """Return items as a GeometryList; an existing GeometryList is returned as is."""
+        if isinstance(items, cls):
+            return items
+        return cls(items)
+
+    @classmethod
+    def from_columns(cls, opcodes: bytearray, coordinates: array,
+                     offsets: Optional[array] = None) -> 'GeometryList':
+        """Wrap ready columns (no attributes); offsets may be omitted when no primitive is a Polygon."""
+        geometry = cls.__new__(cls)
+        geometry.opcodes = opcodes
+        geometry.coordinates = coordinates
+        if offsets is None:
+            offsets = array('I', accumulate(opcodes.translate(_COORDINATE_COUNTS), initial=0))
+        geometry.offsets = offsets
+        geometry.connection_types = {}
+        geometry.spindle_names = {}
+        geometry._texts = {}
+        return geometry
+
+    def to_strings(self) -> List[str]:
+        return list(self)
+
+    def copy(self) -> 'GeometryList':
+        geometry = GeometryList.from_columns(bytearray(self.opcodes), array('d', self.coordinates),
+                                             array('I', self.offsets))
+        geometry.connection_types = dict(self.connection_types)
+        geometry.spindle_names = dict(self.spindle_names)
+        geometry._texts = dict(self._texts)
+        return geometry
+
+    def append_primitive(self, opcode: int, coordinates: Iterable[float],
+                         connection_type: str = "", spindle_name: str = "") -> None:
+        """Append one primitive from its opcode, coordinates and attributes."""
+        index = len(self.opcodes)
+        self.opcodes.append(opcode)
+        self.coordinates.extend(coordinates)
+        self.offsets.append(len(self.coordinates))
+        if connection_type:
+            self.connection_types[index] = connection_type
+        if spindle_name:
+            self.spindle_names[index] = spindle_name
+
+    def append(self, item: str) -> None:
+        """Parse one geometry string and append it."""
+        index = len(self.opcodes)
+        item_type, _, params = item.partition(":")
+        values = {}
+        for param in params.split():
+            key, eq, value = param.partition("=")
+            if eq:
+                values[key] = value
+
+        opcode = OPCODES.get(item_type.strip(), RAW)
+        try:
+            if opcode == POLYGON:
+                coordinates = []
+                i = 1
+                while f"p{i}x" in values and f"p{i}y" in values:
+                    coordinates += (float(values[f"p{i}x"]), float(values[f"p{i}y"]))
+                    i += 1
+            elif opcode != RAW:
+                coordinates = [float(values[name]) for name in SHAPES[opcode][1]]
+        except (KeyError, ValueError):
+            opcode = RAW
+        if opcode == RAW:
+            self.append_primitive(RAW, ())
+            self._texts[index] = item
+            return
+
+        self.append_primitive(opcode, coordinates, values.get("type", ""), values.get("name", ""))
+        if self._format(index) != item:
+            self._texts[index] = item
+
+    def extend(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.append(item)
+
+    def item_type(self, index: int) -> str:
+        """Item type name of primitive index, e.g. "Line"; RAW primitives report their own prefix."""
+        opcode = self.opcodes[index]
+        if opcode == RAW:
+            return self._texts[index].split(":")[0]
+        return ITEM_TYPES[opcode]
+
+    def is_plain(self, index: int) -> bool:
+        """True if primitive index is a shape whose string is rebuilt from its coordinates alone."""
+        return (self.opcodes[index] != RAW and index not in self._texts
+                and index not in self.connection_types and index not in self.spindle_names)
+
+    def primitive_coordinates(self, index: int) -> Tuple[float, ...]:
+        return tuple(self.coordinates[self.offsets[index]:self.offsets[index + 1]])
+
+    def primitives(self) -> Iterator[Tuple[int, Tuple[float, ...], str, str]]:
+        """Yield (opcode, coordinates, connection type, spindle name) per primitive, in order."""
+        coordinates = self.coordinates
+        offsets = self.offsets
+        connection_types = self.connection_types
+        spindle_names = self.spindle_names
+        for index, opcode in enumerate(self.opcodes):
+            yield (opcode, tuple(coordinates[offsets[index]:offsets[index + 1]]),
+                   connection_types.get(index, ""), spindle_names.get(index, ""))
+
+    def _format(self, index: int) -> str:
+        text = self._texts.get(index)
+        if text is not None:
+            return text
+        opcode = self.opcodes[index]
+        values = list(map(_float_text.__getitem__, self.coordinates[self.offsets[index]:self.offsets[index + 1]]))
+        if opcode == POLYGON:
+            text = "Polygon: " + " ".join(
+                f"p{i}x={values[2 * i - 2]} p{i}y={values[2 * i - 1]}" for i in range(1, len(values) // 2 + 1)
+            )
+        else:
+            text = _TEMPLATES[opcode] % tuple(values)
+        if index in self.spindle_names:
+            text += f" name={self.spindle_names[index]}"
+        if index in self.connection_types:
+            text += f" type={self.connection_types[index]}"
+        return text
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            selected = GeometryList()
+            for i in range(*index.indices(len(self))):
+                selected.append_primitive(self.opcodes[i], self.primitive_coordinates(i),
+                                          self.connection_types.get(i, ""), self.spindle_names.get(i, ""))
+                if i in self._texts:
+                    selected._texts[len(selected) - 1] = self._texts[i]
+            return selected
+        if index < 0:
+            index += len(self.opcodes)
+        if not 0 <= index < len(self.opcodes):
+            raise IndexError("GeometryList index out of range")
+        return self._format(index)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._texts or self.connection_types or self.spindle_names or POLYGON in self.opcodes:
+            yield from map(self._format, range(len(self.opcodes)))
+            return
+        # Fixed-size shapes only: format straight from the columns.
+        t = list(map(_float_text.__getitem__, self.coordinates))
+        for opcode, p in zip(self.opcodes, self.offsets):
+            if opcode == LINE:
+                yield f"Line: x1={t[p]} y1={t[p + 1]} x2={t[p + 2]} y2={t[p + 3]}"
+            elif opcode in POINT_OPCODES:
+                yield f"{ITEM_TYPES[opcode]}: x0={t[p]} y0={t[p + 1]}"
+            else:
+                yield _TEMPLATES[opcode] % tuple(t[p:p + _COORDINATE_COUNTS[opcode]])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (GeometryList, list)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"GeometryList({list(self)!r})"
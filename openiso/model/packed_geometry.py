@@ -0,0 +1,151 @@
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+
+"""
+Packed binary form of a geometry revision.
+
+A revision is stored as one BLOB: a 3-byte header followed by one record per
+primitive. Each record starts with an opcode byte naming the primitive shape
+(type and coordinate names); its coordinates follow either as int16
+thousandths (high opcode bit set) or as float64. Any primitive whose string
+form cannot be rebuilt exactly from the packed values is kept verbatim as a
+UTF-8 record, so pack_geometry/unpack_geometry always round-trip losslessly.
+A GeometryList is packed from its coordinate arrays without re-parsing.
+"""
+import math
+import struct
+from typing import Dict, Iterable, List, Tuple
+
+from .geometry_list import GeometryList
+
+PACKED_MAGIC = b"OG"
+PACKED_FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<2sB")
+_OPCODE = struct.Struct("<B")
+_RAW_LENGTH = struct.Struct("<H")
+
+_RAW_OPCODE = 0
+_FIXED_FLAG = 0x80
+_FIXED_SCALE = 1000
+_INT16_MIN, _INT16_MAX = -32768, 32767
+
+# opcode -> (item type, coordinate names); opcodes are part of the format, append only.
+_SHAPES: Dict[int, Tuple[str, Tuple[str, ...]]] = {
+    1: ("Line", ("x1", "y1", "x2", "y2")),
+    2: ("ArrivePoint", ("x0", "y0")),
+    3: ("LeavePoint", ("x0", "y0")),
+    4: ("TeePoint", ("x0", "y0")),
+    5: ("SpindlePoint", ("x0", "y0")),
+    6: ("Rectangle", ("x0", "y0", "width", "height")),
+}
+_OPCODE_BY_SHAPE = {shape: opcode for opcode, shape in _SHAPES.items()}
+_TEMPLATES = {
+    opcode: f"{item_type}: " + " ".join(f"{name}=%s" for name in names)
+    for opcode, (item_type, names) in _SHAPES.items()
+}
+_FLOAT_STRUCTS = {opcode: struct.Struct(f"<{len(names)}d") for opcode, (_, names) in _SHAPES.items()}
+_FIXED_STRUCTS = {opcode: struct.Struct(f"<{len(names)}h") for opcode, (_, names) in _SHAPES.items()}
+
+# int16 thousandths -> text; bounded by the int16 range, filled lazily.
+_FIXED_TEXT: Dict[int, str] = {}
+
+
+def _fixed_text(value: int) -> str:
+    text = _FIXED_TEXT.get(value)
+    if text is None:
+        text = _FIXED_TEXT[value] = repr(value / _FIXED_SCALE)
+    return text
+
+
+def _pack_item(item: str) -> bytes:
+    item_type, sep, rest = item.partition(": ")
+    if sep:
+        names, values = [], []
+        for token in rest.split(" "):
+            name, eq, value = token.partition("=")
+            if not eq:
+                break
+            names.append(name)
+            values.append(value)
+        else:
+            opcode = _OPCODE_BY_SHAPE.get((item_type, tuple(names)))
+            if opcode is not None:
+                try:
+                    floats = [float(value) for value in values]
+                except ValueError:
+                    floats = None
+                if floats is not None:
+                    template = _TEMPLATES[opcode]
+                    fixed = [round(value * _FIXED_SCALE) for value in floats]
+                    if (all(_INT16_MIN <= value <= _INT16_MAX for value in fixed)
+                            and template % tuple(map(_fixed_text, fixed)) == item):
+                        return _OPCODE.pack(opcode | _FIXED_FLAG) + _FIXED_STRUCTS[opcode].pack(*fixed)
+                    if template % tuple(map(repr, floats)) == item:
+                        return _OPCODE.pack(opcode) + _FLOAT_STRUCTS[opcode].pack(*floats)
+
+    encoded = item.encode("utf-8")
+    return _OPCODE.pack(_RAW_OPCODE) + _RAW_LENGTH.pack(len(encoded)) + encoded
+
+
+def _pack_geometry_list(geometry: GeometryList) -> List[bytes]:
+    """Same records as _pack_item() over the strings of geometry, read from its arrays."""
+    records = []
+    coordinates = geometry.coordinates
+    offsets = geometry.offsets
+    for index, opcode in enumerate(geometry.opcodes):
+        if opcode in _SHAPES and geometry.is_plain(index):
+            values = coordinates[offsets[index]:offsets[index + 1]]
+            try:
+                fixed = [round(value * _FIXED_SCALE) for value in values]
+            except (ValueError, OverflowError):
+                fixed = None
+            # Fixed when every value prints exactly as its thousandths (so never -0.0).
+            if (fixed is not None
+                    and all(_INT16_MIN <= value <= _INT16_MAX for value in fixed)
+                    and all(f / _FIXED_SCALE == v and (v or math.copysign(1.0, v) > 0) for f, v in zip(fixed, values))):
+                records.append(_OPCODE.pack(opcode | _FIXED_FLAG) + _FIXED_STRUCTS[opcode].pack(*fixed))
+            else:
+                records.append(_OPCODE.pack(opcode) + _FLOAT_STRUCTS[opcode].pack(*values))
+        else:
+            records.append(_pack_item(geometry[index]))
+    return records
+
+
+def pack_geometry(geometry: Iterable[str]) -> bytes:
+    """Pack geometry strings, or a GeometryList, into a single BLOB."""
+    if isinstance(geometry, GeometryList):
+        records = _pack_geometry_list(geometry)
+    else:
+        records = [_pack_item(item) for item in geometry]
+    return _HEADER.pack(PACKED_MAGIC, PACKED_FORMAT_VERSION) + b"".join(records)
+
+
+def unpack_geometry(blob: bytes) -> List[str]:
+    """Rebuild the exact geometry strings stored by pack_geometry."""
+    magic, version = _HEADER.unpack_from(blob, 0)
+    if magic != PACKED_MAGIC or version != PACKED_FORMAT_VERSION:
+        raise ValueError(f"Unsupported packed geometry format: {magic!r} v{version}")
+
+    geometry = []
+    append = geometry.append
+    offset = _HEADER.size
+    size = len(blob)
+    while offset < size:
+        opcode = blob[offset]
+        offset += 1
+        if opcode & _FIXED_FLAG:
+            opcode &= ~_FIXED_FLAG
+            fmt = _FIXED_STRUCTS[opcode]
+            append(_TEMPLATES[opcode] % tuple(map(_fixed_text, fmt.unpack_from(blob, offset))))
+            offset += fmt.size
+        elif opcode == _RAW_OPCODE:
+            (length,) = _RAW_LENGTH.unpack_from(blob, offset)
+            offset += _RAW_LENGTH.size
+            append(blob[offset:offset + length].decode("utf-8"))
+            offset += length
+        else:
+            fmt = _FLOAT_STRUCTS[opcode]
+            append(_TEMPLATES[opcode] % tuple(map(repr, fmt.unpack_from(blob, offset))))
+            offset += fmt.size
+    return geometry
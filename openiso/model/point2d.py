@@ -7,7 +7,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Point2D:
     x: float = 0.0
     y: float = 0.0
@@ -5,9 +5,10 @@
 SkeyData and SkeyGroup models for Skey Library
 """
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 from .enums import Dimensioned, FlowArrow, Insulation, Orientation, Tracing
+from .geometry_list import GeometryList
 
 
 @dataclass
@@ -41,7 +42,8 @@ class SkeyData:
     upstream_payload_hash: str = ""
     local_revision: int = 1
     sync_state: str = "synced"
-    geometry: List[str] = field(default_factory=list)
+    # A GeometryList, or plain geometry strings until geometry_list() parses them.
+    geometry: Sequence[str] = field(default_factory=list)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -73,8 +75,15 @@ class SkeyData:
             "upstream_payload_hash": self.upstream_payload_hash,
             "local_revision": self.local_revision,
             "sync_state": self.sync_state,
-            "geometry": self.geometry
+            "geometry": list(self.geometry)
         }
+
+    def geometry_list(self) -> GeometryList:
+        """Return geometry as a GeometryList, parsing geometry strings only on the first call."""
+        if not isinstance(self.geometry, GeometryList):
+            self.geometry = GeometryList.from_strings(self.geometry)
+        return self.geometry
+
     @classmethod
     def from_dict(cls, name: str, data: Dict[str, Any]) -> 'SkeyData':
         if isinstance(data, dict):
@@ -129,6 +138,10 @@ class SkeyGroup:
             self.groups[group_key][subgroup_key] = []
         if skey_name not in self.groups[group_key][subgroup_key]:
             self.groups[group_key][subgroup_key].append(skey_name)
+    def remove_skey(self, group_key: str, subgroup_key: str, skey_name: str):
+        skeys = self.groups.get(group_key, {}).get(subgroup_key)
+        if skeys and skey_name in skeys:
+            skeys.remove(skey_name)
     def get_groups(self) -> List[str]:
         return sorted(self.groups.keys())
     def get_subgroups(self, group_key: str) -> List[str]:
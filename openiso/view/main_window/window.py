@@ -102,7 +102,7 @@ class SkeyEditor(
 
         if skey_data.geometry:
             print(f"Loading {len(skey_data.geometry)} geometry items")
-            self._load_geometry_to_scene(skey_data.geometry)
+            self._load_geometry_to_scene(skey_data.geometry_list())
         else:
             print("No geometry data found")
 
@@ -159,10 +159,12 @@ class SkeyEditor(
         # Keep backward-compatible access for existing mixins during incremental migration.
         self.skey_service = self.controller.skey_service
         self.help_window = None
+        self._setup_write_queue()
 
         self._setup_ui()
         print("Calling load_skeys to populate tree...")
         if self.controller.load_initial_data(__version__):
+            print(self.controller.format_startup_report())
             print("Successfully loaded skeys, populating tree...")
             self.refresh_skey_tree()
             self._handle_catalog_sync_feedback(self.controller.get_last_sync_result())
@@ -177,6 +179,7 @@ class SkeyEditor(
 
         # --- Widgets ---
         self.tree_skeys = SkeyTreeView(self.icons_library_path)
+        self.tree_skeys.search_provider = self.controller.search_skeys
         self.group_skeys = QGroupBox(_t("Skeys"))
         self.group_skeys.setFixedWidth(320)
         self.vbox_lay_skeys = QVBoxLayout()
@@ -384,6 +387,11 @@ class SkeyEditor(
             except (OSError, UnicodeError) as e:
                 print(f"Error loading CSS: {e}")
 
+    def closeEvent(self, event):
+        """Commits queued writes before the window closes."""
+        self.controller.close()
+        super().closeEvent(event)
+
     def refresh_skey_tree(self):
         """Rebuilds the Skey tree view from the latest service data."""
         _t = setup_i18n()
@@ -5,22 +5,112 @@
 
 from __future__ import annotations
 
+import time
+from typing import Callable
+
 from openiso.controller.services import SkeyService
+from openiso.controller.write_queue import SkeyWriteQueue, WriteJob
 from openiso.model.skey import SkeyData
 
 
 class WindowController:
-    """Thin orchestration layer between SkeyEditor UI and SkeyService."""
+    """Thin orchestration layer between SkeyEditor UI and SkeyService.
+
+    Writes may run on the writer thread (submit_*), where they only touch the
+    database. The service's skeys, groups and geometry cache belong to the GUI
+    thread, which applies finished writes with apply_finished_write().
+    """
 
     def __init__(self, data_path: str, use_db: bool = True):
         self.skey_service = SkeyService(data_path, use_db=use_db)
         self._last_sync_result: dict | None = None
+        self._startup_report: dict = {}
+        # Called on the writer thread when a submitted job finishes.
+        self.on_write_finished: Callable[[WriteJob], None] | None = None
+        self._write_queue = SkeyWriteQueue(on_finished=self._notify_write_finished)
+
+    def _notify_write_finished(self, job: WriteJob) -> None:
+        if self.on_write_finished is not None:
+            self.on_write_finished(job)
+
+    def apply_finished_write(self, job: WriteJob) -> None:
+        """Bring skeys and groups up to date with a write committed on the writer thread.
+
+        Call on the GUI thread, e.g. from the on_write_finished signal.
+        """
+        self.skey_service.reload_groups()
+
+    def _write_skey(self, **kwargs) -> bool:
+        self.skey_service.update_skey(**kwargs, refresh=False)
+        return self.skey_service.save_skeys()
+
+    def submit_save_skey(self, **kwargs) -> WriteJob:
+        """Queue a save on the writer thread; see save_skey."""
+        return self._write_queue.submit("save", kwargs.get("name", ""), self._write_skey, **kwargs)
+
+    def submit_delete_skey(self, skey_name: str) -> WriteJob:
+        """Queue a delete on the writer thread; see delete_skey."""
+        return self._write_queue.submit(
+            "delete", skey_name, self.skey_service.delete_skey, skey_name, refresh=False
+        )
+
+    def submit_import_from_ascii(self, file_path: str) -> WriteJob:
+        """Queue an ASCII import on the writer thread; the job result is the ImportResult."""
+        return self._write_queue.submit(
+            "import", file_path, self.skey_service.import_from_ascii, file_path, refresh=False
+        )
+
+    def submit_import_from_idf(self, file_path: str) -> WriteJob:
+        """Queue an IDF import on the writer thread; the job result is the ImportResult."""
+        return self._write_queue.submit(
+            "import", file_path, self.skey_service.import_from_idf, file_path, refresh=False
+        )
+
+    @property
+    def pending_writes(self) -> int:
+        return self._write_queue.pending
+
+    def flush_writes(self) -> None:
+        """Block until every queued write has been committed."""
+        self._write_queue.flush()
+
+    def close(self) -> None:
+        """Commit queued writes, stop the writer thread and close DB connections."""
+        self._write_queue.close()
+        self.skey_service.close()
 
     def load_initial_data(self, release_version: str | None = None) -> bool:
+        start = time.perf_counter()
         self.skey_service.load_descriptions()
+        descriptions_done = time.perf_counter()
         if release_version:
             self._last_sync_result = self.skey_service.sync_official_catalog(release_version)
-        return self.skey_service.load_skeys()
+        sync_done = time.perf_counter()
+        loaded = self.skey_service.load_skeys()
+        end = time.perf_counter()
+        self._startup_report = {
+            "source": self.skey_service.load_report.get("source"),
+            "skeys": self.skey_service.load_report.get("skeys", 0),
+            "descriptions": descriptions_done - start,
+            "sync": sync_done - descriptions_done,
+            "load": end - sync_done,
+            "total": end - start,
+        }
+        return loaded
+
+    def get_startup_report(self) -> dict:
+        """Timings (seconds) of load_initial_data and whether the library came from the snapshot."""
+        return dict(self._startup_report)
+
+    def format_startup_report(self) -> str:
+        report = self._startup_report
+        if not report:
+            return "Startup: library not loaded"
+        return (
+            f"Startup ({report['source']} start, {report['skeys']} skeys): "
+            f"descriptions {report['descriptions'] * 1000:.1f} ms, sync {report['sync'] * 1000:.1f} ms, "
+            f"load {report['load'] * 1000:.1f} ms, total {report['total'] * 1000:.1f} ms"
+        )
 
     def get_last_sync_result(self) -> dict | None:
         return self._last_sync_result
@@ -55,6 +145,9 @@ class WindowController:
     def get_all_spindles(self):
         return self.skey_service.get_all_spindles()
 
+    def search_skeys(self, query: str) -> list[str]:
+        return self.skey_service.search(query, limit=None)
+
     def delete_skey(self, skey_name: str) -> bool:
         return self.skey_service.delete_skey(skey_name)
 
@@ -7,6 +7,8 @@
 
 from __future__ import annotations
 
+import math
+
 from PyQt6.QtCore import QPointF
 from PyQt6.QtGui import QBrush, QColor, QPen, QPolygonF
 from PyQt6.QtWidgets import (
@@ -17,6 +19,18 @@ from PyQt6.QtWidgets import (
     QGraphicsRectItem,
 )
 
+from openiso.model.geometry import convert_raw_geometry
+from openiso.model.geometry_list import (
+    ARRIVE_POINT,
+    CIRCLE,
+    LEAVE_POINT,
+    LINE,
+    POLYGON,
+    RECTANGLE,
+    SPINDLE_POINT,
+    TEE_POINT,
+    GeometryList,
+)
 from openiso.view.graphics.geometry_items import (
     ArrivePoint,
     LeavePoint,
@@ -71,59 +85,47 @@ class GeometryIOMixin:
 
     def _load_spindle_geometry_to_scene(self, geometry, base_x, base_y):
         """Loads and positions spindle geometry onto the scene based on a reference point."""
-        for item_str in geometry:
+        geometry = GeometryList.from_strings(geometry)
+        step_x = self.scene.step_x
+        step_y = self.scene.step_y
+        for index, (opcode, coords, _, _) in enumerate(geometry.primitives()):
             try:
-                item_type = item_str.split(":")[0].strip()
-                if item_type not in ("Line", "Rectangle", "Polygon", "Circle"):
-                    continue
-
-                parts = item_str.split(":")
-                if len(parts) < 2:
-                    continue
-                values = self._parse_key_value_params(parts[1].strip())
-
-                if item_type == "Line":
-                    x1 = values.get("x1", 0) * self.scene.step_x * 20 + base_x
-                    y1 = base_y - values.get("y1", 0) * self.scene.step_y * 20
-                    x2 = values.get("x2", 0) * self.scene.step_x * 20 + base_x
-                    y2 = base_y - values.get("y2", 0) * self.scene.step_y * 20
-                    line = QGraphicsLineItem(x1, y1, x2, y2)
+                if opcode == LINE:
+                    x1, y1, x2, y2 = coords
+                    line = QGraphicsLineItem(x1 * step_x * 20 + base_x, base_y - y1 * step_y * 20,
+                                             x2 * step_x * 20 + base_x, base_y - y2 * step_y * 20)
                     line.setPen(QPen(QColor(0, 0, 0), 2))
                     self._add_graphics_element(line)
 
-                elif item_type == "Rectangle":
-                    x0 = values.get("x0", 0) * self.scene.step_x * 20 + base_x
-                    y0 = base_y - values.get("y0", 0) * self.scene.step_y * 20
-                    w = values.get("width", 0) * self.scene.step_x * 20
-                    h = values.get("height", 0) * self.scene.step_y * 20
+                elif opcode == RECTANGLE:
+                    x0 = coords[0] * step_x * 20 + base_x
+                    y0 = base_y - coords[1] * step_y * 20
+                    w = coords[2] * step_x * 20
+                    h = coords[3] * step_y * 20
                     rect = QGraphicsRectItem(x0 - w / 2, y0 - h / 2, w, h)
                     rect.setPen(QPen(QColor(0, 0, 0), 2))
                     self._add_graphics_element(rect)
 
-                elif item_type == "Polygon":
+                elif opcode == POLYGON:
                     polygon = QPolygonF()
-                    i = 1
-                    while f"p{i}x" in values and f"p{i}y" in values:
-                        px = values[f"p{i}x"] * self.scene.step_x * 20 + base_x
-                        py = base_y - values[f"p{i}y"] * self.scene.step_y * 20
-                        polygon.append(QPointF(px, py))
-                        i += 1
+                    for px, py in zip(coords[0::2], coords[1::2]):
+                        polygon.append(QPointF(px * step_x * 20 + base_x, base_y - py * step_y * 20))
                     if not polygon.isEmpty():
                         poly_item = QGraphicsPolygonItem(polygon)
                         poly_item.setPen(QPen(QColor(0, 0, 0), 2))
                         poly_item.setBrush(QBrush(QColor(150, 150, 150, 100)))
                         self._add_graphics_element(poly_item)
 
-                elif item_type == "Circle":
-                    x0 = values.get("x0", 0) * self.scene.step_x * 20 + base_x
-                    y0 = base_y - values.get("y0", 0) * self.scene.step_y * 20
-                    r = values.get("r", 0) * self.scene.step_x * 20
+                elif opcode == CIRCLE:
+                    x0 = coords[0] * step_x * 20 + base_x
+                    y0 = base_y - coords[1] * step_y * 20
+                    r = coords[2] * step_x * 20
                     circle = QGraphicsEllipseItem(x0 - r, y0 - r, 2 * r, 2 * r)
                     circle.setPen(QPen(QColor(0, 0, 0), 2))
                     self._add_graphics_element(circle)
 
             except Exception as e:
-                print(f"Error drawing spindle item {item_str}: {e}")
+                print(f"Error drawing spindle item {geometry[index]}: {e}")
 
     # -----------------------------------------------------------------
     # Scene geometry loading
@@ -136,96 +138,65 @@ class GeometryIOMixin:
         self.scene.symbol_drawlist.append(element)
 
     def _load_geometry_to_scene(self, geometry):
-        """Parses geometry data strings and renders the corresponding items on the canvas."""
+        """Renders the primitives of a GeometryList (or geometry strings) on the canvas."""
         point_types = {
-            "ArrivePoint": ArrivePoint,
-            "LeavePoint": LeavePoint,
-            "TeePoint": TeePoint,
-            "SpindlePoint": SpindlePoint,
+            ARRIVE_POINT: ArrivePoint,
+            LEAVE_POINT: LeavePoint,
+            TEE_POINT: TeePoint,
+            SPINDLE_POINT: SpindlePoint,
         }
+        geometry = GeometryList.from_strings(geometry)
+        step_x = self.scene.step_x
+        step_y = self.scene.step_y
+        center_x = self.scene.sheet_width / 2
+        center_y = self.scene.sheet_height / 2
 
-        for item_str in geometry:
+        for index, (opcode, coords, connection_type, spindle_name) in enumerate(geometry.primitives()):
             try:
-                item_type = item_str.split(":")[0].strip()
-
-                if item_type in point_types:
-                    parts = item_str.split(":")
-                    if len(parts) < 2:
-                        continue
-                    params = parts[1].strip()
-                    values: dict = {}
-                    for param in params.split():
-                        if "=" in param:
-                            key, val = param.split("=")
-                            if key in ("x0", "y0"):
-                                values[key] = float(val)
-                            else:
-                                values[key] = val
-
-                    x0_rel = values.get("x0", 0)
-                    y0_rel = values.get("y0", 0)
-                    x0 = x0_rel * self.scene.step_x * 20 + self.scene.sheet_width / 2
-                    y0 = self.scene.sheet_height / 2 - y0_rel * self.scene.step_y * 20
-
-                    point_class = point_types[item_type]
+                if opcode in point_types:
+                    x0 = coords[0] * step_x * 20 + center_x
+                    y0 = center_y - coords[1] * step_y * 20
+
+                    point_class = point_types[opcode]
                     if point_class == SpindlePoint:
-                        spindle_name = values.get("name", "")
                         element = point_class(
                             spindle_name=spindle_name,
-                            point_type=values.get("type", ""),
+                            point_type=connection_type,
                         )
                         if spindle_name:
                             geometry_list = self.skey_service.get_spindle_geometry(spindle_name)
                             if geometry_list:
                                 self._load_spindle_geometry_to_scene(geometry_list, x0, y0)
                     else:
-                        element = point_class(point_type=values.get("type", ""))
+                        element = point_class(point_type=connection_type)
 
                     element.setPos(x0, y0)
                     self._add_graphics_element(element)
 
-                elif item_type == "Line":
-                    parts = item_str.split(":")
-                    if len(parts) < 2:
-                        continue
-                    values = self._parse_key_value_params_float(parts[1].strip())
-                    x1 = values.get("x1", 0) * self.scene.step_x * 20 + self.scene.sheet_width / 2
-                    y1 = self.scene.sheet_height / 2 - values.get("y1", 0) * self.scene.step_y * 20
-                    x2 = values.get("x2", 0) * self.scene.step_x * 20 + self.scene.sheet_width / 2
-                    y2 = self.scene.sheet_height / 2 - values.get("y2", 0) * self.scene.step_y * 20
-                    line = QGraphicsLineItem(x1, y1, x2, y2)
+                elif opcode == LINE:
+                    x1, y1, x2, y2 = coords
+                    line = QGraphicsLineItem(x1 * step_x * 20 + center_x, center_y - y1 * step_y * 20,
+                                             x2 * step_x * 20 + center_x, center_y - y2 * step_y * 20)
                     pen = QPen(QColor(0, 0, 0))
                     pen.setWidth(2)
                     line.setPen(pen)
                     self._add_graphics_element(line)
 
-                elif item_type == "Rectangle":
-                    parts = item_str.split(":")
-                    if len(parts) < 2:
-                        continue
-                    values = self._parse_key_value_params_float(parts[1].strip())
-                    x0 = values.get("x0", 0) * self.scene.step_x * 20 + self.scene.sheet_width / 2
-                    y0 = self.scene.sheet_height / 2 - values.get("y0", 0) * self.scene.step_y * 20
-                    width = values.get("width", 0) * self.scene.step_x * 20
-                    height = values.get("height", 0) * self.scene.step_y * 20
+                elif opcode == RECTANGLE:
+                    x0 = coords[0] * step_x * 20 + center_x
+                    y0 = center_y - coords[1] * step_y * 20
+                    width = coords[2] * step_x * 20
+                    height = coords[3] * step_y * 20
                     rect = QGraphicsRectItem(x0 - width / 2, y0 - height / 2, width, height)
                     pen = QPen(QColor(0, 0, 0))
                     pen.setWidth(2)
                     rect.setPen(pen)
                     self._add_graphics_element(rect)
 
-                elif item_type == "Polygon":
-                    parts = item_str.split(":")
-                    if len(parts) < 2:
-                        continue
-                    values = self._parse_key_value_params_float(parts[1].strip())
+                elif opcode == POLYGON:
                     polygon = QPolygonF()
-                    i = 1
-                    while f"p{i}x" in values and f"p{i}y" in values:
-                        x = values[f"p{i}x"] * self.scene.step_x * 20 + self.scene.sheet_width / 2
-                        y = self.scene.sheet_height / 2 - values[f"p{i}y"] * self.scene.step_y * 20
-                        polygon.append(QPointF(x, y))
-                        i += 1
+                    for x, y in zip(coords[0::2], coords[1::2]):
+                        polygon.append(QPointF(x * step_x * 20 + center_x, center_y - y * step_y * 20))
                     if not polygon.isEmpty():
                         poly_item = QGraphicsPolygonItem(polygon)
                         pen = QPen(QColor(0, 0, 0))
@@ -234,14 +205,10 @@ class GeometryIOMixin:
                         poly_item.setBrush(QBrush(QColor(150, 150, 150, 100)))
                         self._add_graphics_element(poly_item)
 
-                elif item_type == "Circle":
-                    parts = item_str.split(":")
-                    if len(parts) < 2:
-                        continue
-                    values = self._parse_key_value_params_float(parts[1].strip())
-                    x0 = values.get("x0", 0) * self.scene.step_x * 20 + self.scene.sheet_width / 2
-                    y0 = self.scene.sheet_height / 2 - values.get("y0", 0) * self.scene.step_y * 20
-                    r = values.get("r", 0) * self.scene.step_x * 20
+                elif opcode == CIRCLE:
+                    x0 = coords[0] * step_x * 20 + center_x
+                    y0 = center_y - coords[1] * step_y * 20
+                    r = coords[2] * step_x * 20
                     circle = QGraphicsEllipseItem(x0 - r, y0 - r, 2 * r, 2 * r)
                     pen = QPen(QColor(0, 0, 0))
                     pen.setWidth(2)
@@ -249,7 +216,7 @@ class GeometryIOMixin:
                     self._add_graphics_element(circle)
 
             except Exception as e:
-                print(f"Error loading geometry item '{item_str}': {e}")
+                print(f"Error loading geometry item '{geometry[index]}': {e}")
                 continue
 
         self.preview_widget.update_preview(self.scene.symbol_drawlist, self.origin_x, self.origin_y)
@@ -320,113 +287,8 @@ class GeometryIOMixin:
         """Extracts a numeric coordinate value from a formatted geometry parameter string."""
         return round(float(item.split(":")[1].split(" ")[index].split("=")[1]), 3) * 100.0
 
-    def _parse_raw_coordinate_pair(self, geometry: list, index: int) -> tuple:
-        """Extracts X and Y floating-point coordinates from a raw geometry data array."""
-        return float(geometry[index + 1]), float(geometry[index + 2])
-
-    def _scale_and_offset_point(
-        self, x: float, y: float, scale: float, symbol_width: float, symbol_height: float
-    ) -> tuple:
-        """Scales relative coordinates to scene units and applies centering offsets."""
-        scaled_x = round(x * scale - symbol_width / 2, 0) / 100.0
-        scaled_y = round(y * scale - symbol_height / 2, 0) / 100.0
-        return scaled_x, scaled_y
-
-    def convert_raw_graphics_data(self, skey: str, geometry: list) -> list:
+    def convert_raw_graphics_data(self, skey: str, geometry: list) -> GeometryList:
         """Converts legacy numeric graphics codes into the modern geometry string format."""
         self.scene.set_grid_center()
-
-        min_x, min_y = float('inf'), float('inf')
-        max_x, max_y = float('-inf'), float('-inf')
-
-        for i in range(0, len(geometry), 3):
-            code = geometry[i]
-            if code in ("1", "2", "3", "6"):
-                x, y = self._parse_raw_coordinate_pair(geometry, i)
-                min_x, min_y = min(min_x, x), min(min_y, y)
-                max_x, max_y = max(max_x, x), max(max_y, y)
-
-        scale = 0.05
-        symbol_width = max_x * scale
-        symbol_height = max_y * scale
-
-        end_index = len(geometry)
-        for i in range(0, len(geometry), 3):
-            if geometry[i] == "0":
-                end_index = i
-                break
-
-        new_geometry = []
-        start_x, start_y = 0.0, 0.0
-        is_spindle = "SP" in skey
-
-        for i in range(0, len(geometry), 3):
-            code = geometry[i]
-
-            if code == "1":
-                start_x, start_y = self._parse_raw_coordinate_pair(geometry, i)
-                start_x, start_y = self._scale_and_offset_point(
-                    start_x, start_y, scale, symbol_width, symbol_height
-                )
-                if i == 0:
-                    point_type = "SpindlePoint" if is_spindle else "ArrivePoint"
-                    new_geometry.append(f"{point_type}: x0={start_x} y0={start_y}")
-                elif i == len(geometry) - 3 or i == end_index - 3:
-                    if not is_spindle:
-                        new_geometry.append(f"LeavePoint: x0={start_x} y0={start_y}")
-
-            elif code == "2":
-                end_x, end_y = self._parse_raw_coordinate_pair(geometry, i)
-                end_x, end_y = self._scale_and_offset_point(
-                    end_x, end_y, scale, symbol_width, symbol_height
-                )
-                new_geometry.append(f"Line: x1={start_x} y1={start_y} x2={end_x} y2={end_y}")
-                start_x, start_y = end_x, end_y
-
-            elif code == "3":
-                end_x, end_y = self._parse_raw_coordinate_pair(geometry, i)
-                end_x, end_y = self._scale_and_offset_point(
-                    end_x, end_y, scale, symbol_width, symbol_height
-                )
-                new_geometry.append(f"TeePoint: x0={end_x} y0={end_y}")
-                start_x, start_y = end_x, end_y
-
-            elif code == "6":
-                end_x, end_y = self._parse_raw_coordinate_pair(geometry, i)
-                end_x, end_y = self._scale_and_offset_point(
-                    end_x, end_y, scale, symbol_width, symbol_height
-                )
-                new_geometry.append(f"SpindlePoint: x0={end_x} y0={end_y}")
-                start_x, start_y = end_x, end_y
-
-        return new_geometry
-
-    # -----------------------------------------------------------------
-    # Internal helpers
-    # -----------------------------------------------------------------
-
-    @staticmethod
-    def _parse_key_value_params(params_str: str) -> dict:
-        """Parse 'key=value ...' string into a dict; values are floats where possible."""
-        values: dict = {}
-        for param in params_str.split():
-            if "=" in param:
-                key, val = param.split("=", 1)
-                try:
-                    values[key] = float(val)
-                except ValueError:
-                    values[key] = val
-        return values
-
-    @staticmethod
-    def _parse_key_value_params_float(params_str: str) -> dict:
-        """Parse 'key=value ...' string into a dict of floats (skips non-numeric)."""
-        values: dict = {}
-        for param in params_str.split():
-            if "=" in param:
-                key, val = param.split("=", 1)
-                try:
-                    values[key] = float(val)
-                except ValueError:
-                    pass
-        return values
+        # Scene units: whole raw units / 100, centred on the true drawn bounds.
+        return convert_raw_geometry(skey, geometry, ndigits=0, divisor=100.0, min_extent=-math.inf)
@@ -9,7 +9,7 @@ from __future__ import annotations
 
 import os
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
 
 from openiso.controller.skey_request_mapper import (
@@ -21,8 +21,47 @@ from openiso.core.i18n import _t, get_current_language
 from openiso.view.main_window.window_error_handler import WindowErrorHandler
 
 
+class WriteJobNotifier(QObject):
+    """Carries finished write jobs from the writer thread to the GUI thread."""
+    finished = pyqtSignal(object)
+
+
 class SkeyOpsMixin:
-    """Mixin providing Skey CRUD, import and export operations for SkeyEditor."""
+    """Mixin providing Skey CRUD, import and export operations for SkeyEditor.
+
+    Saves, deletes and imports run on the controller's writer thread; the UI is
+    updated from _on_write_job_finished once the job has been committed.
+    """
+
+    # -----------------------------------------------------------------
+    # Background writes
+    # -----------------------------------------------------------------
+
+    def _setup_write_queue(self):
+        """Route write completions from the controller's writer thread to the GUI thread."""
+        self._write_job_handlers = {}
+        self._write_notifier = WriteJobNotifier(self)
+        self._write_notifier.finished.connect(self._on_write_job_finished)
+        self.controller.on_write_finished = self._write_notifier.finished.emit
+
+    def _submit_write(self, job, handler):
+        """Remember the GUI handler of a submitted job.
+
+        The finished signal is queued to the GUI thread, so it cannot be handled
+        before this returns even if the job is already done.
+        """
+        self._write_job_handlers[job.job_id] = handler
+
+    def _on_write_job_finished(self, job):
+        """Runs on the GUI thread when a queued write has finished.
+
+        The writer thread only touched the database; the in-memory library is
+        brought up to date here, before the job's handler refreshes the UI.
+        """
+        self.controller.apply_finished_write(job)
+        handler = self._write_job_handlers.pop(job.job_id, None)
+        if handler is not None:
+            handler(job)
 
     # -----------------------------------------------------------------
     # Create / delete
@@ -73,31 +112,39 @@ class SkeyOpsMixin:
         )
 
         if reply == QMessageBox.StandardButton.Yes:
-            if self.controller.delete_skey(skey_name):
-                self.refresh_skey_tree()
-
-                if target_path:
-                    self.tree_skeys.select_item_by_path(
-                        target_path['group'],
-                        target_path['subgroup'],
-                        target_path['skey'],
-                    )
-
-                self.status_bar_widget.showMessage(_t("Skey '{0}' deleted").format(skey_name), 3000)
-                if self.properties_widget.txt_skey.text() == skey_name:
-                    if not target_path or not target_path['skey']:
-                        self._on_create_skey_requested()
-            else:
-                QMessageBox.critical(
-                    self, _t("Error"), _t("Failed to delete Skey '{0}'").format(skey_name)
+            self._submit_write(
+                self.controller.submit_delete_skey(skey_name),
+                lambda job: self._on_skey_deleted(job, target_path),
+            )
+
+    def _on_skey_deleted(self, job, target_path):
+        """Updates the tree and editor once a delete has been committed."""
+        skey_name = job.name
+        if job.success and job.result:
+            self.refresh_skey_tree()
+
+            if target_path:
+                self.tree_skeys.select_item_by_path(
+                    target_path['group'],
+                    target_path['subgroup'],
+                    target_path['skey'],
                 )
 
+            self.status_bar_widget.showMessage(_t("Skey '{0}' deleted").format(skey_name), 3000)
+            if self.properties_widget.txt_skey.text() == skey_name:
+                if not target_path or not target_path['skey']:
+                    self._on_create_skey_requested()
+        else:
+            QMessageBox.critical(
+                self, _t("Error"), _t("Failed to delete Skey '{0}'").format(skey_name)
+            )
+
     # -----------------------------------------------------------------
     # Save
     # -----------------------------------------------------------------
 
     def save_current_skey(self):
-        """Gathers form data and scene geometry, then saves the Skey to the database."""
+        """Gathers form data and scene geometry, then queues the Skey save to the database."""
         try:
             form_data = self.form_adapter.collect_save_form_data()
             skey_name = resolve_skey_name(form_data["alias_code"], form_data["skey_name"])
@@ -114,23 +161,31 @@ class SkeyOpsMixin:
                 lang_code=get_current_language(),
             )
 
-            self.controller.save_skey(**save_payload)
-
-            print(f"Reloading Skey tree after saving '{skey_name}'")
-            self.refresh_skey_tree()
-            self._select_skey_in_tree(skey_name)
             self.properties_widget.display_geometry(geometry)
-
-            self.status_bar_widget.showMessage(
-                _t("Skey '{0}' saved successfully").format(skey_name), 3000
-            )
-            print(f"Skey '{skey_name}' saved successfully")
+            self.status_bar_widget.showMessage(_t("Saving Skey '{0}'...").format(skey_name))
+            self._submit_write(self.controller.submit_save_skey(**save_payload), self._on_skey_saved)
             return True
 
         except (RuntimeError, ValueError, TypeError, OSError) as e:
             WindowErrorHandler.handle_save_error(e)
             return False
 
+    def _on_skey_saved(self, job):
+        """Refreshes the tree once a save has been committed."""
+        if not job.success:
+            WindowErrorHandler.handle_save_error(job.error)
+            self.status_bar_widget.showMessage(_t("Failed to save Skey '{0}'").format(job.name), 3000)
+            return
+
+        skey_name = job.name
+        print(f"Reloading Skey tree after saving '{skey_name}'")
+        self.refresh_skey_tree()
+        self._select_skey_in_tree(skey_name)
+        self.status_bar_widget.showMessage(
+            _t("Skey '{0}' saved successfully").format(skey_name), 3000
+        )
+        print(f"Skey '{skey_name}' saved successfully")
+
     def _select_skey_in_tree(self, skey_name: str):
         """Searches for and programmatically selects a specific Skey item in the tree."""
         root = self.tree_skeys.invisibleRootItem()
@@ -212,11 +267,7 @@ class SkeyOpsMixin:
         if symbol_file_path is None:
             return
 
-        result = self.controller.import_from_ascii(symbol_file_path)
-        if result.success:
-            self.refresh_skey_tree()
-        else:
-            print(f"Import errors: {result.errors}")
+        self._submit_write(self.controller.submit_import_from_ascii(symbol_file_path), self._on_symbols_imported)
 
     def import_from_idf_format(self):
         """Executes the import process for Skey data from an Intergraph Data File (IDF)."""
@@ -224,6 +275,11 @@ class SkeyOpsMixin:
         if symbol_file_path is None:
             return
 
-        result = self.controller.import_from_idf(symbol_file_path)
-        if result.success:
+        self._submit_write(self.controller.submit_import_from_idf(symbol_file_path), self._on_symbols_imported)
+
+    def _on_symbols_imported(self, job):
+        """Refreshes the tree once an import has been committed."""
+        if job.success and job.result.success:
             self.refresh_skey_tree()
+        else:
+            print(f"Import errors: {job.result.errors if job.success else job.error}")
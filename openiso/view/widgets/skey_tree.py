@@ -77,27 +77,25 @@ class SkeyTree(QTreeWidget):
         # Sort top-level groups by their translated names
         self.tree_root.sortChildren(0, Qt.SortOrder.AscendingOrder)
 
-    def filter_items(self, search_text):
+    def filter_items(self, search_text, matches=None):
         """
-        Filter the tree items based on the provided search text.
+        Filter the tree items to the Skeys found by the search index.
 
-        The search is case-insensitive. If an item or any of its children match
-        the search text, the item is shown and expanded. If the search text is empty,
+        A Skey is shown if its name is in matches; groups and subgroups are shown
+        and expanded when they contain a shown Skey. If the search text is empty,
         all items are shown and non-root items are collapsed.
 
         Args:
-            search_text (str): The text to filter the tree items by.
+            search_text (str): The text being searched for.
+            matches (set, optional): Skey names found by the search index for search_text.
         """
-        search_text = search_text.strip().lower()
+        searching = bool(search_text.strip())
+        matches = matches or ()
         root = self.invisibleRootItem()
         if root is not None:
             def filter_item(item):
-                item_text = item.text(0).lower()
-                # Also search in the raw key/ID stored in UserRole
-                item_data = str(item.data(0, Qt.ItemDataRole.UserRole) or "").lower()
-
                 # If search_text is empty, we show everything and return to default expansion
-                if not search_text:
+                if not searching:
                     item.setHidden(False)
                     # For non-root items, collapse by default
                     if item != self.tree_root:
@@ -107,20 +105,16 @@ class SkeyTree(QTreeWidget):
                         filter_item(item.child(i))
                     return True
 
-                # Check if this item or any of its children match
-                item_match = search_text in item_text or search_text in item_data
-                any_child_match = False
-                for i in range(item.childCount()):
-                    if filter_item(item.child(i)):
-                        any_child_match = True
-
-                match = item_match or any_child_match
+                if item.childCount() == 0:
+                    match = item.data(0, Qt.ItemDataRole.UserRole) in matches
+                else:
+                    match = False
+                    for i in range(item.childCount()):
+                        if filter_item(item.child(i)):
+                            match = True
+                    if match:
+                        item.setExpanded(True)
                 item.setHidden(not match)
-
-                # Expand item if it has matching children or is a match itself (to show its children)
-                if match:
-                    item.setExpanded(True)
-
                 return match
 
             for i in range(root.childCount()):
@@ -185,6 +179,8 @@ class SkeyTreeView(QWidget):
         """
         super().__init__(parent)
         self.icons_library_path = icons_path
+        # Callable(query) -> skey names, e.g. the full-text search of the controller; without it nothing matches
+        self.search_provider = None
         self.vbox_layout = QVBoxLayout(self)
         self.vbox_layout.setContentsMargins(0, 0, 0, 0)
 
@@ -226,7 +222,13 @@ class SkeyTreeView(QWidget):
 
     def _on_filter_text_changed(self, text):
         """Handles the text changed signal from the search line edit."""
-        self.tree.filter_items(text)
+        self.tree.filter_items(text, self._search_matches(text))
+
+    def _search_matches(self, text):
+        """Return the skey names found by the search provider for text, if one is set."""
+        if self.search_provider is None or not text.strip():
+            return None
+        return set(self.search_provider(text))
 
     def _on_filter_clear_clicked(self):
         """Handles the clicked signal from the clear button."""
@@ -262,7 +264,7 @@ class SkeyTreeView(QWidget):
     def filter_items(self, search_text):
         """Sets the filter text and updates the tree."""
         self.txt_search.setText(search_text)
-        self.tree.filter_items(search_text)
+        self.tree.filter_items(search_text, self._search_matches(search_text))
 
     def setCurrentItem(self, item):
         """Delegates setting current item to the internal tree widget."""
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: 502 pen record decoding of an ASCII skey file.
+# Compares the former per-row parser (twelve sliced, stripped and converted fields
+# appended one by one) with decode_502_records(), both per symbol (as the
+# importers call it) and over the whole file as one block.
+#
+# Usage:
+#     python scripts/benchmarks/bench_502_decoder.py [--file data/settings/IsoAlgo.skey] [--repeat 20]
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openiso.controller.importers import ASCIISkeyImporter, decode_502_records  # noqa: E402
+from openiso.model.geometry import PEN_ACTION_CODES  # noqa: E402
+
+LEGACY_POSITIONS = [
+    (5, 14, 15, 22, 23, 30),
+    (31, 38, 39, 46, 47, 54),
+    (55, 63, 64, 70, 71, 78),
+    (79, 86, 87, 94, 95, 103)
+]
+
+
+def legacy_parse(rows):
+    """The per-row parser the importers used before decode_502_records()."""
+    geometry = []
+    for row in rows:
+        for start_action, end_action, start_x, end_x, start_y, end_y in LEGACY_POSITIONS:
+            pen_action = row[start_action:end_action].strip()
+            pos_x = float(row[start_x:end_x].strip())
+            pos_y = float(row[start_y:end_y].strip())
+
+            geometry.append(pen_action)
+            geometry.append(pos_x)
+            geometry.append(pos_y)
+    return geometry
+
+
+def same_geometry(legacy, decoded) -> bool:
+    if len(legacy) != len(decoded):
+        return False
+    for index, value in enumerate(legacy):
+        if index % 3 == 0:
+            value = PEN_ACTION_CODES.get(value, math.nan)
+            if math.isnan(value) and math.isnan(decoded[index]):
+                continue
+        if value != decoded[index]:
+            return False
+    return True
+
+
+def symbol_blocks(path: str):
+    blocks = []
+    with open(path, "r", encoding="utf-8") as symbol_file:
+        for row in symbol_file:
+            if row[:4].strip() == "501":
+                blocks.append([])
+            elif row[:4].strip() == "502" and blocks:
+                blocks[-1].append(row)
+    return [block for block in blocks if block]
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare the legacy and block 502 record decoders.")
+    parser.add_argument("--file", default=str(PROJECT_ROOT / "data" / "settings" / "IsoAlgo.skey"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    blocks = symbol_blocks(args.file)
+    rows = [row for block in blocks for row in block]
+    if not all(same_geometry(legacy_parse(block), decode_502_records(block)) for block in blocks):
+        print("decode_502_records does not match the legacy parser")
+        return 1
+
+    timings = {
+        "legacy, per row": measure(lambda: [legacy_parse(block) for block in blocks], args.repeat),
+        "block, per symbol": measure(lambda: [decode_502_records(block) for block in blocks], args.repeat),
+        "legacy, whole file": measure(lambda: legacy_parse(rows), args.repeat),
+        "block, whole file": measure(lambda: decode_502_records(rows), args.repeat),
+        "import_from_file": measure(lambda: ASCIISkeyImporter().import_from_file(args.file), args.repeat),
+    }
+
+    print(f"{len(rows)} records in {len(blocks)} symbols from {args.file}")
+    for label, seconds in timings.items():
+        print(f"  {label:<20} {seconds * 1000:8.2f} ms  ({len(rows) / seconds:,.0f} records/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: official catalog sync.
+# Writes a synthetic bundled catalog of legacy raw-geometry symbols, then times the
+# first sync, a forced re-sync of the same release and a sync of a new release with
+# unchanged payloads, for each requested hashing/normalization worker count.
+#
+# Usage:
+#     python scripts/benchmarks/bench_catalog_sync.py [--symbols 50000] [--workers 0 2 4]
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import openiso.core.i18n as i18n  # noqa: E402
+from openiso.controller.services import SkeyService  # noqa: E402
+
+
+def report(label: str, result: dict) -> None:
+    timings = " ".join(f"{phase}={seconds * 1000:.1f}ms" for phase, seconds in result["timings"].items())
+    counts = {key: result[key] for key in ("inserted", "updated", "unchanged")}
+    print(f"{label:>16}: {counts} {timings}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark official catalog sync.")
+    parser.add_argument("--symbols", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    args = parser.parse_args()
+
+    i18n.save_json_translation = lambda *args, **kwargs: None
+    catalog = {
+        f"CS{index:05d}": {
+            "skey_group": "Valves",
+            "subgroup": "Gate",
+            "description": f"Synthetic {index}",
+            "symbol_version": 1,
+            "geometry": [
+                "1", 0.0, float(index % 400),
+                *(value for step in range(1, 9) for value in ("2", step * 125.0, float((index + step) % 400))),
+                "0", 0.0, 0.0,
+            ],
+        }
+        for index in range(args.symbols)
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        catalog_path = Path(tmp_dir) / "OpenIso.json"
+        catalog_path.write_text(json.dumps(catalog), encoding="utf-8")
+        del catalog
+
+        for workers in args.workers:
+            print(f"workers={workers}")
+            data_path = Path(tmp_dir) / f"data{workers}"
+            (data_path / "database").mkdir(parents=True)
+            (data_path / "settings").mkdir(parents=True)
+            shutil.copy(catalog_path, data_path / "settings" / "OpenIso.json")
+
+            service = SkeyService(data_path=str(data_path), use_db=True)
+            report("first sync", service.sync_official_catalog("1.0.0", workers=workers))
+            report("forced re-sync", service.sync_official_catalog("1.0.0", force=True, workers=workers))
+            report("new release", service.sync_official_catalog("1.1.0", workers=workers))
+            service.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
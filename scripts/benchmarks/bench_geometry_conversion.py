@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: raw pen geometry to geometry strings.
+# Compares the former three-pass GeometryConverter.convert_graphics (bounds, end
+# marker, conversion with float()/round() per coordinate) with convert_raw_geometry()
+# on the symbols of an ASCII skey file, for [str, x, y] lists and decoded arrays.
+#
+# Usage:
+#     python scripts/benchmarks/bench_geometry_conversion.py [--file data/settings/IsoAlgo.skey] [--repeat 20]
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openiso.controller.importers import decode_502_records  # noqa: E402
+from openiso.model.geometry import GeometryConverter, PEN_ACTION_CODES  # noqa: E402
+
+
+def legacy_convert(skey, geometry):
+    """The three-pass conversion convert_graphics used before convert_raw_geometry()."""
+    start_point_x = 0.0
+    start_point_y = 0.0
+    new_geometry = []
+    scale = 0.05
+    max_width = 1.0
+    max_height = 1.0
+
+    for x in range(0, len(geometry), 3):
+        if geometry[x] in ("1", "2", "3", "6"):
+            max_width = max(float(geometry[x + 1]), max_width)
+            max_height = max(float(geometry[x + 2]), max_height)
+
+    symbol_width = max_width * scale
+    symbol_height = max_height * scale
+
+    index_of_end_geometry = 0
+    for x in range(0, len(geometry), 3):
+        if geometry[x] == "0":
+            index_of_end_geometry = x
+            break
+
+    for x in range(0, len(geometry), 3):
+        pen_action = geometry[x]
+        if pen_action == "1":
+            start_point_x = round(float(geometry[x + 1]) * scale - symbol_width / 2, 3)
+            start_point_y = round(float(geometry[x + 2]) * scale - symbol_height / 2, 3)
+            if x == 0:
+                point_type = "SpindlePoint" if "SP" in skey else "ArrivePoint"
+                new_geometry.append(f"{point_type}: x0={start_point_x} y0={start_point_y}")
+            elif x == (len(geometry) - 3) or x == (index_of_end_geometry - 3):
+                if "SP" not in skey:
+                    new_geometry.append(f"LeavePoint: x0={start_point_x} y0={start_point_y}")
+        elif pen_action in ("2", "3", "6"):
+            end_point_x = round(float(geometry[x + 1]) * scale - symbol_width / 2, 3)
+            end_point_y = round(float(geometry[x + 2]) * scale - symbol_height / 2, 3)
+            if pen_action == "2":
+                new_geometry.append(f"Line: x1={start_point_x} y1={start_point_y} x2={end_point_x} y2={end_point_y}")
+            elif pen_action == "3":
+                new_geometry.append(f"TeePoint: x0={end_point_x} y0={end_point_y}")
+            else:
+                new_geometry.append(f"SpindlePoint: x0={end_point_x} y0={end_point_y}")
+            start_point_x = end_point_x
+            start_point_y = end_point_y
+    return new_geometry
+
+
+def load_symbols(path: str):
+    """Return (skey, [str, x, y] list, decoded array) per symbol of an ASCII skey file."""
+    blocks = []
+    with open(path, "r", encoding="utf-8") as symbol_file:
+        for row in symbol_file:
+            if row[:4].strip() == "501":
+                blocks.append((row[5:10].strip() or row[11:15].strip(), []))
+            elif row[:4].strip() == "502" and blocks:
+                blocks[-1][1].append(row)
+    codes = {code: action for action, code in PEN_ACTION_CODES.items()}
+    symbols = []
+    for skey, rows in blocks:
+        decoded = decode_502_records(rows)
+        raw = [codes.get(value, "?") if index % 3 == 0 else value for index, value in enumerate(decoded)]
+        symbols.append((skey, raw, decoded))
+    return symbols
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare legacy and single-pass geometry conversion.")
+    parser.add_argument("--file", default=str(PROJECT_ROOT / "data" / "settings" / "IsoAlgo.skey"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    symbols = load_symbols(args.file)
+    converter = GeometryConverter()
+    expected = [legacy_convert(skey, raw) for skey, raw, _ in symbols]
+    if [converter.convert_graphics(skey, decoded) for skey, _, decoded in symbols] != expected:
+        print("convert_raw_geometry does not match the legacy conversion")
+        return 1
+
+    timings = {
+        "legacy, lists": measure(lambda: [legacy_convert(skey, raw) for skey, raw, _ in symbols], args.repeat),
+        "engine, lists": measure(lambda: [converter.convert_graphics(skey, raw) for skey, raw, _ in symbols], args.repeat),
+        "engine, arrays": measure(
+            lambda: converter.convert_graphics_batch((skey, decoded) for skey, _, decoded in symbols), args.repeat
+        ),
+    }
+
+    print(f"{len(symbols)} symbols from {args.file}")
+    for label, seconds in timings.items():
+        print(f"  {label:<15} {seconds * 1000:8.2f} ms  ({len(symbols) / seconds:,.0f} symbols/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
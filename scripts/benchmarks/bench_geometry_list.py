@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: geometry strings vs GeometryList across the layers that read geometry.
+# Converts the symbols of an ASCII skey file once, then times packing and ASCII
+# export from plain string lists (each layer parses the strings again) and from
+# the GeometryList the converter returns (read from its arrays), plus the one-off
+# cost of parsing strings into a GeometryList.
+#
+# Usage:
+#     python scripts/benchmarks/bench_geometry_list.py [--file data/settings/IsoAlgo.skey] [--repeat 20]
+
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from dataclasses import replace
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openiso.controller.importers import ASCIISkeyImporter  # noqa: E402
+from openiso.controller.services import SkeyService  # noqa: E402
+from openiso.model.geometry_list import GeometryList  # noqa: E402
+from openiso.model.packed_geometry import pack_geometry  # noqa: E402
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare geometry strings and GeometryList per layer.")
+    parser.add_argument("--file", default=str(PROJECT_ROOT / "data" / "settings" / "IsoAlgo.skey"))
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    typed = list(ASCIISkeyImporter().import_from_file(args.file).skeys.values())
+    strings = [list(skey.geometry) for skey in typed]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        (Path(tmp_dir) / "database").mkdir()
+        with contextlib.redirect_stdout(io.StringIO()):
+            service = SkeyService(data_path=tmp_dir, use_db=True)
+        # export_skey_to_ascii parses plain strings into the SkeyData it is given: use fresh copies.
+        if [service.export_skey_to_ascii(skey) for skey in typed] != [
+            service.export_skey_to_ascii(replace(skey, geometry=items)) for skey, items in zip(typed, strings)
+        ]:
+            print("GeometryList export differs from the string export")
+            return 1
+
+        timings = {
+            "parse strings": measure(lambda: [GeometryList.from_strings(items) for items in strings], args.repeat),
+            "pack, strings": measure(lambda: [pack_geometry(items) for items in strings], args.repeat),
+            "pack, typed": measure(lambda: [pack_geometry(skey.geometry) for skey in typed], args.repeat),
+            "export, strings": measure(
+                lambda: [service.export_skey_to_ascii(replace(skey, geometry=items))
+                         for skey, items in zip(typed, strings)],
+                args.repeat,
+            ),
+            "export, typed": measure(lambda: [service.export_skey_to_ascii(skey) for skey in typed], args.repeat),
+        }
+        service._db.close()
+
+    print(f"{len(typed)} symbols, {sum(map(len, strings))} primitives from {args.file}")
+    for label, seconds in timings.items():
+        print(f"  {label:<16} {seconds * 1000:8.2f} ms  ({len(typed) / seconds:,.0f} symbols/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: library load time against library size.
+# Builds synthetic symbol libraries of increasing size and compares the bulk
+# SkeyDB.get_all_skeys() loader with the legacy per-skey geometry lookup and with
+# the metadata-only SkeyDB.get_all_skey_metadata() used at startup.
+#
+# Usage:
+#     python scripts/benchmarks/bench_library_load.py [--sizes 1000 5000 20000] [--revisions 3]
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openiso.controller.db import SKEY_SELECT_SQL, SkeyDB, _skey_row_factory  # noqa: E402
+
+GEOMETRY_TEMPLATE = [
+    "ArrivePoint: x0=-0.5 y0=0.0",
+    "Line: x1=-0.5 y1=0.0 x2=-0.25 y2=0.25",
+    "Line: x1=-0.25 y1=0.25 x2=0.25 y2=0.25",
+    "Line: x1=0.25 y1=0.25 x2=0.5 y2=0.0",
+    "Line: x1=0.5 y1=0.0 x2=0.25 y2=-0.25",
+    "Line: x1=0.25 y1=-0.25 x2=-0.25 y2=-0.25",
+    "Line: x1=-0.25 y1=-0.25 x2=-0.5 y2=0.0",
+    "Rectangle: x0=0.0 y0=0.0 width=0.2 height=0.1",
+    "LeavePoint: x0=0.5 y0=0.0",
+]
+
+
+def build_library(db_path: str, size: int, revisions: int) -> None:
+    """Populate a fresh DB with `size` symbols, each having `revisions` geometry revisions."""
+    SkeyDB(db_path)
+    conn = sqlite3.connect(db_path)
+    cur = conn.cursor()
+    cur.execute("INSERT OR IGNORE INTO skey_groups (skey_group_key) VALUES ('bench')")
+    group_id = cur.execute("SELECT id FROM skey_groups WHERE skey_group_key = 'bench'").fetchone()[0]
+    cur.execute(
+        "INSERT OR IGNORE INTO skey_subgroups (group_id, skey_group_key, skey_subgroup_key) VALUES (?, 'bench', 'synthetic')",
+        (group_id,),
+    )
+    for index in range(size):
+        cur.execute(
+            "INSERT INTO skeys (name, skey_group_key, skey_subgroup_key, skey_description_key) VALUES (?, 'bench', 'synthetic', '')",
+            (f"B{index:06d}",),
+        )
+        skey_id = cur.lastrowid
+        for revision in range(revisions):
+            cur.execute(
+                "INSERT INTO transactions (skey_id, user, action, comment) VALUES (?, 'bench', 'edit', ?)",
+                (skey_id, f"rev {revision}"),
+            )
+            transaction_id = cur.lastrowid
+            cur.executemany(
+                "INSERT INTO geometry (skey_id, type, data, transaction_id) VALUES (?, ?, ?, ?)",
+                [(skey_id, geom.split(":")[0], geom, transaction_id) for geom in GEOMETRY_TEMPLATE],
+            )
+        cur.execute("UPDATE skeys SET current_transaction_id = ? WHERE id = ?", (transaction_id, skey_id))
+    conn.commit()
+    conn.close()
+
+
+def legacy_load(db: SkeyDB) -> int:
+    """Per-skey MAX(transaction_id) lookup as done before the bulk loader (two queries per symbol)."""
+    conn = sqlite3.connect(db.db_path)
+    conn.row_factory = _skey_row_factory
+    rows = conn.execute(SKEY_SELECT_SQL + " ORDER BY s.name").fetchall()
+    conn.row_factory = None
+    skeys = []
+    for row in rows:
+        transaction_id = conn.execute("SELECT MAX(transaction_id) FROM geometry WHERE skey_id = ?", (row.id,)).fetchone()[0]
+        geometry = [
+            data for (data,) in conn.execute(
+                "SELECT data FROM geometry WHERE skey_id = ? AND transaction_id = ? ORDER BY id ASC", (row.id, transaction_id)
+            )
+        ]
+        skeys.append(SkeyDB._skey_from_row(row, geometry))
+    conn.close()
+    return sum(len(skey.geometry) for skey in skeys)
+
+
+def bulk_load(db: SkeyDB) -> int:
+    return sum(len(skey.geometry) for skey in db.get_all_skeys())
+
+
+def metadata_load(db: SkeyDB) -> int:
+    return len(db.get_all_skey_metadata())
+
+
+def measure(func, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SkeyDB library load time against library size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--revisions", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'symbols':>8} {'legacy (s)':>12} {'bulk (s)':>10} {'speedup':>8} {'metadata (s)':>13}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in args.sizes:
+            db_path = str(Path(tmp_dir) / f"library_{size}.db")
+            build_library(db_path, size, args.revisions)
+            db = SkeyDB(db_path)
+            legacy = measure(legacy_load, db, repeat=args.repeat)
+            bulk = measure(bulk_load, db, repeat=args.repeat)
+            metadata = measure(metadata_load, db, repeat=args.repeat)
+            print(f"{size:>8} {legacy:>12.3f} {bulk:>10.3f} {legacy / bulk:>7.1f}x {metadata:>13.3f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: text vs packed geometry storage on the bundled symbol library.
+# Copies data/database/openiso.db twice, converts one copy to packed storage and
+# compares on-disk size, geometry payload size and full library load time.
+#
+# Usage:
+#     python scripts/benchmarks/bench_packed_geometry.py [--db data/database/openiso.db] [--repeat 5]
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openiso.controller.db import SkeyDB  # noqa: E402
+
+
+def payload_bytes(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    text = conn.execute("SELECT COALESCE(SUM(LENGTH(CAST(data AS BLOB))), 0) FROM geometry").fetchone()[0]
+    packed = conn.execute("SELECT COALESCE(SUM(LENGTH(data)), 0) FROM geometry_blobs").fetchone()[0]
+    conn.close()
+    return text + packed
+
+
+def row_count(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    rows = sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("geometry", "geometry_blobs"))
+    conn.close()
+    return rows
+
+
+def file_size(db: SkeyDB) -> int:
+    db.close()
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(db.db_path)
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare text and packed geometry storage.")
+    parser.add_argument("--db", default=str(PROJECT_ROOT / "data" / "database" / "openiso.db"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        text_db = SkeyDB(shutil.copy(args.db, Path(tmp_dir) / "text.db"))
+        packed_db = SkeyDB(shutil.copy(args.db, Path(tmp_dir) / "packed.db"))
+        converted = packed_db.set_geometry_storage("packed")
+
+        expected = [skey.geometry for skey in text_db.get_all_skeys()]
+        if [skey.geometry for skey in packed_db.get_all_skeys()] != expected:
+            print("packed geometry does not round-trip")
+            return 1
+
+        load = {
+            "text": measure(text_db.get_all_skeys, args.repeat),
+            "packed": measure(packed_db.get_all_skeys, args.repeat),
+        }
+        print(f"{converted} revisions converted, round-trip verified")
+        print(f"{'storage':>8} {'rows':>8} {'payload (B)':>12} {'file (B)':>10} {'load (ms)':>10}")
+        for name, db in (("text", text_db), ("packed", packed_db)):
+            print(f"{name:>8} {row_count(db.db_path):>8} {payload_bytes(db.db_path):>12} "
+                  f"{file_size(db):>10} {load[name] * 1000:>10.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
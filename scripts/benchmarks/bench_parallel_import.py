@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: sequential vs parallel ASCII symbol file import.
+# Writes a synthetic vendor library by repeating the symbols of IsoAlgo.skey under
+# unique names, then times ASCIISkeyImporter.import_from_file for each requested
+# worker count and checks that every run yields the same skeys.
+#
+# Usage:
+#     python scripts/benchmarks/bench_parallel_import.py [--symbols 20000] [--workers 0 2 4]
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openiso.controller.importers import ASCIISkeyImporter  # noqa: E402
+
+
+def write_library(path: Path, sample: Path, symbols: int) -> None:
+    blocks = []
+    for row in sample.read_text(encoding="utf-8").splitlines(keepends=True):
+        if row[:4].strip() == "501":
+            blocks.append([row])
+        elif blocks and row[:1] != "!":
+            blocks[-1].append(row)
+
+    with open(path, "w", encoding="utf-8") as library:
+        for index in range(symbols):
+            header, *records = blocks[index % len(blocks)]
+            library.write(f"{header[:5]}{f'S{index:04X}'[:5]:<5}{header[10:]}")
+            library.writelines(records)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark parallel symbol file import.")
+    parser.add_argument("--symbols", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 2, 4])
+    parser.add_argument("--sample", default=str(PROJECT_ROOT / "data" / "settings" / "IsoAlgo.skey"))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        library = Path(tmp_dir) / "library.skey"
+        write_library(library, Path(args.sample), args.symbols)
+        print(f"{args.symbols} symbols, {library.stat().st_size / 1e6:.1f} MB")
+
+        expected = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            result = ASCIISkeyImporter().import_from_file(str(library), workers=workers)
+            elapsed = time.perf_counter() - start
+            if expected is None:
+                expected = result.skeys
+            elif result.skeys != expected or result.errors:
+                print(f"workers={workers}: result differs from the first run")
+                return 1
+            print(f"  workers={workers}: {elapsed:.2f}s ({len(result.skeys) / elapsed:,.0f} symbols/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: storage and rebuild time of a heavily edited symbol.
+# Saves one symbol many times with a small edit per save and reports the stored
+# history size (keyframes + deltas) against keeping a full snapshot per revision,
+# and the worst-case time to rebuild an old revision with SkeyDB.get_skey_at().
+#
+# Usage:
+#     python scripts/benchmarks/bench_revision_history.py [--revisions 500] [--primitives 80]
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openiso.controller.db import SkeyDB  # noqa: E402
+from openiso.model.skey import SkeyData  # noqa: E402
+
+
+def stored_bytes(db_path: str) -> int:
+    conn = sqlite3.connect(db_path)
+    total = sum(
+        conn.execute(query).fetchone()[0]
+        for query in (
+            "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM geometry",
+            "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM geometry_blobs",
+            "SELECT COALESCE(SUM(LENGTH(ops)), 0) FROM geometry_deltas",
+        )
+    )
+    conn.close()
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark delta-encoded revision history.")
+    parser.add_argument("--revisions", type=int, default=500)
+    parser.add_argument("--primitives", type=int, default=80)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = SkeyDB(str(Path(tmp_dir) / "history.db"))
+        db.ensure_subgroup_exists("bench", "history")
+        geometry = [f"Line: x1={index / 100} y1=0.0 x2={index / 100} y2=0.5" for index in range(args.primitives)]
+        snapshot_bytes = 0
+        start = time.perf_counter()
+        for revision in range(args.revisions):
+            geometry = list(geometry)
+            geometry[revision % args.primitives] = f"Line: x1={revision / 1000} y1=0.1 x2=0.2 y2=0.3"
+            db.update_skey(SkeyData(name="HIST", group_key="bench", subgroup_key="history", geometry=geometry))
+            snapshot_bytes += sum(len(item) for item in geometry)
+        save_time = time.perf_counter() - start
+
+        history = db.get_skey_history("HIST")
+        worst = 0.0
+        for entry in history:
+            start = time.perf_counter()
+            db.get_skey_at("HIST", entry["transaction_id"])
+            worst = max(worst, time.perf_counter() - start)
+
+        print(f"revisions: {args.revisions}, primitives per revision: {args.primitives}")
+        print(f"full snapshots: {snapshot_bytes} B, stored history: {stored_bytes(db.db_path)} B")
+        print(f"save: {save_time / args.revisions * 1000:.2f} ms/revision, "
+              f"worst get_skey_at: {worst * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
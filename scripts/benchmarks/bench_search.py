@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: full-text skey search against the substring tree filter.
+# Fills a temporary database with synthetic symbols and times SkeyDB.search_skeys()
+# (FTS5 index) against SkeyGroup.filter() over the same names.
+#
+# Usage:
+#     python scripts/benchmarks/bench_search.py [--symbols 100000] [--repeat 20]
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from openiso.controller.db import SkeyDB  # noqa: E402
+from openiso.model.skey import SkeyData, SkeyGroup  # noqa: E402
+
+QUERIES = ("fl", "sp", "weld flange", "valve 42", "zz")
+
+
+def measure(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark full-text skey search.")
+    parser.add_argument("--symbols", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    subgroups = [("flanges", "weld_neck_flange"), ("valves", "gate_valve"), ("spindles", "all")]
+    skeys = [
+        SkeyData(
+            name=f"{group[:2].upper()}{index:06d}",
+            group_key=group,
+            subgroup_key=subgroup,
+            pcf_identification=group[:-1].upper(),
+            idf_record=str(index % 1000),
+        )
+        for index, (group, subgroup) in ((i, subgroups[i % len(subgroups)]) for i in range(args.symbols))
+    ]
+    groups = SkeyGroup()
+    for skey in skeys:
+        groups.add_skey(skey.group_key, skey.subgroup_key, skey.name)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = SkeyDB(str(Path(tmp_dir) / "search.db"))
+        start = time.perf_counter()
+        db.bulk_upsert_skeys(skeys)
+        print(f"{args.symbols} symbols indexed in {time.perf_counter() - start:.2f} s "
+              f"(FTS5: {'yes' if db.has_search_index() else 'no'})")
+
+        print(f"{'query':>12} {'hits':>6} {'search (ms)':>12} {'filter (ms)':>12}")
+        for query in QUERIES:
+            hits = len(db.search_skeys(query, limit=50))
+            search = measure(lambda: db.search_skeys(query, limit=50), args.repeat)
+            tree_filter = measure(lambda: groups.filter(query), max(1, args.repeat // 10))
+            print(f"{query:>12} {hits:>6} {search * 1000:>12.2f} {tree_filter * 1000:>12.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
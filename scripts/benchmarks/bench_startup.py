@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: MIT
+# SPDX-FileCopyrightText: 2024 OpenIso Roman PARYGIN
+#
+# Benchmark: cold vs warm library startup.
+# Fills a temporary database with synthetic symbols, then runs the window
+# controller's load_initial_data() once without and once with the warm-start
+# snapshot, printing its built-in startup report.
+#
+# Usage:
+#     python scripts/benchmarks/bench_startup.py [--symbols 20000]
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark cold vs warm library startup.")
+    parser.add_argument("--symbols", type=int, default=20_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["XDG_CACHE_HOME"] = str(Path(tmp_dir) / "cache")
+        from openiso.controller.db import SkeyDB
+        from openiso.model.skey import SkeyData
+        from openiso.view.main_window.window_controller import WindowController
+
+        data_path = Path(tmp_dir) / "data"
+        (data_path / "database").mkdir(parents=True)
+        db = SkeyDB(str(data_path / "database" / "openiso.db"))
+        groups = [("valves", "gate"), ("flanges", "blind"), ("instruments", "gauge")]
+        db.bulk_upsert_skeys(
+            SkeyData(
+                name=f"S{index:06d}",
+                group_key=groups[index % len(groups)][0],
+                subgroup_key=groups[index % len(groups)][1],
+                geometry=[f"Line: x1=0 y1=0 x2={index % 50} y2=1"] * 4,
+            )
+            for index in range(args.symbols)
+        )
+        db.close()
+
+        reports = []
+        for _ in ("cold", "warm"):
+            controller = WindowController(str(data_path), use_db=True)
+            controller.load_initial_data()
+            reports.append(controller.format_startup_report())
+            controller.close()
+        print("\n".join(reports))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,13 @@
 # SPDX-License-Identifier: MIT
 
+import io
 import json
 from pathlib import Path
 
 import pytest
 
 import openiso.core.i18n as i18n
+from openiso.controller.catalog_reader import catalog_payload_hash, iter_catalog_symbols, prepare_catalog_entries
 from openiso.controller.services import SkeyService
 
 
@@ -425,3 +427,87 @@ def test_resolve_conflict_keep_local_acknowledges_upstream(tmp_path, monkeypatch
     assert skey.sync_state == "synced"
     assert skey.last_synced_upstream_version == 2
     assert "x2=9" in skey.geometry[0]
+
+
+def test_catalog_resync_skips_unchanged_symbols(tmp_path, monkeypatch):
+    data_path = _make_data_path(tmp_path)
+    monkeypatch.setattr(i18n, "save_json_translation", lambda *args, **kwargs: None)
+    payload = {
+        "skey_group": "Valves",
+        "subgroup": "Gate",
+        "description": "Gate valve",
+        "symbol_version": 1,
+        "orientation": 0,
+        "flow_arrow": 1,
+        "dimensioned": 1,
+        "geometry": ["Line: x1=0 y1=0 x2=1 y2=1"],
+    }
+    _write_catalog(data_path, {"ABCD": payload, "EFGH": payload})
+
+    service = SkeyService(data_path=str(data_path), use_db=True)
+    assert service.sync_official_catalog("1.0.0")["inserted"] == 2
+    assert service.sync_official_catalog("1.0.0")["reason"] == "already_synced"
+
+    result = service.sync_official_catalog("1.0.0", force=True)
+    assert result["unchanged"] == 2
+    assert result["inserted"] == result["updated"] == 0
+    assert set(result["timings"]) == {"load", "hash", "prefetch", "write", "refresh", "total"}
+
+    result = service.sync_official_catalog("1.1.0")
+    assert result["unchanged"] == 2
+    assert len(service.get_skey_history("ABCD")) == 1
+
+    skey = service.get_skey("ABCD")
+    assert skey.upstream_release_version == "1.1.0"
+    assert skey.sync_state == "synced"
+
+
+def test_catalog_reader_streams_bundled_and_canonical_layouts():
+    bundled = {"ABCD": {"skey_group": "Valves", "geometry": ["Line: x1=0 y1=0 x2=1 y2=1"]}, "EFGH": {"n": 12345}}
+    assert list(iter_catalog_symbols(io.StringIO(json.dumps(bundled)), chunk_size=3)) == list(bundled.items())
+    assert list(iter_catalog_symbols(io.StringIO("{}"))) == []
+
+    canonical = json.loads((Path(__file__).parent.parent / "docs" / "roadmap" / "canonical-symbols-v1.example.json").read_text())
+    symbols = list(iter_catalog_symbols(io.StringIO(json.dumps(canonical, indent=2)), chunk_size=7))
+
+    assert [code for code, _ in symbols] == [symbol["symbol_code"] for symbol in canonical["symbols"]]
+    code, payload = symbols[0]
+    assert payload["skey_group"] == "valves"
+    assert payload["symbol_version"] == 7
+    assert payload["flow_arrow"] == 1
+    assert payload["geometry"][0] == "ArrivePoint: x0=-22.5 y0=17.625"
+    assert "Line: x1=-22.5 y1=17.625 x2=-15.0 y2=17.625" in payload["geometry"]
+
+    with pytest.raises(ValueError):
+        list(iter_catalog_symbols(io.StringIO('{"ABCD": {"geometry": [')))
+
+
+def test_catalog_sync_reads_canonical_document(tmp_path, monkeypatch):
+    data_path = _make_data_path(tmp_path)
+    monkeypatch.setattr(i18n, "save_json_translation", lambda *args, **kwargs: None)
+    example = Path(__file__).parent.parent / "docs" / "roadmap" / "canonical-symbols-v1.example.json"
+    (data_path / "settings" / "OpenIso.json").write_text(example.read_text(encoding="utf-8"), encoding="utf-8")
+
+    service = SkeyService(data_path=str(data_path), use_db=True)
+    result = service.sync_official_catalog("0.8.0")
+
+    assert result["inserted"] == 1
+    skey = service.get_skey("VAVW")
+    assert skey.group_key == "valves"
+    assert skey.upstream_symbol_version == 7
+    assert skey.geometry[0].startswith("ArrivePoint:")
+
+
+def test_prepare_catalog_entries_matches_on_worker_processes():
+    raw = ["1", 0.0, 1000.0, "2", 1000.0, 1000.0, "0", 0.0, 0.0]
+    entries = [(f"S{index:03d}", {"geometry": raw, "n": index}, 1, None) for index in range(25)]
+    stored_hash = catalog_payload_hash(entries[3][1])
+    entries[3] = entries[3][:3] + (stored_hash,)
+
+    serial = list(prepare_catalog_entries(iter(entries), workers=0, chunk_size=4))
+    parallel = list(prepare_catalog_entries(iter(entries), workers=2, chunk_size=4))
+
+    assert parallel == serial
+    assert [entry[0] for entry in serial] == [entry[0] for entry in entries]
+    assert serial[3][3] == stored_hash and serial[3][4] is None
+    assert any(item.startswith("Line:") for item in serial[0][4])
@@ -1,6 +1,8 @@
 # SPDX-License-Identifier: MIT
 
 import sqlite3
+import threading
+from contextlib import closing
 
 import pytest
 
@@ -113,3 +115,479 @@ def test_update_skey_creates_new_geometry_transaction(tmp_path):
 
     assert loaded.name == "TEE01"
     assert loaded.geometry == ["Line: x1=2 y1=2 x2=3 y2=3"]
+
+
+def test_get_all_skeys_bulk_loads_latest_geometry_per_skey(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("fittings", "tees")
+
+    for name in ("TEE01", "TEE02", "TEE03"):
+        db.insert_skey(
+            SkeyData(name=name, group_key="fittings", subgroup_key="tees", geometry=[f"Line: x1=0 y1=0 x2=1 y2=1 {name}"]),
+            user="test",
+        )
+    db.update_skey(
+        SkeyData(
+            name="TEE02",
+            group_key="fittings",
+            subgroup_key="tees",
+            geometry=["ArrivePoint: x0=0 y0=0", "Line: x1=0 y1=0 x2=2 y2=2"],
+        ),
+        user="test",
+    )
+    db.update_skey(SkeyData(name="TEE03", group_key="fittings", subgroup_key="tees", geometry=[]), user="test")
+
+    loaded = {skey.name: skey.geometry for skey in db.get_all_skeys()}
+
+    assert loaded == {
+        "TEE01": ["Line: x1=0 y1=0 x2=1 y2=1 TEE01"],
+        "TEE02": ["ArrivePoint: x0=0 y0=0", "Line: x1=0 y1=0 x2=2 y2=2"],
+        "TEE03": ["Line: x1=0 y1=0 x2=1 y2=1 TEE03"],
+    }
+
+
+def test_bulk_upsert_skeys_creates_groups_and_revisions_in_one_pass(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("fittings", "tees")
+    db.insert_skey(
+        SkeyData(name="TEE01", group_key="fittings", subgroup_key="tees", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]),
+        user="test",
+    )
+
+    written = db.bulk_upsert_skeys(
+        [
+            SkeyData(name="TEE01", group_key="fittings", subgroup_key="tees", geometry=["Line: x1=5 y1=5 x2=6 y2=6"]),
+            SkeyData(name="VAGA", group_key="valves", subgroup_key="gate", geometry=["ArrivePoint: x0=0 y0=0"],
+                     source_name="Test Company", source_type="company"),
+        ],
+        user="test",
+    )
+
+    loaded = {skey.name: skey for skey in db.get_all_skeys()}
+    conn = sqlite3.connect(db.db_path)
+    revisions = conn.execute(
+        "SELECT COUNT(*) FROM transactions t JOIN skeys s ON s.id = t.skey_id WHERE s.name = 'TEE01'"
+    ).fetchone()[0]
+    conn.close()
+
+    assert written == 2
+    assert revisions == 2
+    assert loaded["TEE01"].geometry == ["Line: x1=5 y1=5 x2=6 y2=6"]
+    assert loaded["VAGA"].source_name == "Test Company"
+    assert db.get_subgroups_by_group("valves") == ["gate"]
+
+
+def test_packed_geometry_storage_round_trips_history_and_new_revisions(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    first = ["ArrivePoint: x0=-0.5 y0=0.0", "Line: x1=-0.0 y1=0.25 x2=0.125 y2=1e-05"]
+    db.insert_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=first))
+
+    assert db.set_geometry_storage("packed") == 1
+    assert db.get_all_skeys()[0].geometry == first
+
+    second = ["SpindlePoint: x0=0.3 y0=1.1 name=03SP", "Line: x1=0.1 y1=0.2 x2=0.3 y2=0.4"]
+    db.update_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=second))
+    conn = sqlite3.connect(db.db_path)
+    text_rows = conn.execute("SELECT COUNT(*) FROM geometry").fetchone()[0]
+    blob_rows = conn.execute("SELECT COUNT(*) FROM geometry_blobs").fetchone()[0]
+    conn.close()
+
+    assert (text_rows, blob_rows) == (0, 2)
+    assert db.get_geometry_storage() == "packed"
+    assert db.get_latest_geometry_for_skey(1) == second
+
+    assert db.set_geometry_storage("text") == 2
+    assert db.get_all_skeys()[0].geometry == second
+    with pytest.raises(ValueError):
+        db.set_geometry_storage("zip")
+
+
+def test_connection_is_reused_per_thread_and_configured_once(tmp_path):
+    import threading
+
+    db = _new_db(tmp_path)
+    conn = db._connection()
+
+    assert db._connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+
+    other_thread_conn = []
+    worker = threading.Thread(target=lambda: other_thread_conn.append(db._connection()))
+    worker.start()
+    worker.join()
+
+    assert other_thread_conn[0] is not conn
+    db.close()
+
+
+def test_transaction_groups_operations_and_rolls_back_on_error(tmp_path):
+    db = _new_db(tmp_path)
+
+    with db.transaction():
+        db.ensure_subgroup_exists("valves", "gate")
+        db.set_metadata("release", "1.0.0")
+
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.ensure_subgroup_exists("flanges", "blind")
+            db.set_metadata("release", "2.0.0")
+            raise RuntimeError("abort")
+
+    assert db.get_metadata("release") == "1.0.0"
+    assert db.get_all_groups() == ["valves"]
+
+
+def test_legacy_database_is_migrated_once_and_stamped(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        """
+        CREATE TABLE skeys (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            skey_group_key TEXT NOT NULL,
+            skey_subgroup_key TEXT NOT NULL,
+            skey_description_key TEXT,
+            spindle_skey TEXT,
+            orientation INTEGER NOT NULL DEFAULT 0,
+            flow_arrow INTEGER NOT NULL DEFAULT 0,
+            dimensioned INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE spindles (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE);
+        CREATE TABLE geometry (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, skey_id INTEGER NOT NULL, type TEXT NOT NULL,
+            data TEXT NOT NULL, transaction_id INTEGER NOT NULL
+        );
+        INSERT INTO skeys (name, skey_group_key, skey_subgroup_key) VALUES ('OLD1', 'valves', 'gate');
+        INSERT INTO geometry (skey_id, type, data, transaction_id) VALUES (1, 'Line', 'Line: x1=0 y1=0 x2=1 y2=1', 1);
+        """
+    )
+    conn.close()
+
+    db = SkeyDB(str(db_path))
+    loaded = db.get_all_skeys()
+
+    assert db._connection().execute("PRAGMA user_version").fetchone()[0] >= 1
+    assert [skey.name for skey in loaded] == ["OLD1"]
+    assert loaded[0].tracing == 0
+    assert loaded[0].origin_type == "official"
+    assert loaded[0].geometry == ["Line: x1=0 y1=0 x2=1 y2=1"]
+
+
+def test_v6_database_gains_history_indexes(tmp_path):
+    db = _new_db(tmp_path)
+    db.close()
+    with closing(sqlite3.connect(db.db_path)) as conn:
+        conn.executescript(
+            """
+            DROP INDEX idx_geometry_skey_txn;
+            DROP INDEX idx_transactions_skey;
+            DROP INDEX idx_spindle_geometry_spindle_txn;
+            PRAGMA user_version = 6;
+            """
+        )
+
+    migrated = SkeyDB(db.db_path)
+    indexes = {
+        row[0] for row in migrated._connection().execute("SELECT name FROM sqlite_master WHERE type='index'")
+    }
+
+    assert {"idx_geometry_skey_txn", "idx_transactions_skey", "idx_spindle_geometry_spindle_txn"} <= indexes
+    migrated.close()
+
+
+def test_v1_database_backfills_current_transaction_pointer(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    db.insert_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]))
+    db.update_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=["Line: x1=4 y1=4 x2=5 y2=5"]))
+    db.update_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=[]))
+    db.insert_spindle(SkeyData(name="SP01", group_key="valves", subgroup_key="gate", geometry=["Circle: x0=0 y0=0 r=1"]))
+    db.close()
+
+    conn = sqlite3.connect(db.db_path)
+    conn.executescript(
+        """
+        UPDATE skeys SET current_transaction_id = NULL;
+        UPDATE spindles SET current_transaction_id = NULL;
+        PRAGMA user_version = 1;
+        """
+    )
+    conn.close()
+
+    migrated = SkeyDB(db.db_path)
+
+    assert migrated._connection().execute("PRAGMA user_version").fetchone()[0] >= 2
+    assert migrated.get_all_skeys()[0].geometry == ["Line: x1=4 y1=4 x2=5 y2=5"]
+    assert migrated.get_latest_geometry_for_skey(1) == ["Line: x1=4 y1=4 x2=5 y2=5"]
+    assert migrated.get_spindle_geometry("SP01") == ["Circle: x0=0 y0=0 r=1"]
+
+
+def test_opening_and_loading_current_schema_does_no_introspection(tmp_path, monkeypatch):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    db.insert_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]))
+    db.close()
+
+    statements = []
+    original_connect = SkeyDB.connect
+
+    def traced_connect(self):
+        conn = original_connect(self)
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    monkeypatch.setattr(SkeyDB, "connect", traced_connect)
+    reopened = SkeyDB(db.db_path)
+
+    assert [skey.name for skey in reopened.get_all_skeys()] == ["VAL01"]
+
+    traced = " ".join(statements)
+    assert "table_info" not in traced
+    assert "sqlite_master" not in traced
+    assert "ALTER TABLE" not in traced
+
+
+def test_compact_history_deduplicates_prunes_and_keeps_current_revision(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    geometries = [
+        ["Line: x1=0 y1=0 x2=1 y2=1"],
+        ["Line: x1=0 y1=0 x2=1 y2=1"],
+        ["Line: x1=0 y1=0 x2=2 y2=2"],
+        ["Line: x1=0 y1=0 x2=3 y2=3"],
+        ["Line: x1=0 y1=0 x2=3 y2=3"],
+    ]
+    for geometry in geometries:
+        db.update_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=geometry))
+
+    report = db.compact_history(keep_last=2)
+
+    conn = sqlite3.connect(db.db_path)
+    transactions = conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+    snapshots = conn.execute("SELECT COUNT(DISTINCT transaction_id) FROM geometry").fetchone()[0]
+    conn.close()
+
+    assert report.revisions_deduplicated == 2
+    assert report.revisions_pruned == 3
+    # The newest transaction survives as an audit row pointing back to the identical snapshot before it.
+    assert transactions == 2
+    assert snapshots == 1
+    assert db.get_all_skeys()[0].geometry == ["Line: x1=0 y1=0 x2=3 y2=3"]
+
+
+@pytest.mark.parametrize("passes", [[{"keep_last": 5}], [{}, {"keep_last": 5}], [{}, {"keep_last": 2}]])
+def test_compact_history_keeps_geometry_of_audit_rows_whose_source_is_pruned(tmp_path, passes):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    for x in (1, 1, 2, 2, 2, 3, 3, 4, 4, 4, 4):
+        db.update_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate",
+                                geometry=[f"Line: x1=0 y1=0 x2={x} y2={x}"]))
+    expected = {
+        entry["transaction_id"]: list(db.get_skey_at("VAL01", entry["transaction_id"]).geometry)
+        for entry in db.get_skey_history("VAL01")
+    }
+
+    for options in passes:
+        db.compact_history(**options)
+
+    kept = [entry["transaction_id"] for entry in db.get_skey_history("VAL01")]
+    keep_last = passes[-1]["keep_last"]
+    # The current revision (the first of the trailing duplicates) survives even beyond keep_last.
+    assert kept[:keep_last] == sorted(expected, reverse=True)[:keep_last]
+    assert len(kept) < len(expected)
+    for transaction_id in kept:
+        assert list(db.get_skey_at("VAL01", transaction_id).geometry) == expected[transaction_id]
+    assert db.get_all_skeys()[0].geometry == ["Line: x1=0 y1=0 x2=4 y2=4"]
+
+
+def test_compact_history_refuses_to_drop_revisions_it_cannot_decode(tmp_path, capsys):
+    from openiso.controller import maintenance
+
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    for index in range(3):
+        db.update_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate",
+                                geometry=[f"Line: x1=0 y1=0 x2={index} y2={index}"]))
+    db.close()
+    with closing(sqlite3.connect(db.db_path)) as conn:
+        conn.execute("UPDATE geometry_deltas SET base_transaction_id = 999 WHERE transaction_id = 2")
+        conn.commit()
+        before = conn.execute("SELECT COUNT(*) FROM geometry_deltas").fetchone()[0]
+
+    reopened = SkeyDB(db.db_path)
+    with pytest.raises(sqlite3.DatabaseError):
+        reopened.compact_history()
+    reopened.close()
+    assert maintenance.main(["compact", "--db", db.db_path]) == 1
+    assert "history left unchanged" in capsys.readouterr().err
+
+    with closing(sqlite3.connect(db.db_path)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM geometry_deltas").fetchone()[0] == before
+        assert conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0] == 3
+
+
+def test_maintenance_compact_command_refuses_missing_database(tmp_path, capsys, monkeypatch):
+    from openiso.controller import maintenance
+
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    missing = tmp_path / "typo" / "openiso.db"
+
+    assert maintenance.main(["compact", "--db", str(missing), "--keep-last", "3"]) == 1
+    assert "no database file" in capsys.readouterr().err
+    assert not missing.parent.exists()
+    assert not (tmp_path / "home").exists()
+
+
+def test_maintenance_compact_command_runs_headless(tmp_path, capsys):
+    from openiso.controller import maintenance
+
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    for _ in range(3):
+        db.update_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]))
+    db.close()
+
+    assert maintenance.main(["compact", "--db", db.db_path, "--keep-last", "1", "--older-than-days", "0"]) == 0
+    output = capsys.readouterr().out
+
+    assert "Deduplicated revisions: 2" in output
+    assert "reclaimed" in output
+
+
+@pytest.mark.parametrize("storage", ["text", "packed"])
+def test_revisions_are_stored_as_deltas_and_rebuilt_at_any_transaction(tmp_path, storage):
+    from openiso.controller.db import KEYFRAME_INTERVAL
+
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    if storage == "packed":
+        db.set_geometry_storage("packed")
+
+    geometry = [f"Line: x1=0 y1={index} x2=1 y2={index}" for index in range(10)]
+    written = []
+    for revision in range(2 * KEYFRAME_INTERVAL + 3):
+        geometry = list(geometry)
+        geometry[revision % len(geometry)] = f"Line: x1={revision} y1=0 x2=1 y2=1"
+        if revision % 5 == 0:
+            geometry.append(f"TeePoint: x0={revision} y0=0")
+        db.update_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=geometry))
+        written.append(geometry)
+
+    history = list(reversed(db.get_skey_history("VAL01")))
+    conn = sqlite3.connect(db.db_path)
+    full_snapshots = conn.execute(
+        "SELECT COUNT(DISTINCT transaction_id) FROM geometry"
+    ).fetchone()[0] + conn.execute("SELECT COUNT(*) FROM geometry_blobs").fetchone()[0]
+    deltas = conn.execute("SELECT COUNT(*) FROM geometry_deltas").fetchone()[0]
+    conn.close()
+
+    assert [entry["action"] for entry in history[:2]] == ["create", "edit"]
+    assert full_snapshots == 4  # three keyframes plus the head
+    assert deltas == len(written) - 3
+    for entry, expected in zip(history, written):
+        assert db.get_skey_at("VAL01", entry["transaction_id"]).geometry == expected
+    assert db.get_skey_at("VAL01", 10_000) is None
+    assert db.get_skey_at("MISSING", history[0]["transaction_id"]) is None
+
+
+def test_rollback_skey_restores_old_geometry_as_new_revision(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    db.insert_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]))
+    first_txn = db.get_skey_history("VAL01")[0]["transaction_id"]
+    for index in range(3):
+        db.update_skey(
+            SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=[f"Line: x1={index} y1=5 x2=6 y2=6"])
+        )
+
+    new_txn = db.rollback_skey("VAL01", first_txn, user="test")
+
+    history = db.get_skey_history("VAL01")
+    assert history[0]["transaction_id"] == new_txn
+    assert history[0]["action"] == "rollback"
+    assert len(history) == 5
+    assert db.get_all_skeys()[0].geometry == ["Line: x1=0 y1=0 x2=1 y2=1"]
+    assert db.get_skey_at("VAL01", history[1]["transaction_id"]).geometry == ["Line: x1=2 y1=5 x2=6 y2=6"]
+    assert db.rollback_skey("VAL01", 10_000) is None
+
+
+def test_search_skeys_ranks_prefix_matches_and_follows_triggers(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("flanges", "weld_neck_flange")
+    db.ensure_subgroup_exists("valves", "gate")
+    db.insert_skey(SkeyData(name="FLWN", group_key="flanges", subgroup_key="weld_neck_flange", pcf_identification="FLANGE"))
+    db.insert_skey(SkeyData(name="VTFL", group_key="valves", subgroup_key="gate", idf_record="100"))
+    db.insert_skey(SkeyData(name="01SP", group_key="valves", subgroup_key="gate"))
+
+    assert db.has_search_index()
+    assert db.search_skeys("fl") == ["FLWN", "VTFL"]
+    assert db.search_skeys("sp") == ["01SP"]
+    assert db.search_skeys("weld flange") == ["FLWN"]
+    assert db.search_skeys("gate", limit=1) == ["01SP"]
+    assert sorted(db.search_skeys("gate", limit=None)) == ["01SP", "VTFL"]
+    assert db.search_skeys("  ") == []
+
+    assert db.set_skey_translations("ru", {"FLWN": "Фланец приварной", "VTFL": "Задвижка"}) == 2
+    assert db.set_skey_translations("ru", {"FLWN": "Фланец приварной", "VTFL": "Задвижка"}) == 0
+    assert db.search_skeys("фланец") == ["FLWN"]
+
+    db.update_skey(SkeyData(name="VTFL", group_key="valves", subgroup_key="gate", pcf_identification="CHECK"))
+    assert db.search_skeys("check") == ["VTFL"]
+    assert db.search_skeys("задвижка") == ["VTFL"]
+    db.delete_skey("FLWN")
+    assert db.search_skeys("фланец") == []
+
+
+def test_search_skeys_falls_back_to_substring_match_without_index(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    db.insert_skey(SkeyData(name="01SP", group_key="valves", subgroup_key="gate"))
+    db.set_skey_translations("ru", {"01SP": "Шпиндель"})
+    with closing(db.connect()) as conn:
+        conn.execute("DROP TABLE skeys_fts")
+    db._search_index = None
+
+    assert not db.has_search_index()
+    assert db.search_skeys("sp gate") == ["01SP"]
+    assert db.search_skeys("шпиндель") == ["01SP"]
+    assert db.search_skeys("ball") == []
+
+
+def test_change_log_records_skey_inserts_updates_renames_and_deletes(tmp_path):
+    db = _new_db(tmp_path)
+    db.ensure_subgroup_exists("valves", "gate")
+    start = db.latest_change_seq()
+    token = db.change_token()
+    assert db.change_token() == token
+
+    skey_id = db.insert_skey(SkeyData(name="VAL01", group_key="valves", subgroup_key="gate", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]))
+    assert db.change_token() != token
+    token = db.change_token()
+    other_thread = []
+    worker = threading.Thread(target=lambda: other_thread.append(db.change_token()))
+    worker.start()
+    worker.join()
+    assert other_thread == [token]
+    with closing(db.connect()) as conn:
+        conn.execute("UPDATE skeys SET name = 'VAL02' WHERE id = ?", (skey_id,))
+    db.delete_skey("VAL02")
+
+    latest, changes = db.get_changes_since(start)
+    assert latest == changes[-1][0]
+    assert [(name, op) for _, _, name, op in changes] == [
+        ("VAL01", "insert"),
+        ("VAL01", "update"),  # current_transaction_id of the first revision
+        ("VAL01", "delete"),
+        ("VAL02", "update"),
+        ("VAL02", "delete"),
+    ]
+    assert db.get_changes_since(latest) == (latest, [])
+
+    db.compact_history()
+    assert db.get_changes_since(start) is None
+    assert db.get_changes_since(latest - 1) == (latest, [changes[-1]])
@@ -0,0 +1,135 @@
+# SPDX-License-Identifier: MIT
+
+import json
+import time
+
+import pytest
+
+import openiso.core.i18n as i18n
+from openiso.core.i18n import TranslationStore
+
+
+pytestmark = pytest.mark.unit
+
+
+def test_translation_store_writes_once_per_batch_and_skips_unchanged(tmp_path):
+    (tmp_path / "en.json").write_text(json.dumps({"valves": "Valves"}), encoding="utf-8")
+    store = TranslationStore(str(tmp_path), flush_delay=60)
+
+    with store.batch():
+        for index in range(50):
+            store.set(f"valves.gate.v{index}", f"V{index}", "en")
+        store.set("valves.gate._name", "Gate", "en")
+        assert store.files_written == 0
+
+    assert store.files_written == 1
+    data = json.loads((tmp_path / "en.json").read_text(encoding="utf-8"))
+    assert data["valves"]["_name"] == "Valves"
+    assert data["valves"]["gate"]["v49"] == "V49"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["en.json"]
+
+    with store.batch():
+        assert store.set("valves.gate.v1", "V1", "en") is False
+    assert store.files_written == 1
+
+
+def test_translation_store_debounces_writes_outside_batch(tmp_path):
+    store = TranslationStore(str(tmp_path), flush_delay=0.05)
+
+    store.set("flanges._name", "Flanges", "ru")
+    store.set("flanges.weld._name", "Weld", "ru")
+    assert not (tmp_path / "ru.json").exists()
+
+    deadline = time.monotonic() + 5
+    while store.files_written == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert store.files_written == 1
+    assert json.loads((tmp_path / "ru.json").read_text(encoding="utf-8")) == {
+        "flanges": {"_name": "Flanges", "weld": {"_name": "Weld"}}
+    }
+    assert store.flush() == 0
+
+
+def _nested_lookup(tree, key):
+    """Reference nested walk that _t's flat index must reproduce."""
+    parts = key.split('.')
+    curr = tree
+    for part in parts:
+        if isinstance(curr, dict) and part.lower() in curr:
+            curr = curr[part.lower()]
+        else:
+            return ("missing", key)
+    if isinstance(curr, str):
+        return curr
+    if isinstance(curr, dict) and "_name" in curr:
+        return curr["_name"]
+    return parts[-1]
+
+
+def test_translation_index_matches_nested_lookup(monkeypatch):
+    tree = {
+        "valves": {"_name": "Valves", "gate": {"vavw": {"description": "Gate valve"}, "Upper": "skipped"}},
+        "flanges": "Flanges",
+        "count": 3,
+        "a.b": "dotted",
+    }
+    monkeypatch.setattr(i18n, "_json_trans", tree)
+    monkeypatch.setattr(i18n, "_json_index", i18n.build_translation_index(tree))
+    monkeypatch.setattr(i18n, "_gettext", lambda key: ("missing", key))
+
+    keys = [
+        "valves", "VALVES._name", "valves.gate", "valves.Gate.VAVW", "valves.gate.vavw.description",
+        "valves.gate.upper", "valves.gate.Upper", "flanges", "flanges.weld", "count", "a.b", "unknown.key",
+    ]
+    assert [i18n._t(key) for key in keys] == [_nested_lookup(tree, key) for key in keys]
+    assert i18n._t("") == ""
+
+
+def test_translation_store_updates_index_of_current_language(tmp_path, monkeypatch):
+    store = TranslationStore(str(tmp_path), flush_delay=60)
+    tree = store.tree("en")
+    tree.update({"valves": "Valves"})
+    monkeypatch.setattr(i18n, "_json_trans", tree)
+    monkeypatch.setattr(i18n, "_json_index", i18n.build_translation_index(tree))
+    monkeypatch.setattr(i18n, "_gettext", lambda key: key)
+
+    with store.batch():
+        store.set("valves.gate.vavw", "VAVW", "en")
+        store.set("valves.gate.vavw.description", "Gate valve", "en")
+        store.set("valves.gate._name", "Gate", "en")
+        store.set("pipes._name", "Pipes", "ru")
+
+    assert i18n._json_index == i18n.build_translation_index(tree)
+    assert i18n._t("Valves") == "Valves"
+    assert i18n._t("valves.gate") == "Gate"
+    assert i18n._t("valves.gate.VAVW") == "VAVW"
+    assert i18n._t("valves.gate.vavw.description") == "Gate valve"
+
+
+def test_po_catalog_is_parsed_in_process_and_cached_by_mtime(tmp_path, monkeypatch):
+    (tmp_path / "xx.po").write_text(
+        'msgid ""\nmsgstr "Language: xx\\n"\n\n'
+        '#: openiso/view/menu_toolbar.py:83\nmsgid "About"\nmsgstr "O programme"\n\n'
+        'msgid "Long"\nmsgstr ""\n"first "\n"second"\n\n'
+        '#, fuzzy\nmsgid "Draft"\nmsgstr "Chernovik"\n\n'
+        'msgctxt "menu"\nmsgid "File"\nmsgstr "Fail"\n\n'
+        'msgid "Untranslated"\nmsgstr ""\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(i18n, "LOCALEDIR", str(tmp_path))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    parsed = []
+    load_po_catalog = i18n.load_po_catalog
+    monkeypatch.setattr(i18n, "load_po_catalog", lambda path: parsed.append(path) or load_po_catalog(path))
+
+    translator = i18n.get_translator("xx")
+    assert translator.gettext("About") == "O programme"
+    assert translator.gettext("Long") == "first second"
+    assert translator.gettext("Draft") == "Draft"
+    assert translator.gettext("Untranslated") == "Untranslated"
+    assert translator.pgettext("menu", "File") == "Fail"
+
+    assert i18n.get_translator("xx").gettext("About") == "O programme"
+    assert len(parsed) == 1
+    assert (tmp_path / "cache" / "openiso" / "translations" / "xx.json").exists()
@@ -0,0 +1,54 @@
+# SPDX-License-Identifier: MIT
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+pytestmark = pytest.mark.smoke
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules whose import must stay lazy; `python -X importtime` timings are only reported,
+# since wall-clock budgets are not stable across machines.
+LAZY_MODULES = ("openiso", "openiso.model")
+
+
+def _import_profile(module: str) -> tuple[int, set]:
+    """Import module in a fresh interpreter; return its cumulative import time and loaded modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = None
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            cumulative = int(fields[1])
+    assert cumulative is not None, result.stderr
+    return cumulative, set(result.stdout.split())
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_package_import_is_lazy(module):
+    cumulative, loaded = _import_profile(module)
+    print(f"import {module}: {cumulative / 1000:.1f} ms cumulative")
+
+    heavy = {"sqlite3", "PyQt6", "openiso.controller.services", "openiso.core.i18n", "openiso.model.geometry"}
+    assert not heavy & loaded
+
+
+def test_lazy_package_attributes_resolve():
+    import openiso
+
+    assert set(openiso.__all__) <= set(dir(openiso))
+    for name in openiso.__all__:
+        assert getattr(openiso, name) is not None
+    assert openiso.SkeyData.__module__ == "openiso.model.skey"
+    with pytest.raises(AttributeError):
+        openiso.NotAnExport
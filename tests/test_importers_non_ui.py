@@ -4,7 +4,17 @@ from pathlib import Path
 
 import pytest
 
-from openiso.controller.importers import ASCIISkeyImporter, SkeyImporterFactory
+import math
+from array import array
+
+from openiso.controller.importers import (
+    ASCIISkeyImporter,
+    IDFSkeyImporter,
+    SkeyImporterFactory,
+    decode_502_record,
+    decode_502_records,
+)
+from openiso.model.geometry import GeometryConverter
 
 
 pytestmark = pytest.mark.integration
@@ -32,3 +42,104 @@ def test_importer_factory_chooses_by_extension_and_handles_missing_file(tmp_path
     assert result.success is False
     assert result.skeys == {}
     assert len(result.errors) == 1
+
+
+ASCII_SYMBOLS = [
+    " 501       01SP           100       0       0       0       0       0       0       0       0       0\n",
+    " 502         1       0     200       2     400     200       1     400     400       2     400       0       0\n",
+    " 501       02SP           100       0       0       0       0       0       0       0       0       0\n",
+    " 502         1       0     129       2     400     129       0       0       0       0       0       0       0\n",
+    "! 501      XX             100       3       0       0       0       0       0       0       0       0\n",
+]
+
+
+def test_iter_skeys_yields_each_skey_once_its_next_501_is_read():
+    lines_read = []
+
+    def lines():
+        for line in ASCII_SYMBOLS:
+            lines_read.append(line)
+            yield line
+
+    skeys = ASCIISkeyImporter().iter_skeys(lines())
+
+    first = next(skeys)
+    assert first.name == "01SP"
+    assert len(lines_read) == 3
+    assert first.geometry and all(":" in item for item in first.geometry)
+
+    # The last skey is finished at end of file, even after trailing comment lines.
+    last = next(skeys)
+    assert last.name == "02SP"
+    assert last.geometry
+    assert list(skeys) == []
+
+
+def test_idf_iter_skeys_finishes_skey_on_other_records_and_collects_errors():
+    importer = IDFSkeyImporter()
+    rows = [
+        " 501 " + "01SP,,".ljust(25) + "    100       0       0\n",
+        " 502         1       0     200       2     400     200       1     400     400       2     400       0       0\n",
+        " 800\n",
+        " 502         1       0     bad\n",
+        " 501 " + "02SP".ljust(25) + "    bad\n",
+    ]
+
+    skeys = list(importer.iter_skeys(rows))
+
+    assert [skey.name for skey in skeys] == ["01SP"]
+    assert skeys[0].geometry
+    assert importer.errors == [
+        "Line 4: Failed to parse 502 record: could not convert string to float: 'bad'",
+        "Line 5: Failed to parse 501 record: invalid literal for int() with base 10: 'bad'",
+    ]
+
+
+def test_decode_502_records_matches_fixed_width_columns():
+    rows = [row for row in ASCII_SYMBOLS if row.startswith(" 502")]
+    # Touching fields cannot be split on blanks: the block is decoded by columns.
+    touching = " 502         7       0     200       2 1234567     200       1     400     400       2     400       0       0\n"
+
+    for block in (rows, rows + [touching]):
+        expected = array('d')
+        for row in block:
+            decode_502_record(row, expected)
+        decoded = decode_502_records(block)
+        assert [value for value in decoded if not math.isnan(value)] == [value for value in expected if not math.isnan(value)]
+        assert [math.isnan(value) for value in decoded] == [math.isnan(value) for value in expected]
+
+    assert decode_502_records(rows)[:6].tolist() == [1.0, 0.0, 200.0, 2.0, 400.0, 200.0]
+    assert math.isnan(decode_502_records([touching])[0])
+    assert decode_502_records([touching])[4] == 1234567.0
+
+    converter = GeometryConverter()
+    legacy = ["1", 0.0, 200.0, "2", 400.0, 200.0, "1", 400.0, 400.0, "2", 400.0, 0.0, "7", "", ""]
+    assert converter.convert_graphics("01SP", decode_502_records(rows[:1])) == converter.convert_graphics("01SP", legacy[:12])
+    assert converter.convert_graphics("VAVW", legacy) == converter.convert_graphics("VAVW", legacy[:12])
+
+
+def test_parallel_import_matches_sequential_import_with_line_numbers(tmp_path):
+    rows = Path("data/settings/IsoAlgo.skey").read_text(encoding="utf-8").splitlines(keepends=True)
+    rows.insert(400, " 502         1       0     bad\n")
+    symbols = tmp_path / "symbols.skey"
+    symbols.write_text("".join(rows), encoding="utf-8")
+
+    importer = ASCIISkeyImporter()
+    ranges = importer.scan_skey_ranges(str(symbols), range_bytes=4096)
+    assert len(ranges) > 4
+    assert ranges[0][0] == 0 and ranges[-1][1] == symbols.stat().st_size
+    for (start, end, first_line), (next_start, _, next_line) in zip(ranges, ranges[1:]):
+        assert end == next_start
+        assert rows[next_line - 1].startswith(" 501")
+        assert next_line - first_line == "".join(rows).encode()[start:end].count(b"\n")
+
+    sequential = importer.import_from_file(str(symbols))
+    parallel = ASCIISkeyImporter().import_from_file(str(symbols), workers=2)
+    streamed = ASCIISkeyImporter()
+    names = [skey.name for skey in streamed.iter_file_skeys(str(symbols), workers=2, range_bytes=4096)]
+
+    assert sequential.errors == ["Line 401: Failed to parse 502 record: could not convert string to float: 'bad'"]
+    assert parallel.errors == sequential.errors
+    assert parallel.skeys == sequential.skeys
+    assert streamed.errors == sequential.errors
+    assert names == [skey.name for skey in ASCIISkeyImporter().iter_file_skeys(str(symbols))]
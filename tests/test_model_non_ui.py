@@ -2,7 +2,13 @@
 
 import pytest
 
-from openiso.model.geometry import GeometryConverter, PointGeometry
+import math
+from array import array
+
+from openiso.model.geometry import GeometryConverter, PointGeometry, convert_raw_geometry, raw_geometry_array
+from openiso.model.geometry_delta import apply_geometry_delta, diff_geometry
+from openiso.model.geometry_list import LINE, POLYGON, RAW, SPINDLE_POINT, GeometryList
+from openiso.model.packed_geometry import pack_geometry, unpack_geometry
 from openiso.model.skey import SkeyData
 
 
@@ -60,6 +66,37 @@ def test_geometry_converter_parse_value_and_relative_position():
     assert rel == (0.5, 0.5)
 
 
+def test_convert_graphics_emits_pen_items_from_list_array_and_batch():
+    raw = ["1", 0.0, 200.0, "2", 400.0, 200.0, "3", 200.0, 400.0, "6", 200.0, 0.0, "1", 400.0, 0.0, "0", 0.0, 0.0]
+    converter = GeometryConverter()
+
+    assert converter.convert_graphics("VAVW", raw) == [
+        "ArrivePoint: x0=-10.0 y0=0.0",
+        "Line: x1=-10.0 y1=0.0 x2=10.0 y2=0.0",
+        "TeePoint: x0=0.0 y0=10.0",
+        "SpindlePoint: x0=0.0 y0=-10.0",
+        "LeavePoint: x0=10.0 y0=-10.0",
+    ]
+    assert converter.convert_graphics("VAVW", raw_geometry_array(raw)) == converter.convert_graphics("VAVW", raw)
+    assert converter.convert_graphics_batch([("01SP", raw), ("VAVW", ["7", "x", "y"])]) == [
+        converter.convert_graphics("01SP", raw),
+        [],
+    ]
+    assert "LeavePoint" not in " ".join(converter.convert_graphics("01SP", raw))
+
+    # Scene variant used by the editor: whole raw units / 100 around the true bounds.
+    assert convert_raw_geometry("VAVW", raw, ndigits=0, divisor=100.0, min_extent=-math.inf)[:2] == [
+        "ArrivePoint: x0=-0.1 y0=0.0",
+        "Line: x1=-0.1 y1=0.0 x2=0.1 y2=0.0",
+    ]
+    # Signed zeros print as the former per-point rounding printed them.
+    assert convert_raw_geometry("VAVW", array('d', [1.0, 0.0, 0.0, 2.0, -0.0, -0.0, 2.0, 0.0, 0.0]), 0, 100.0, -math.inf) == [
+        "ArrivePoint: x0=0.0 y0=0.0",
+        "Line: x1=0.0 y1=0.0 x2=-0.0 y2=-0.0",
+        "Line: x1=-0.0 y1=-0.0 x2=0.0 y2=0.0",
+    ]
+
+
 def test_point_geometry_string_roundtrip():
     point = PointGeometry(item_type="ArrivePoint", x=1.2, y=-3.4)
     encoded = point.to_string()
@@ -69,3 +106,66 @@ def test_point_geometry_string_roundtrip():
     assert decoded.item_type == "ArrivePoint"
     assert decoded.x == 1.2
     assert decoded.y == -3.4
+
+
+def test_packed_geometry_is_lossless_and_smaller_than_text():
+    geometry = [
+        "ArrivePoint: x0=-0.5 y0=0.0",
+        "Line: x1=-0.5 y1=0.0 x2=-0.25 y2=0.25",
+        "Line: x1=-0.0 y1=0.123456789 x2=40.0 y2=1e-05",
+        "Rectangle: x0=0.0 y0=0.0 width=0.2 height=0.1",
+        "ArrivePoint: x0=1.0 y0=0.7 type=FL",
+        "Polygon: x1=0 y1=0 x2=1 y2=1",
+    ]
+    blob = pack_geometry(geometry)
+
+    assert unpack_geometry(blob) == geometry
+    assert unpack_geometry(pack_geometry([])) == []
+    assert len(blob) < sum(len(item) for item in geometry)
+    with pytest.raises(ValueError):
+        unpack_geometry(b"XX\x01")
+
+
+def test_geometry_list_roundtrips_strings_and_exposes_typed_columns():
+    items = [
+        "SpindlePoint: x0=0.5 y0=-1.0 name=SPX1 type=FL",
+        "Line: x1=-0.5 y1=0.0 x2=40.0 y2=1e-05",
+        "Line: x1=0 y1=0 x2=1 y2=1",
+        "Polygon: p1x=0.0 p1y=0.0 p2x=1.0 p2y=2.0",
+        "Line: x1=a y1=0 x2=0 y2=0",
+        "Unknown item",
+    ]
+    geometry = GeometryList.from_strings(items)
+
+    assert geometry == items and geometry.to_strings() == items and len(geometry) == 6
+    assert geometry[1:3] == items[1:3] and geometry[-1] == "Unknown item"
+    assert list(geometry.opcodes) == [SPINDLE_POINT, LINE, LINE, POLYGON, RAW, RAW]
+    assert list(geometry.primitives())[0] == (SPINDLE_POINT, (0.5, -1.0), "FL", "SPX1")
+    # Other number spellings keep their text but still expose their values.
+    assert geometry.primitive_coordinates(2) == (0.0, 0.0, 1.0, 1.0)
+    assert geometry.primitive_coordinates(3) == (0.0, 0.0, 1.0, 2.0)
+    assert [geometry.item_type(i) for i in (1, 4, 5)] == ["Line", "Line", "Unknown item"]
+    assert GeometryList.from_strings(geometry) is geometry
+    assert geometry.copy() == items and geometry.copy() is not geometry
+
+    converted = convert_raw_geometry("VAVW", ["1", 0.0, 200.0, "2", 400.0, 200.0])
+    assert isinstance(converted, GeometryList)
+    assert pack_geometry(converted) == pack_geometry(list(converted))
+    assert pack_geometry(geometry) == pack_geometry(items)
+    assert unpack_geometry(pack_geometry(geometry)) == items
+
+    skey = SkeyData(name="VAVW", geometry=list(items))
+    assert skey.geometry_list() is skey.geometry_list() == items
+    assert skey.to_dict()["geometry"] == items and isinstance(skey.to_dict()["geometry"], list)
+
+
+def test_geometry_delta_covers_add_remove_and_modify():
+    base = ["ArrivePoint: x0=0 y0=0", "Line: x1=0 y1=0 x2=1 y2=1", "Line: x1=1 y1=1 x2=2 y2=2", "LeavePoint: x0=2 y0=2"]
+    target = ["ArrivePoint: x0=0 y0=0", "Line: x1=0 y1=0 x2=1 y2=3", "LeavePoint: x0=2 y0=2", "TeePoint: x0=1 y0=1"]
+
+    delta = diff_geometry(base, target)
+
+    assert apply_geometry_delta(base, delta) == target
+    assert diff_geometry(target, target) == []
+    assert apply_geometry_delta([], diff_geometry([], target)) == target
+    assert diff_geometry(GeometryList(base), GeometryList(target)) == delta
@@ -1,11 +1,13 @@
 # SPDX-License-Identifier: MIT
 
+import json
 from pathlib import Path
 
 import pytest
 
 import openiso.core.i18n as i18n
 from openiso.controller.services import SkeyService
+from openiso.model.geometry_list import GeometryList
 
 
 pytestmark = pytest.mark.integration
@@ -71,3 +73,224 @@ def test_service_get_subgroups_reads_db(tmp_path):
     subgroups = service.get_subgroup_names("fittings")
 
     assert subgroups == ["elbows", "tees"]
+
+
+def test_service_rollback_skey_updates_repository(tmp_path):
+    from openiso.model.skey import SkeyData
+
+    data_path = _make_data_path(tmp_path)
+    service = SkeyService(data_path=str(data_path), use_db=True)
+    service._db.ensure_subgroup_exists("valves", "gate")
+    for index in range(3):
+        service._db.update_skey(
+            SkeyData(name="VALT1", group_key="valves", subgroup_key="gate", geometry=[f"Line: x1={index} y1=0 x2=1 y2=1"])
+        )
+    service.load_skeys_from_db()
+    first_txn = service.get_skey_history("VALT1")[-1]["transaction_id"]
+
+    assert service.rollback_skey("VALT1", first_txn) is True
+    assert service.get_skey("VALT1").geometry == ["Line: x1=0 y1=0 x2=1 y2=1"]
+    assert service.rollback_skey("VALT1", 10_000) is False
+
+
+def test_service_search_uses_translations(tmp_path, monkeypatch):
+    from openiso.model.skey import SkeyData
+
+    locale_dir = tmp_path / "po"
+    locale_dir.mkdir()
+    (locale_dir / "ru.json").write_text(
+        json.dumps({"valves": {"_name": "Арматура", "gate": {"_name": "Задвижки", "valt1": {"_name": "VALT1"}}}}),
+        encoding="utf-8",
+    )
+    store = i18n.TranslationStore(str(locale_dir), flush_delay=60)
+    monkeypatch.setattr(i18n, "translation_store", store)
+
+    data_path = _make_data_path(tmp_path)
+    service = SkeyService(data_path=str(data_path), use_db=True)
+    service._db.ensure_subgroup_exists("valves", "gate")
+    service._db.ensure_subgroup_exists("flanges", "blind")
+    service._db.insert_skey(SkeyData(name="VALT1", group_key="valves", subgroup_key="gate"))
+    service._db.insert_skey(SkeyData(name="FLBL", group_key="flanges", subgroup_key="blind"))
+    service.load_skeys_from_db()
+
+    assert service.refresh_search_translations() == 1
+    assert service.search("задвиж") == ["VALT1"]
+
+    # Saved but not yet flushed translations are indexed, for the names asked for only.
+    store.set("flanges.blind._name", "Заглушки", "ru")
+    assert service.refresh_search_translations(["FLBL"]) == 1
+    assert service.refresh_search_translations(["VALT1"]) == 0
+    assert service.search("заглуш") == ["FLBL"]
+    assert service.search("арматура", limit=None) == ["VALT1"]
+    store.flush()
+
+
+def test_service_loads_geometry_on_demand_through_cache(tmp_path, monkeypatch):
+    from openiso.model.skey import SkeyData
+
+    monkeypatch.setattr(i18n, "save_json_translation", lambda *args, **kwargs: None)
+    data_path = _make_data_path(tmp_path)
+    service = SkeyService(data_path=str(data_path), use_db=True)
+    service._db.ensure_subgroup_exists("valves", "gate")
+    service._db.insert_skey(SkeyData(name="VALT1", group_key="valves", subgroup_key="gate", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]))
+    service.load_skeys_from_db()
+
+    assert service.get_skey_metadata("VALT1").geometry == []
+    geometry = service.get_skey("VALT1").geometry
+    assert isinstance(geometry, GeometryList) and geometry == ["Line: x1=0 y1=0 x2=1 y2=1"]
+    service.get_skey("VALT1").geometry.append("TeePoint: x0=0 y0=0")
+    assert service.get_skey("VALT1").geometry == ["Line: x1=0 y1=0 x2=1 y2=1"]
+    assert service.geometry_cache_stats()["hits"] == 2
+
+    service.update_skey(
+        name="VALT1", group_key="group.valves", subgroup_key="subgroup.gate", description_key="", spindle_skey="",
+        orientation=0, flow_arrow=0, dimensioned=0, tracing=0, insulation=0,
+        geometry=["Line: x1=5 y1=5 x2=6 y2=6"], lang_code="en",
+    )
+    assert service.get_skey("VALT1").geometry == ["Line: x1=5 y1=5 x2=6 y2=6"]
+
+    service.delete_skey("VALT1")
+    assert service.get_skey("VALT1") is None
+    assert service.geometry_cache_stats()["size"] == 0
+
+
+def test_service_exports_typed_geometry_to_ascii(tmp_path):
+    from openiso.model.skey import SkeyData
+
+    service = SkeyService(data_path=str(_make_data_path(tmp_path)), use_db=True)
+    items = [
+        "ArrivePoint: x0=-1.0 y0=0.0",
+        "Line: x1=-1.0 y1=0.0 x2=1.0 y2=0.0",
+        "SpindlePoint: x0=0.0 y0=0.5 name=SPX1",
+        "Rectangle: x0=0 y0=0 width=1 height=1",
+        "Line: x1=a y1=0 x2=0 y2=0",
+    ]
+
+    exported = service.export_skey_to_ascii(SkeyData(name="VAVW", geometry=items))
+
+    assert exported == service.export_skey_to_ascii(SkeyData(name="VAVW", geometry=GeometryList(items)))
+    records = [row.split()[1:] for row in exported.splitlines()[1:]]
+    points = [tuple(values[i:i + 3]) for values in records for i in range(0, len(values), 3)]
+    assert points[:4] == [("1", "980.0", "1000.0"), ("1", "980.0", "1000.0"), ("2", "1020.0", "1000.0"), ("6", "1000.0", "1010.0")]
+    assert len(points) == 10 and points[-1] == ("0", "0.0", "0.0")
+
+
+def test_service_refresh_applies_only_changed_rows(tmp_path, monkeypatch):
+    from openiso.controller.db import SkeyDB
+    from openiso.model.skey import SkeyData
+
+    data_path = _make_data_path(tmp_path)
+    service = SkeyService(data_path=str(data_path), use_db=True)
+    service._db.ensure_subgroup_exists("valves", "gate")
+    service._db.ensure_subgroup_exists("flanges", "blind")
+    for name in ("VALT1", "VALT2"):
+        service._db.insert_skey(SkeyData(name=name, group_key="valves", subgroup_key="gate", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]))
+    service.load_skeys_from_db()
+    assert service.get_skey("VALT1").geometry == ["Line: x1=0 y1=0 x2=1 y2=1"]
+
+    # Another process edits the library.
+    other = SkeyDB(service._db.db_path)
+    other.update_skey(SkeyData(name="VALT1", group_key="flanges", subgroup_key="blind", geometry=["Line: x1=7 y1=7 x2=8 y2=8"]))
+    other.delete_skey("VALT2")
+    other.close()
+
+    loaded_ids = []
+    get_by_ids = service._db.get_skey_metadata_by_ids
+    monkeypatch.setattr(service._db, "get_skey_metadata_by_ids", lambda ids: loaded_ids.append(set(ids)) or get_by_ids(ids))
+    monkeypatch.setattr(service._db, "get_all_skey_metadata", lambda: pytest.fail("full reload"))
+
+    assert service.refresh_from_db() is True
+    assert loaded_ids == [{1}]
+    assert service.get_skey("VALT2") is None
+    assert service.get_skey("VALT1").geometry == ["Line: x1=7 y1=7 x2=8 y2=8"]
+    assert service.groups.get_skeys("flanges", "blind") == ["VALT1"]
+    assert service.groups.get_skeys("valves", "gate") == []
+
+    monkeypatch.setattr(service._db, "get_changes_since", lambda seq: pytest.fail("change log read"))
+    assert service.refresh_from_db() is False
+
+
+def test_service_warm_starts_from_snapshot_until_db_changes(tmp_path, monkeypatch):
+    from openiso.controller.db import SkeyDB
+    from openiso.model.skey import SkeyData
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    data_path = _make_data_path(tmp_path)
+    service = SkeyService(data_path=str(data_path), use_db=True)
+    service._db.ensure_subgroup_exists("valves", "gate")
+    service._db.insert_skey(SkeyData(name="VALT1", group_key="valves", subgroup_key="gate", geometry=["Line: x1=0 y1=0 x2=1 y2=1"]))
+    service.load_skeys_from_db()
+    assert service.load_report["source"] == "database"
+    spindles = service.get_all_spindles()
+    service.close()
+
+    warm = SkeyService(data_path=str(data_path), use_db=True)
+    assert warm.load_report == {"source": "snapshot", "skeys": 1, "seconds": pytest.approx(warm.load_report["seconds"])}
+    assert warm.groups.get_skeys("valves", "gate") == ["VALT1"]
+    assert [spindle.name for spindle in warm.get_all_spindles()] == [spindle.name for spindle in spindles]
+    assert warm.get_skey("VALT1").geometry == ["Line: x1=0 y1=0 x2=1 y2=1"]
+    assert warm.save_snapshot() is False
+
+    # Another process edits the library: the snapshot is stale.
+    other = SkeyDB(warm._db.db_path)
+    other.insert_skey(SkeyData(name="VALT2", group_key="valves", subgroup_key="gate"))
+    other.close()
+    warm.load_skeys_from_db()
+    assert warm.load_report["source"] == "database"
+    assert warm.groups.get_skeys("valves", "gate") == ["VALT1", "VALT2"]
+    warm.close()
+
+    cold_check = SkeyService(data_path=str(data_path), use_db=True)
+    assert cold_check.load_report["source"] == "snapshot"
+    cold_check.close()
+
+    # The cache file is plain JSON; a tampered or corrupt one is ignored, never executed.
+    path = Path(cold_check._snapshot_path)
+    snapshot = json.loads(path.read_text(encoding="utf-8"))
+    assert snapshot["skeys"]["fields"][0] == "name"
+    for tampered in (b"\x80\x04cos\nsystem\n.", json.dumps({**snapshot, "skeys": {"fields": [], "rows": 3}}).encode()):
+        path.write_bytes(tampered)
+        reloaded = SkeyService(data_path=str(data_path), use_db=True)
+        assert reloaded.load_report["source"] == "database"
+        assert reloaded.groups.get_skeys("valves", "gate") == ["VALT1", "VALT2"]
+        reloaded._db.close()
+
+
+def test_service_import_streams_into_db_and_rolls_back_on_errors(tmp_path, monkeypatch):
+    import openiso.controller.db as db_module
+
+    monkeypatch.setattr(db_module, "BULK_UPSERT_CHUNK_SIZE", 7)
+    service = SkeyService(data_path=str(_make_data_path(tmp_path)), use_db=True)
+    symbols = tmp_path / "symbols.skey"
+    symbols.write_text(
+        "".join(
+            f" 501       {index:02d}SP           100       0       0       0       0\n"
+            " 502         1       0     200       2     400     200       1     400     400       2     400       0       0\n"
+            for index in range(20)
+        ),
+        encoding="utf-8",
+    )
+
+    result = service.import_from_ascii(str(symbols))
+
+    assert result.success is True
+    assert result.skeys == {}
+    assert result.imported_count == 20
+    assert len(service._db.get_all_skeys()) == 20
+    assert service.get_skey("19SP").geometry
+    assert service.groups.get_skeys("unknown", "unknown")[:2] == ["00SP", "01SP"]
+
+    broken = tmp_path / "broken.skey"
+    broken.write_text(
+        " 501       NEW1           100       0       0       0       0\n"
+        " 502         1       0     bad\n",
+        encoding="utf-8",
+    )
+    result = service.import_from_ascii(str(broken))
+
+    assert result.success is False
+    assert result.imported_count == 1
+    assert len(result.errors) == 1
+    assert service.get_skey("NEW1") is None
+    assert len(service._db.get_all_skeys()) == 20
+    service.close()
@@ -30,3 +30,26 @@ def test_geometry_service_parse_point_item():
     assert parsed["type"] == "ArrivePoint"
     assert float(parsed["x0"]) == pytest.approx(-55.0)
     assert float(parsed["y0"]) == pytest.approx(75.0)
+
+
+def test_geometry_cache_evicts_least_recently_used_and_counts_hits():
+    from openiso.controller.geometry_cache import GeometryCache
+
+    cache = GeometryCache(max_size=2)
+    loads = []
+
+    def loader(name):
+        loads.append(name)
+        return [f"Line: {name}"]
+
+    cache.get("A", loader)
+    cache.get("B", loader)
+    assert cache.get("A", loader) == ["Line: A"]
+    cache.get("C", loader)  # evicts B, the least recently used
+    cache.get("B", loader)
+    cache.invalidate("A")
+    cache.get("A", loader)
+
+    assert loads == ["A", "B", "C", "B", "A"]
+    assert cache.stats() == {"hits": 1, "misses": 5, "size": 2, "max_size": 2}
+    assert "A" in cache and "C" not in cache
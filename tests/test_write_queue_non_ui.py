@@ -0,0 +1,93 @@
+# SPDX-License-Identifier: MIT
+
+import threading
+
+import pytest
+
+import openiso.core.i18n as i18n
+from openiso.controller.write_queue import SkeyWriteQueue
+
+
+def test_write_queue_runs_jobs_in_order_and_reports_errors():
+    finished = []
+    queue = SkeyWriteQueue(on_finished=finished.append)
+    release = threading.Event()
+    ran = []
+
+    def slow(value):
+        release.wait(5)
+        ran.append(value)
+        return value
+
+    def fail():
+        raise ValueError("disk full")
+
+    first = queue.submit("save", "A", slow, 1)
+    second = queue.submit("delete", "B", fail)
+    third = queue.submit("save", "C", ran.append, 3)
+    assert queue.pending == 3
+    assert not first.done
+
+    release.set()
+    queue.flush()
+
+    assert ran == [1, 3]
+    assert [job.job_id for job in finished] == [first.job_id, second.job_id, third.job_id]
+    assert first.success and first.result == 1
+    assert not second.success and isinstance(second.error, ValueError)
+    assert queue.pending == 0
+    queue.close()
+
+
+def test_write_queue_close_flushes_pending_jobs():
+    queue = SkeyWriteQueue()
+    ran = []
+    jobs = [queue.submit("save", "", ran.append, index) for index in range(20)]
+
+    queue.close()
+    queue.close()
+
+    assert ran == list(range(20))
+    assert all(job.done for job in jobs)
+    with pytest.raises(RuntimeError):
+        queue.submit("save", "", ran.append, 21)
+
+
+@pytest.mark.integration
+def test_window_controller_saves_on_writer_thread(tmp_path, monkeypatch):
+    from openiso.view.main_window.window_controller import WindowController
+
+    monkeypatch.setattr(i18n, "save_json_translation", lambda *args, **kwargs: None)
+    (tmp_path / "data" / "database").mkdir(parents=True)
+    controller = WindowController(str(tmp_path / "data"), use_db=True)
+    threads = []
+    finished = []
+
+    def on_write_finished(job):
+        threads.append(threading.current_thread().name)
+        finished.append(job)
+
+    controller.on_write_finished = on_write_finished
+
+    saves = [
+        controller.submit_save_skey(
+            name="VALT1", group_key="Valves", subgroup_key="Gate", description_key="", spindle_skey="",
+            orientation=0, flow_arrow=0, dimensioned=0, tracing=0, insulation=0,
+            geometry=[f"Line: x1={index} y1=0 x2=1 y2=1"], lang_code="en",
+        )
+        for index in range(3)
+    ]
+    delete = controller.submit_delete_skey("MISSING")
+    controller.flush_writes()
+
+    assert all(job.success for job in saves)
+    assert delete.success
+    assert threads == ["openiso-writer"] * 4
+    # The writer thread only wrote to the database; the caller's thread applies the jobs.
+    assert controller.get_skey("VALT1") is None
+    for job in finished:
+        controller.apply_finished_write(job)
+    assert controller.get_groups().get_skeys("valves", "gate") == ["VALT1"]
+    controller.close()
+    assert controller.get_skey("VALT1").geometry == ["Line: x1=2 y1=0 x2=1 y2=1"]
+    assert len(controller.skey_service.get_skey_history("VALT1")) == 3